@@ -1,22 +1,66 @@
-"""Czech TV Program Integration for Home Assistant."""
+"""Czech TV Program Integration for Home Assistant.
 
-import logging
-from datetime import timedelta
+Home Assistant is imported only inside the setup functions (and for
+CONFIG_SCHEMA when it is installed), so the package also imports without
+it and the standalone EPG server runs as python -m cz_tv_program.server.
+"""
+
+from __future__ import annotations
 
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+import logging
+import sqlite3
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
 
 from .api import CzTVProgramAPI
-from .const import DOMAIN, PLATFORMS
+from .archive import EPGArchive
+from .const import (
+    ARCHIVE_FILENAME,
+    CONF_ARCHIVE_RETENTION,
+    CONF_SOURCE_URL,
+    CONF_WATCHLIST,
+    DEFAULT_ARCHIVE_RETENTION,
+    DOMAIN,
+    EVENT_WATCHLIST_MATCH,
+    PLATFORMS,
+)
+from .schedule import ScheduleIndex
+from .watchlist import WatchlistMatcher, parse_watchlist, upcoming_matches
+
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.typing import ConfigType
+
+try:
+    import homeassistant.helpers.config_validation as cv
+except ImportError:
+    # Samostatný EPG server (server.py) běží bez Home Assistantu
+    pass
+else:
+    CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 _LOGGER = logging.getLogger(__name__)
 
 SCAN_INTERVAL = timedelta(hours=6)
 
 
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up services and websocket commands."""
+    from .grid import CzTVProgramGridView
+    from .services import async_setup_services
+    from .websocket import async_register_websocket_commands
+
+    await async_setup_services(hass)
+    async_register_websocket_commands(hass)
+    hass.http.register_view(CzTVProgramGridView())
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Czech TV Program from a config entry."""
+    from .coordinator import CzTVProgramCoordinator
+
     hass.data.setdefault(DOMAIN, {})
 
     # Get channels from options or data
@@ -26,22 +70,51 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass=hass,
         username=entry.data.get("username", "test"),
         channels=channels,
+        source_url=entry.options.get(CONF_SOURCE_URL) or None,
     )
 
-    coordinator = DataUpdateCoordinator(
+    entry_data: dict[str, Any] = {
+        "api": api,
+        "archive": _create_archive(hass, entry),
+        "watchlist": WatchlistMatcher(
+            parse_watchlist(entry.options.get(CONF_WATCHLIST))
+        ),
+        "schedule": ScheduleIndex({}),
+    }
+    # První průchod watchlistu po startu jen naplní stav, bez událostí
+    watchlist_seeded = False
+
+    async def async_update_data() -> dict[str, Any]:
+        """Fetch the schedule, archive it and match the watchlist."""
+        nonlocal watchlist_seeded
+        data = await api.async_update_data()
+        if not data:
+            return data
+
+        with api.tracer.span("merge"):
+            if (archive := entry_data["archive"]) is not None:
+                await _async_write_archive(hass, archive, data)
+
+            index = entry_data["schedule"] = ScheduleIndex(data)
+            new_matches = entry_data["watchlist"].scan(index)
+        if watchlist_seeded:
+            for match in upcoming_matches(new_matches, datetime.now()):
+                hass.bus.async_fire(EVENT_WATCHLIST_MATCH, match)
+        watchlist_seeded = True
+        return data
+
+    coordinator = CzTVProgramCoordinator(
         hass,
-        _LOGGER,
+        api.tracer,
         name=DOMAIN,
-        update_method=api.async_update_data,
+        update_method=async_update_data,
         update_interval=SCAN_INTERVAL,
         # KRITICKÁ OPRAVA: timeout pro update, aby nezamrzl HA
         request_refresh_debouncer=None,
     )
 
-    hass.data[DOMAIN][entry.entry_id] = {
-        "coordinator": coordinator,
-        "api": api,
-    }
+    entry_data["coordinator"] = coordinator
+    hass.data[DOMAIN][entry.entry_id] = entry_data
 
     # KRITICKÁ OPRAVA: Neblokující refresh - HA startuje i bez dat
     # Data se načtou na pozadí
@@ -55,6 +128,25 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+def _create_archive(hass: HomeAssistant, entry: ConfigEntry) -> EPGArchive | None:
+    """Create the schedule archive unless it is disabled in options."""
+    retention = entry.options.get(CONF_ARCHIVE_RETENTION, DEFAULT_ARCHIVE_RETENTION)
+    if not retention:
+        return None
+    return EPGArchive(hass.config.path(ARCHIVE_FILENAME), retention)
+
+
+async def _async_write_archive(
+    hass: HomeAssistant, archive: EPGArchive, data: dict[str, Any]
+) -> None:
+    """Write a fetched schedule to the archive and prune old programs."""
+    try:
+        await hass.async_add_executor_job(archive.write, data)
+        await hass.async_add_executor_job(archive.prune)
+    except sqlite3.Error as err:
+        _LOGGER.error("Chyba při zápisu do archivu pořadů: %s", err)
+
+
 async def async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options updates."""
     # OPRAVA: Pouze aktualizovat API channely, ne reload celé integrace
@@ -64,7 +156,23 @@ async def async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None
     # Aktualizovat channely
     channels = entry.options.get(f"{DOMAIN}_OPTIONS") or entry.data.get("channels", [])
     api.channels = channels
-    
+    api.source_url = entry.options.get(CONF_SOURCE_URL) or None
+
+    # Archiv - změna retence nebo zapnutí/vypnutí
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    retention = entry.options.get(CONF_ARCHIVE_RETENTION, DEFAULT_ARCHIVE_RETENTION)
+    if entry_data["archive"] is not None and retention:
+        entry_data["archive"].retention_days = retention
+    else:
+        if entry_data["archive"] is not None:
+            await hass.async_add_executor_job(entry_data["archive"].close)
+        entry_data["archive"] = _create_archive(hass, entry)
+
+    # Watchlist - nové vzory se prohledají při následujícím refreshi
+    patterns = parse_watchlist(entry.options.get(CONF_WATCHLIST))
+    if patterns != entry_data["watchlist"].patterns:
+        entry_data["watchlist"].set_patterns(patterns)
+
     # Refresh dat
     await coordinator.async_refresh()
 
@@ -74,6 +182,8 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+        if entry_data["archive"] is not None:
+            await hass.async_add_executor_job(entry_data["archive"].close)
 
     return unload_ok
@@ -2,36 +2,123 @@
 
 import asyncio
 import logging
+import sys
 from datetime import datetime, timedelta
-from typing import Any
+from typing import TYPE_CHECKING, Any
 from xml.etree.ElementTree import Element
 
-from aiohttp.client import ClientError, ClientTimeout
+from aiohttp.client import ClientError, ClientSession, ClientTimeout
 from defusedxml import ElementTree as ET
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import API_BASE_URL, API_TIMEOUT, AVAILABLE_CHANNELS, DEFAULT_DAYS_AHEAD
+from .const import (
+    API_BASE_URL,
+    API_TIMEOUT,
+    AVAILABLE_CHANNELS,
+    DEFAULT_DAYS_AHEAD,
+    SERVER_SCHEDULE_PATH,
+)
+from .tracing import SpanTracer
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def parse_program_datetime(program: dict[str, Any]) -> datetime | None:
+    """Return the start of a parsed program as a naive local datetime."""
+    try:
+        date_str = program.get("date", "")
+        time_str = program.get("time", "")
+        if date_str and time_str:
+            return datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
+    except (ValueError, AttributeError):
+        pass
+    return None
+
+
+class TextPool:
+    """Schedule-wide deduplication table for repeated program texts.
+
+    Reruns and daily series repeat the same titles, genres and descriptions
+    many times across days and channels. Every parsed string goes through
+    the pool so identical texts share a single object.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty pool."""
+        self._strings: dict[str, str] = {}
+        self.references = 0
+        self.raw_bytes = 0
+
+    def intern(self, text: str | None) -> str | None:
+        """Return the pooled instance of text."""
+        if not text:
+            return text
+        self.references += 1
+        self.raw_bytes += sys.getsizeof(text)
+        return self._strings.setdefault(text, text)
+
+    def stats(self) -> dict[str, Any]:
+        """Return memory statistics for diagnostics."""
+        pooled_bytes = sum(sys.getsizeof(text) for text in self._strings.values())
+        return {
+            "unique_strings": len(self._strings),
+            "references": self.references,
+            "bytes_without_pool": self.raw_bytes,
+            "bytes_with_pool": pooled_bytes,
+            "saved_ratio": (
+                round(1 - pooled_bytes / self.raw_bytes, 3) if self.raw_bytes else 0.0
+            ),
+        }
+
+
 class CzTVProgramAPI:
     """API client for Czech TV Program."""
 
-    def __init__(self, hass: HomeAssistant, username: str, channels: list[str]):
-        """Initialize the API client."""
+    def __init__(
+        self,
+        hass: "HomeAssistant | None",
+        username: str,
+        channels: list[str],
+        session: ClientSession | None = None,
+        source_url: str | None = None,
+    ):
+        """Initialize the API client.
+
+        Outside Home Assistant (the standalone server) hass is None and the
+        caller passes its own session. With source_url the schedule is read
+        from such a server instead of ceskatelevize.cz.
+        """
         self.hass = hass
         self.username = username
         self.channels = channels or list(AVAILABLE_CHANNELS.keys())
-        self.session = async_get_clientsession(hass)
+        if session is None:
+            # Import až zde - server mimo Home Assistant ho nepotřebuje
+            from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+            session = async_get_clientsession(hass)
+        self.session = session
+        self.source_url = source_url
+        self.text_stats: dict[str, Any] = {}
+        self.tracer = SpanTracer(_LOGGER)
+        self._remote_etag: str | None = None
+        self._remote_data: dict[str, Any] = {}
 
     async def async_update_data(self) -> dict[str, Any]:
         """Fetch data from API endpoint."""
+        # Jeden pool textů pro celý rozvrh - opakované názvy a popisy
+        # napříč dny a kanály se uloží jen jednou
+        pool = TextPool()
+        self.tracer.start_cycle()
+
+        if self.source_url:
+            return await self._async_fetch_remote(pool)
+
         # KRITICKÁ OPRAVA: Paralelní requesty místo sekvenčních
         tasks = []
         for channel_id in self.channels:
-            tasks.append(self._fetch_channel_program_safe(channel_id))
+            tasks.append(self._fetch_channel_program_safe(channel_id, pool))
         
         # Spustit všechny requesty paralelně s timeoutem
         try:
@@ -51,24 +138,74 @@ class CzTVProgramAPI:
                 all_data[channel_id] = []
             else:
                 all_data[channel_id] = result
-        
+
+        self.text_stats = pool.stats()
         return all_data
 
-    async def _fetch_channel_program_safe(self, channel_id: str) -> list[dict[str, Any]]:
+    async def _async_fetch_remote(self, pool: TextPool) -> dict[str, Any]:
+        """Fetch the parsed schedule from a standalone EPG server.
+
+        Revalidates with the last ETag, so an unchanged schedule costs one
+        304 response. When the server is unreachable, the last schedule is
+        kept.
+        """
+        url = f"{self.source_url.rstrip('/')}{SERVER_SCHEDULE_PATH}"
+        headers = {}
+        if self._remote_etag and self._remote_data:
+            headers["If-None-Match"] = self._remote_etag
+
+        try:
+            with self.tracer.span("fetch"):
+                async with self.session.get(
+                    url,
+                    params={"channels": ",".join(self.channels)},
+                    headers=headers,
+                    timeout=ClientTimeout(total=API_TIMEOUT),
+                ) as response:
+                    if response.status == 304:
+                        return self._remote_data
+                    response.raise_for_status()
+                    payload = await response.json()
+                    etag = response.headers.get("ETag")
+        except (asyncio.TimeoutError, ClientError, ValueError) as err:
+            _LOGGER.warning("EPG server %s není dostupný: %s", url, err)
+            return self._remote_data
+
+        with self.tracer.span("parse"):
+            data = {
+                channel_id: [
+                    {
+                        key: pool.intern(value) if isinstance(value, str) else value
+                        for key, value in program.items()
+                    }
+                    for program in programs
+                ]
+                for channel_id, programs in payload.get("channels", {}).items()
+            }
+        self._remote_etag = etag
+        self._remote_data = data
+        self.text_stats = pool.stats()
+        return data
+
+    async def _fetch_channel_program_safe(
+        self, channel_id: str, pool: TextPool
+    ) -> list[dict[str, Any]]:
         """Fetch program for a specific channel with error handling."""
         try:
-            return await self._fetch_channel_program(channel_id)
+            return await self._fetch_channel_program(channel_id, pool)
         except Exception as err:
             _LOGGER.error("Chyba při načítání programu pro %s: %s", channel_id, err)
             return []
 
-    async def _fetch_channel_program(self, channel_id: str) -> list[dict[str, Any]]:
+    async def _fetch_channel_program(
+        self, channel_id: str, pool: TextPool
+    ) -> list[dict[str, Any]]:
         """Fetch program for a specific channel."""
         # OPRAVA: Paralelní requesty pro jednotlivé dny
         tasks = []
         for day_offset in range(DEFAULT_DAYS_AHEAD):
             date = datetime.now() + timedelta(days=day_offset)
-            tasks.append(self._fetch_day_program(channel_id, date))
+            tasks.append(self._fetch_day_program(channel_id, date, pool))
         
         # Spustit všechny dny paralelně
         results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -84,7 +221,7 @@ class CzTVProgramAPI:
         return all_programs
 
     async def _fetch_day_program(
-        self, channel_id: str, date: datetime
+        self, channel_id: str, date: datetime, pool: TextPool
     ) -> list[dict[str, Any]]:
         """Fetch program for a specific day."""
         date_str = date.strftime("%d.%m.%Y")
@@ -93,18 +230,19 @@ class CzTVProgramAPI:
         timeout = ClientTimeout(total=API_TIMEOUT)
         
         try:
-            async with self.session.get(url, timeout=timeout) as response:
-                if response.status == 200:
+            with self.tracer.span("fetch"):
+                async with self.session.get(url, timeout=timeout) as response:
+                    if response.status != 200:
+                        _LOGGER.warning(
+                            "Nepodařilo se načíst program pro %s na %s: HTTP %s",
+                            channel_id,
+                            date_str,
+                            response.status,
+                        )
+                        return []
                     content = await response.text()
-                    return self._parse_xml(content, date)
-                else:
-                    _LOGGER.warning(
-                        "Nepodařilo se načíst program pro %s na %s: HTTP %s",
-                        channel_id,
-                        date_str,
-                        response.status,
-                    )
-                    return []
+            with self.tracer.span("parse"):
+                return self._parse_xml(content, date, pool)
         
         except asyncio.TimeoutError:
             _LOGGER.warning(
@@ -130,9 +268,14 @@ class CzTVProgramAPI:
             )
             return []
 
-    def _parse_xml(self, xml_content: str, date: datetime) -> list[dict[str, Any]]:
+    def _parse_xml(
+        self, xml_content: str, date: datetime, pool: TextPool | None = None
+    ) -> list[dict[str, Any]]:
         """Parse XML response."""
         programs = []
+        if pool is None:
+            pool = TextPool()
+        intern = pool.intern
 
         try:
             root: Element = ET.fromstring(xml_content)
@@ -143,14 +286,14 @@ class CzTVProgramAPI:
                 # Time
                 cas = porad.find("cas")
                 if cas is not None:
-                    program["time"] = cas.text
+                    program["time"] = intern(cas.text)
 
                 # Date
                 datum = porad.find("datum")
                 if datum is not None:
-                    program["date"] = datum.text
+                    program["date"] = intern(datum.text)
                 else:
-                    program["date"] = date.strftime("%Y-%m-%d")
+                    program["date"] = intern(date.strftime("%Y-%m-%d"))
 
                 # Titles
                 nazvy = porad.find("nazvy")
@@ -160,28 +303,38 @@ class CzTVProgramAPI:
                     nazev_casti = nazvy.find("nazev_casti")
 
                     program["supertitle"] = (
-                        nadtitul.text if nadtitul is not None else ""
+                        intern(nadtitul.text) if nadtitul is not None else ""
+                    )
+                    program["title"] = (
+                        intern(nazev.text) if nazev is not None else "Bez názvu"
                     )
-                    program["title"] = nazev.text if nazev is not None else "Bez názvu"
                     program["episode_title"] = (
-                        nazev_casti.text if nazev_casti is not None else ""
+                        intern(nazev_casti.text)
+                        if nazev_casti is not None
+                        else ""
                     )
 
                 # Episode info
                 dil = porad.find("dil")
-                program["episode"] = dil.text if dil is not None and dil.text else ""
+                program["episode"] = (
+                    intern(dil.text) if dil is not None and dil.text else ""
+                )
 
                 # Genre
                 zanr = porad.find("zanr")
-                program["genre"] = zanr.text if zanr is not None else ""
+                program["genre"] = intern(zanr.text) if zanr is not None else ""
 
                 # Duration
                 stopaz = porad.find("stopaz")
-                program["duration"] = stopaz.text if stopaz is not None else ""
+                program["duration"] = (
+                    intern(stopaz.text) if stopaz is not None else ""
+                )
 
                 # Description
                 noticka = porad.find("noticka")
-                program["description"] = noticka.text if noticka is not None else ""
+                program["description"] = (
+                    intern(noticka.text) if noticka is not None else ""
+                )
 
                 # Links
                 linky = porad.find("linky")
@@ -197,7 +350,7 @@ class CzTVProgramAPI:
                 ikony = porad.find("ikony")
                 if ikony is not None:
                     program["audio"] = (
-                        ikony.find("zvuk").text
+                        intern(ikony.find("zvuk").text)
                         if ikony.find("zvuk") is not None
                         else ""
                     )
@@ -217,7 +370,7 @@ class CzTVProgramAPI:
                         else False
                     )
                     program["aspect_ratio"] = (
-                        ikony.find("pomer").text
+                        intern(ikony.find("pomer").text)
                         if ikony.find("pomer") is not None
                         else ""
                     )
@@ -0,0 +1,190 @@
+"""Local SQLite archive of the TV schedule for Czech TV Program."""
+
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any
+
+from .api import parse_program_datetime
+
+_LOGGER = logging.getLogger(__name__)
+
+ARCHIVE_FIELDS = (
+    "title",
+    "supertitle",
+    "episode_title",
+    "episode",
+    "genre",
+    "duration",
+    "description",
+    "link",
+    "live",
+    "premiere",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS programs (
+    channel TEXT NOT NULL,
+    start_ts INTEGER NOT NULL,
+    title TEXT,
+    supertitle TEXT,
+    episode_title TEXT,
+    episode TEXT,
+    genre TEXT,
+    duration TEXT,
+    description TEXT,
+    link TEXT,
+    live INTEGER,
+    premiere INTEGER,
+    PRIMARY KEY (channel, start_ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS programs_start_ts ON programs (start_ts, channel);
+"""
+
+
+class EPGArchive:
+    """Append-only archive of aired programs indexed on (channel, start_ts).
+
+    All methods are blocking and must run in the executor.
+    """
+
+    def __init__(self, path: str, retention_days: int) -> None:
+        """Initialize the archive."""
+        self.path = path
+        self.retention_days = retention_days
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database on first use."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def write(self, data: dict[str, list[dict[str, Any]]]) -> int:
+        """Store a freshly fetched schedule in one transaction.
+
+        Programs that already aired are never rewritten. The not-yet-aired
+        part of each fetched range is replaced, so rescheduled slots do not
+        leave stale rows behind.
+        """
+        now_ts = int(time.time())
+        placeholders = ", ".join("?" * (len(ARCHIVE_FIELDS) + 2))
+        written = 0
+
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                for channel_id, programs in data.items():
+                    rows = []
+                    for program in programs:
+                        start = parse_program_datetime(program)
+                        if start is None:
+                            continue
+                        rows.append(
+                            (channel_id, int(start.timestamp()))
+                            + tuple(
+                                program.get(field, "") for field in ARCHIVE_FIELDS
+                            )
+                        )
+                    if not rows:
+                        continue
+
+                    last_ts = max(row[1] for row in rows)
+                    conn.execute(
+                        "DELETE FROM programs "
+                        "WHERE channel = ? AND start_ts > ? AND start_ts <= ?",
+                        (channel_id, now_ts, last_ts),
+                    )
+                    conn.executemany(
+                        f"INSERT OR IGNORE INTO programs VALUES ({placeholders})",
+                        rows,
+                    )
+                    written += len(rows)
+
+        _LOGGER.debug("Archiv: zapsáno %d pořadů", written)
+        return written
+
+    def prune(self) -> int:
+        """Delete programs older than the retention period."""
+        cutoff = int(time.time()) - self.retention_days * 86400
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                cursor = conn.execute(
+                    "DELETE FROM programs WHERE start_ts < ?", (cutoff,)
+                )
+        return cursor.rowcount
+
+    def query(
+        self,
+        start_ts: int,
+        end_ts: int,
+        channel: str | None = None,
+        limit: int = 100,
+        cursor: tuple[int, str] | None = None,
+    ) -> tuple[list[dict[str, Any]], tuple[int, str] | None]:
+        """Return one page of programs starting in [start_ts, end_ts).
+
+        Pages are ordered by (start_ts, channel) and continue after the
+        keyset cursor returned with the previous page.
+        """
+        sql = f"SELECT channel, start_ts, {', '.join(ARCHIVE_FIELDS)} FROM programs"
+        where = ["start_ts >= ?", "start_ts < ?"]
+        params: list[Any] = [start_ts, end_ts]
+        if channel:
+            where.append("channel = ?")
+            params.append(channel)
+        if cursor:
+            where.append("(start_ts > ? OR (start_ts = ? AND channel > ?))")
+            params.extend((cursor[0], cursor[0], cursor[1]))
+        sql += f" WHERE {' AND '.join(where)} ORDER BY start_ts, channel LIMIT ?"
+        params.append(limit + 1)
+
+        with self._lock:
+            rows = self._connection().execute(sql, params).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = (rows[-1][1], rows[-1][0])
+
+        programs = []
+        for row in rows:
+            program = dict(zip(ARCHIVE_FIELDS, row[2:]))
+            program["live"] = bool(program["live"])
+            program["premiere"] = bool(program["premiere"])
+            program["channel_id"] = row[0]
+            program["start"] = datetime.fromtimestamp(row[1]).isoformat()
+            programs.append(program)
+
+        return programs, next_cursor
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def encode_cursor(cursor: tuple[int, str] | None) -> str | None:
+    """Encode a keyset cursor for service and websocket responses."""
+    if cursor is None:
+        return None
+    return f"{cursor[0]}:{cursor[1]}"
+
+
+def decode_cursor(value: str | None) -> tuple[int, str] | None:
+    """Decode a keyset cursor, ignoring malformed values."""
+    if not value:
+        return None
+    start_ts, _, channel = value.partition(":")
+    try:
+        return int(start_ts), channel
+    except ValueError:
+        return None
@@ -8,8 +8,21 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.config_entries import ConfigFlowResult
 from homeassistant.core import callback
-
-from .const import AVAILABLE_CHANNELS, DEFAULT_USERNAME, DOMAIN
+from homeassistant.helpers.selector import (
+    TextSelector,
+    TextSelectorConfig,
+    TextSelectorType,
+)
+
+from .const import (
+    AVAILABLE_CHANNELS,
+    CONF_ARCHIVE_RETENTION,
+    CONF_SOURCE_URL,
+    CONF_WATCHLIST,
+    DEFAULT_ARCHIVE_RETENTION,
+    DEFAULT_USERNAME,
+    DOMAIN,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -78,7 +91,13 @@ class CzTVProgramOptionsFlow(config_entries.OptionsFlow):
         """Manage the options."""
         if user_input is not None:
             return self.async_create_entry(
-                title="", data={f"{DOMAIN}_OPTIONS": user_input["channels"]}
+                title="",
+                data={
+                    f"{DOMAIN}_OPTIONS": user_input["channels"],
+                    CONF_ARCHIVE_RETENTION: user_input[CONF_ARCHIVE_RETENTION],
+                    CONF_WATCHLIST: user_input.get(CONF_WATCHLIST, ""),
+                    CONF_SOURCE_URL: user_input.get(CONF_SOURCE_URL, "").strip(),
+                },
             )
 
         entry = self.hass.config_entries.async_get_entry(self.config_entry.entry_id)
@@ -97,6 +116,20 @@ class CzTVProgramOptionsFlow(config_entries.OptionsFlow):
                     vol.Required("channels", default=set_options): cv.multi_select(
                         channel_options
                     ),
+                    vol.Optional(
+                        CONF_ARCHIVE_RETENTION,
+                        default=entry.options.get(
+                            CONF_ARCHIVE_RETENTION, DEFAULT_ARCHIVE_RETENTION
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3650)),
+                    vol.Optional(
+                        CONF_WATCHLIST,
+                        default=entry.options.get(CONF_WATCHLIST, ""),
+                    ): TextSelector(TextSelectorConfig(multiline=True)),
+                    vol.Optional(
+                        CONF_SOURCE_URL,
+                        default=entry.options.get(CONF_SOURCE_URL, ""),
+                    ): TextSelector(TextSelectorConfig(type=TextSelectorType.URL)),
                 }
             ),
         )
@@ -21,3 +21,34 @@ API_TIMEOUT = 30
 # Default values
 DEFAULT_USERNAME = "test"
 DEFAULT_DAYS_AHEAD = 7
+
+# Archiv pořadů (SQLite)
+CONF_ARCHIVE_RETENTION = "archive_retention_days"
+DEFAULT_ARCHIVE_RETENTION = 90  # dní, 0 = archiv vypnutý
+ARCHIVE_FILENAME = "cz_tv_program_archive.db"
+ARCHIVE_PAGE_SIZE = 100
+ARCHIVE_MAX_PAGE_SIZE = 1000
+
+# Watchlist
+CONF_WATCHLIST = "watchlist"
+EVENT_WATCHLIST_MATCH = f"{DOMAIN}_watchlist_match"
+WATCHLIST_ATTR_LIMIT = 20
+
+# Mřížka programu více kanálů
+GRID_DEFAULT_HOURS = 6
+GRID_MAX_HOURS = 48
+GRID_DEFAULT_SLOT_MINUTES = 30
+GRID_CACHE_SIZE = 8
+
+# Trasování a profilování
+TRACE_SAMPLE_EVERY = 4  # DEBUG trasování každé n-té aktualizace
+PROFILE_DEFAULT_SECONDS = 60
+PROFILE_MAX_SECONDS = 600
+
+# Samostatný EPG server (python -m cz_tv_program.server)
+CONF_SOURCE_URL = "source_url"  # prázdné = přímo ceskatelevize.cz
+SERVER_DEFAULT_PORT = 8765
+SERVER_REFRESH_HOURS = 6
+SERVER_NEXT_DEFAULT = 3
+SERVER_NEXT_MAX = 20
+SERVER_SCHEDULE_PATH = "/api/schedule"
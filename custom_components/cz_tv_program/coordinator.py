@@ -0,0 +1,26 @@
+"""Update coordinator of the Czech TV Program integration."""
+
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .tracing import SpanTracer
+
+_LOGGER = logging.getLogger(__package__)
+
+
+class CzTVProgramCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+    """Schedule coordinator that also times the fan-out to entities."""
+
+    def __init__(self, hass: HomeAssistant, tracer: SpanTracer, **kwargs: Any) -> None:
+        """Initialize the coordinator."""
+        super().__init__(hass, _LOGGER, **kwargs)
+        self.tracer = tracer
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify entities and record the duration as the fanout span."""
+        with self.tracer.span("fanout"):
+            super().async_update_listeners()
@@ -0,0 +1,39 @@
+"""Diagnostics support for Czech TV Program."""
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+TO_REDACT = {"username"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = entry_data["coordinator"]
+    api = entry_data["api"]
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "last_update_success": coordinator.last_update_success,
+        "programs_per_channel": {
+            channel_id: len(programs)
+            for channel_id, programs in (coordinator.data or {}).items()
+        },
+        "text_pool": api.text_stats,
+        "spans": api.tracer.as_dict(),
+        "watchlist": {
+            "patterns": len(entry_data["watchlist"].patterns),
+            "matches": len(entry_data["watchlist"].matches),
+            "last_scanned_slices": entry_data["watchlist"].scanned_slices,
+        },
+    }
@@ -0,0 +1,91 @@
+"""Multi-channel program grid for Czech TV Program."""
+
+from collections import OrderedDict
+from datetime import datetime
+from http import HTTPStatus
+from typing import Any
+
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import (
+    GRID_CACHE_SIZE,
+    GRID_DEFAULT_HOURS,
+    GRID_DEFAULT_SLOT_MINUTES,
+    GRID_MAX_HOURS,
+)
+from .schedule import build_grid, grid_etag, grid_window
+from .services import get_entry_data
+
+
+@callback
+def async_get_grid(
+    hass: HomeAssistant,
+    channels: list[str] | None,
+    start: datetime | None,
+    hours: int,
+    slot_minutes: int,
+) -> tuple[str, dict[str, Any]]:
+    """Return the ETag and content of the requested grid.
+
+    The ETag depends only on the schedule content of the requested channels
+    and on the window, so unchanged grids are served from a small LRU cache.
+    """
+    entry_data = get_entry_data(hass)
+    index = entry_data["schedule"]
+    channels = [
+        channel_id
+        for channel_id in (channels or entry_data["api"].channels)
+        if channel_id in entry_data["api"].channels
+    ]
+    window_start, window_end = grid_window(start, hours, slot_minutes)
+
+    etag = grid_etag(index, channels, window_start, hours, slot_minutes)
+
+    cache: OrderedDict[str, dict[str, Any]] = entry_data.setdefault(
+        "grid_cache", OrderedDict()
+    )
+    if (grid := cache.get(etag)) is not None:
+        cache.move_to_end(etag)
+        return etag, grid
+
+    grid = build_grid(index, channels, window_start, window_end, slot_minutes)
+    grid["etag"] = etag
+    cache[etag] = grid
+    while len(cache) > GRID_CACHE_SIZE:
+        cache.popitem(last=False)
+    return etag, grid
+
+
+class CzTVProgramGridView(HomeAssistantView):
+    """Serve the program grid with ETag revalidation."""
+
+    url = "/api/cz_tv_program/grid"
+    name = "api:cz_tv_program:grid"
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Return the grid for ?channels=ct1,ct2&start=...&hours=6&slot=30."""
+        hass: HomeAssistant = request.app["hass"]
+        query = request.query
+
+        try:
+            start = datetime.fromisoformat(query["start"]) if "start" in query else None
+            hours = int(query.get("hours", GRID_DEFAULT_HOURS))
+            slot_minutes = int(query.get("slot", GRID_DEFAULT_SLOT_MINUTES))
+        except ValueError:
+            return self.json_message("Neplatné parametry", HTTPStatus.BAD_REQUEST)
+        if not 1 <= hours <= GRID_MAX_HOURS or not 5 <= slot_minutes <= 120:
+            return self.json_message("Neplatné parametry", HTTPStatus.BAD_REQUEST)
+        channels = [c for c in query.get("channels", "").split(",") if c]
+
+        try:
+            etag, grid = async_get_grid(hass, channels, start, hours, slot_minutes)
+        except HomeAssistantError as err:
+            return self.json_message(str(err), HTTPStatus.SERVICE_UNAVAILABLE)
+
+        headers = {"ETag": f'"{etag}"', "Cache-Control": "no-cache"}
+        if request.headers.get("If-None-Match") == f'"{etag}"':
+            return web.Response(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+        return self.json(grid, headers=headers)
@@ -0,0 +1,25 @@
+"""cProfile profiling of the event loop."""
+
+import asyncio
+import cProfile
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+
+async def async_profile(hass: HomeAssistant, seconds: int, path: str) -> None:
+    """Profile the event loop for seconds and write pstats output to path.
+
+    cProfile only sees the event loop thread, which runs fetching, parsing
+    and entity state writes; archive writes in the executor are not included.
+    """
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as err:
+        raise HomeAssistantError(f"Profilování už běží: {err}") from err
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.disable()
+    await hass.async_add_executor_job(profiler.dump_stats, path)
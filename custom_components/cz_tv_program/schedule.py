@@ -0,0 +1,253 @@
+"""Helpers working on the whole fetched schedule (no Home Assistant imports)."""
+
+import hashlib
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta
+from functools import cached_property
+from typing import Any
+
+from .api import parse_program_datetime
+from .const import AVAILABLE_CHANNELS
+
+FINGERPRINT_FIELDS = (
+    "time",
+    "title",
+    "supertitle",
+    "episode_title",
+    "episode",
+    "genre",
+    "duration",
+    "description",
+    "live",
+    "premiere",
+)
+
+SliceKey = tuple[str, str]
+
+
+def split_slices(
+    data: dict[str, list[dict[str, Any]]],
+) -> dict[SliceKey, list[dict[str, Any]]]:
+    """Group programs of every channel into (channel_id, date) slices."""
+    slices: dict[SliceKey, list[dict[str, Any]]] = defaultdict(list)
+    for channel_id, programs in data.items():
+        for program in programs:
+            slices[(channel_id, program.get("date") or "")].append(program)
+    return slices
+
+
+def slice_fingerprints(
+    slices: dict[SliceKey, list[dict[str, Any]]],
+) -> dict[SliceKey, str]:
+    """Return a stable content digest of every (channel_id, date) slice."""
+    fingerprints = {}
+    for key, programs in slices.items():
+        digest = hashlib.blake2b(digest_size=8)
+        for program in programs:
+            digest.update(
+                "\x1f".join(
+                    str(program.get(field, "")) for field in FINGERPRINT_FIELDS
+                ).encode()
+            )
+            digest.update(b"\x1e")
+        fingerprints[key] = digest.hexdigest()
+    return fingerprints
+
+
+def parse_duration(value: str | None) -> timedelta | None:
+    """Parse a program duration given as "MM" or "H:MM"."""
+    if not value:
+        return None
+    try:
+        parts = [int(part) for part in value.split(":")]
+    except ValueError:
+        return None
+    if len(parts) == 1:
+        return timedelta(minutes=parts[0])
+    if len(parts) == 2:
+        return timedelta(hours=parts[0], minutes=parts[1])
+    return None
+
+
+class ScheduleIndex:
+    """Read-only view of one fetched schedule.
+
+    Built once per coordinator refresh and shared by the watchlist, the
+    grid endpoint and other consumers of the whole schedule.
+    """
+
+    def __init__(self, data: dict[str, list[dict[str, Any]]]) -> None:
+        """Split the schedule into slices and fingerprint them."""
+        self.data = data
+        self.slices = split_slices(data)
+        self.fingerprints = slice_fingerprints(self.slices)
+
+    def version(self, channels: list[str] | None = None) -> str:
+        """Return a content digest of the given channels (all by default)."""
+        digest = hashlib.blake2b(digest_size=8)
+        for key in sorted(self.fingerprints):
+            if channels is None or key[0] in channels:
+                digest.update(f"{key[0]}|{key[1]}|{self.fingerprints[key]};".encode())
+        return digest.hexdigest()
+
+    @cached_property
+    def timelines(self) -> dict[str, list[tuple[float, float, dict[str, Any]]]]:
+        """Return (start_ts, end_ts, program) of every channel ordered by start.
+
+        A program ends when the next one starts; the last program of a
+        channel ends after its duration (30 minutes when unknown).
+        """
+        timelines = {}
+        for channel_id, programs in self.data.items():
+            starts = sorted(
+                (
+                    (start, program)
+                    for program in programs
+                    if (start := parse_program_datetime(program)) is not None
+                ),
+                key=lambda item: item[0],
+            )
+            timeline = []
+            for index, (start, program) in enumerate(starts):
+                if index + 1 < len(starts):
+                    end = starts[index + 1][0]
+                else:
+                    end = start + (
+                        parse_duration(program.get("duration"))
+                        or timedelta(minutes=30)
+                    )
+                timeline.append((start.timestamp(), end.timestamp(), program))
+            timelines[channel_id] = timeline
+        return timelines
+
+    def now_next(
+        self, channel_id: str, moment: datetime, count: int = 1
+    ) -> tuple[dict[str, Any] | None, list[dict[str, Any]]]:
+        """Return the program running at moment and up to count following ones."""
+        timeline = self.timelines.get(channel_id, [])
+        moment_ts = moment.timestamp()
+        position = bisect_right(timeline, moment_ts, key=lambda item: item[0])
+        current = None
+        if position and timeline[position - 1][1] > moment_ts:
+            current = timeline[position - 1][2]
+        return current, [
+            program for _, _, program in timeline[position : position + count]
+        ]
+
+    def between(
+        self, channel_id: str, start: datetime, end: datetime
+    ) -> list[dict[str, Any]]:
+        """Return programs of a channel overlapping the [start, end) window."""
+        start_ts = start.timestamp()
+        end_ts = end.timestamp()
+        timeline = self.timelines.get(channel_id, [])
+        # Programs are contiguous, so the first overlapping one starts before start
+        position = max(0, bisect_right(timeline, start_ts, key=lambda item: item[0]) - 1)
+        programs = []
+        for program_start, program_end, program in timeline[position:]:
+            if program_start >= end_ts:
+                break
+            if program_end > start_ts:
+                programs.append(program)
+        return programs
+
+
+def grid_window(
+    start: datetime | None, hours: int, slot_minutes: int
+) -> tuple[datetime, datetime]:
+    """Return the requested window aligned down to a slot boundary."""
+    start = (start or datetime.now()).replace(second=0, microsecond=0)
+    if start.tzinfo is not None:
+        start = start.astimezone().replace(tzinfo=None)
+    start -= timedelta(minutes=(start.hour * 60 + start.minute) % slot_minutes)
+    return start, start + timedelta(hours=hours)
+
+
+def grid_etag(
+    index: ScheduleIndex,
+    channels: list[str],
+    window_start: datetime,
+    hours: int,
+    slot_minutes: int,
+) -> str:
+    """Return the ETag of a grid of the given channels and window."""
+    return hashlib.blake2b(
+        (
+            f"{index.version(channels)}|{','.join(channels)}|"
+            f"{window_start.isoformat()}|{hours}|{slot_minutes}"
+        ).encode(),
+        digest_size=8,
+    ).hexdigest()
+
+
+def build_grid(
+    index: ScheduleIndex,
+    channels: list[str],
+    start: datetime,
+    end: datetime,
+    slot_minutes: int,
+) -> dict[str, Any]:
+    """Build a compact, column-oriented channels x time slots grid.
+
+    Every channel carries parallel arrays (one item per program). Repeated
+    texts are stored once in a shared string table and referenced by index.
+    """
+    start_ts = start.timestamp()
+    end_ts = end.timestamp()
+    slot_seconds = slot_minutes * 60
+    strings: list[str] = []
+    string_ids: dict[str, int] = {}
+
+    def string_id(text: str | None) -> int:
+        text = text or ""
+        if (sid := string_ids.get(text)) is None:
+            sid = string_ids[text] = len(strings)
+            strings.append(text)
+        return sid
+
+    columns = []
+    for channel_id in channels:
+        column: dict[str, Any] = {
+            "id": channel_id,
+            "name": AVAILABLE_CHANNELS.get(channel_id, channel_id),
+            "start": [],
+            "end": [],
+            "slot": [],
+            "span": [],
+            "title": [],
+            "genre": [],
+            "flags": [],
+        }
+        for program_start, program_end, program in index.timelines.get(
+            channel_id, []
+        ):
+            # A program starting together with the next one has zero length
+            if (
+                program_end <= program_start
+                or program_end <= start_ts
+                or program_start >= end_ts
+            ):
+                continue
+            first_slot = max(0, int((program_start - start_ts) // slot_seconds))
+            last_slot = int((min(program_end, end_ts) - start_ts - 1) // slot_seconds)
+            column["start"].append(int(program_start))
+            column["end"].append(int(program_end))
+            column["slot"].append(first_slot)
+            column["span"].append(max(1, last_slot - first_slot + 1))
+            column["title"].append(string_id(program.get("title")))
+            column["genre"].append(string_id(program.get("genre")))
+            column["flags"].append(
+                (1 if program.get("live") else 0)
+                | (2 if program.get("premiere") else 0)
+            )
+        columns.append(column)
+
+    return {
+        "start": int(start_ts),
+        "end": int(end_ts),
+        "slot_minutes": slot_minutes,
+        "slots": -(-int(end_ts - start_ts) // slot_seconds),
+        "strings": strings,
+        "channels": columns,
+    }
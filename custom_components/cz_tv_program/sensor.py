@@ -6,11 +6,14 @@ from typing import Any
 
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_point_in_time
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import AVAILABLE_CHANNELS, DOMAIN
+from .api import parse_program_datetime
+from .const import AVAILABLE_CHANNELS, DOMAIN, WATCHLIST_ATTR_LIMIT
+from .watchlist import WatchlistMatcher, upcoming_matches
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,12 +24,14 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the sensor platform."""
-    coordinator = hass.data[DOMAIN][config_entry.entry_id]["coordinator"]
+    entry_data = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator = entry_data["coordinator"]
     channels = config_entry.options.get(f"{DOMAIN}_OPTIONS") or config_entry.data.get(
         "channels", []
     )
 
     entities = [CzTVProgramSensor(coordinator, channel_id) for channel_id in channels]
+    entities.append(CzTVWatchlistSensor(coordinator, entry_data["watchlist"]))
 
     async_add_entities(entities)
 
@@ -34,6 +39,10 @@ async def async_setup_entry(
 class CzTVProgramSensor(CoordinatorEntity, SensorEntity):
     """Representation of a Czech TV Program sensor."""
 
+    # Program lists are for the card only; over the recorder's 16 KiB limit
+    # the recorder would drop all attributes of the state
+    _unrecorded_attributes = frozenset({"all_programs", "upcoming_programs"})
+
     def __init__(self, coordinator, channel_id: str):
         """Initialize the sensor."""
         super().__init__(coordinator)
@@ -191,12 +200,69 @@ class CzTVProgramSensor(CoordinatorEntity, SensorEntity):
 
     def _parse_program_datetime(self, program: dict) -> datetime | None:
         """Parse program date and time."""
-        try:
-            date_str = program.get("date", "")
-            time_str = program.get("time", "")
-            if date_str and time_str:
-                datetime_str = f"{date_str} {time_str}"
-                return datetime.strptime(datetime_str, "%Y-%m-%d %H:%M")
-        except (ValueError, AttributeError):
-            pass
-        return None
+        return parse_program_datetime(program)
+
+
+class CzTVWatchlistSensor(CoordinatorEntity, SensorEntity):
+    """Number of upcoming programs matching the watchlist."""
+
+    def __init__(self, coordinator, matcher: WatchlistMatcher):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._matcher = matcher
+        self._attr_name = "TV Program Watchlist"
+        self._attr_unique_id = f"{DOMAIN}_watchlist"
+        self._attr_icon = "mdi:playlist-star"
+        self._attr_native_unit_of_measurement = "pořadů"
+        self._unsub_next_start: CALLBACK_TYPE | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Compute matches when added."""
+        await super().async_added_to_hass()
+        self._update_matches()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel the pending timer."""
+        self._cancel_next_start()
+        await super().async_will_remove_from_hass()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._update_matches()
+        super()._handle_coordinator_update()
+
+    @callback
+    def _update_matches(self) -> None:
+        """Refresh state from the matcher and wait for the next match start.
+
+        The state only changes when the schedule is refetched or when an
+        upcoming match starts, so no per-minute work is needed.
+        """
+        self._cancel_next_start()
+        upcoming = upcoming_matches(self._matcher.matches, datetime.now())
+        self._attr_native_value = len(upcoming)
+        self._attr_extra_state_attributes = {
+            "patterns": len(self._matcher.patterns),
+            "matches": upcoming[:WATCHLIST_ATTR_LIMIT],
+        }
+        if upcoming:
+            self._unsub_next_start = async_track_point_in_time(
+                self.hass,
+                self._handle_match_started,
+                datetime.fromisoformat(upcoming[0]["start"]),
+            )
+
+    @callback
+    def _handle_match_started(self, _now: datetime) -> None:
+        """Drop a match from the list once it starts."""
+        self._unsub_next_start = None
+        self._update_matches()
+        self.async_write_ha_state()
+
+    @callback
+    def _cancel_next_start(self) -> None:
+        """Cancel the timer for the next match start."""
+        if self._unsub_next_start is not None:
+            self._unsub_next_start()
+            self._unsub_next_start = None
@@ -0,0 +1,303 @@
+"""Standalone EPG server for Czech TV Program.
+
+Runs the same fetch/parse engine as the integration outside Home Assistant
+and serves the schedule over HTTP, so several Home Assistant instances can
+share one download from ceskatelevize.cz (integration option source_url):
+
+    cd custom_components && python -m cz_tv_program.server --port 8765
+
+The package imports Home Assistant only inside the integration's setup
+functions and server.py with the modules it uses (api, const, schedule,
+tracing) imports none, so only aiohttp and defusedxml have to be
+installed. With --source-url the server reads another EPG server
+instead of ceskatelevize.cz.
+
+Endpoints (all JSON with an ETag, If-None-Match answers 304):
+
+- /api/schedule?channels=ct1,ct2 - the whole parsed schedule
+- /api/now?channels=ct1,ct2&next=3 - running and following programs
+- /api/range?channel=ct1&start=...&end=... - programs in a window
+- /api/grid?channels=...&start=...&hours=6&slot=30 - the grid of the card
+"""
+
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import logging
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable
+from datetime import datetime, timedelta
+from typing import Any
+
+from aiohttp import ClientSession, web
+
+from .api import CzTVProgramAPI
+from .const import (
+    AVAILABLE_CHANNELS,
+    DEFAULT_USERNAME,
+    GRID_CACHE_SIZE,
+    GRID_DEFAULT_HOURS,
+    GRID_DEFAULT_SLOT_MINUTES,
+    GRID_MAX_HOURS,
+    SERVER_DEFAULT_PORT,
+    SERVER_NEXT_DEFAULT,
+    SERVER_NEXT_MAX,
+    SERVER_REFRESH_HOURS,
+    SERVER_SCHEDULE_PATH,
+)
+from .schedule import ScheduleIndex, build_grid, grid_etag, grid_window
+
+_LOGGER = logging.getLogger(__name__)
+
+# Opakování po neúspěšném stažení (bez dat)
+RETRY_INTERVAL = timedelta(minutes=5)
+
+
+def _etag(*parts: Any) -> str:
+    return hashlib.blake2b(
+        "|".join(str(part) for part in parts).encode(), digest_size=8
+    ).hexdigest()
+
+
+class EPGServer:
+    """Periodically refreshed schedule served over HTTP."""
+
+    def __init__(
+        self,
+        username: str,
+        channels: list[str],
+        refresh_interval: timedelta,
+        source_url: str | None = None,
+    ) -> None:
+        """Initialize the server without data."""
+        self.username = username
+        self.channels = channels
+        self.refresh_interval = refresh_interval
+        self.source_url = source_url
+        self.api: CzTVProgramAPI | None = None
+        self.index = ScheduleIndex({})
+        self.fetched_at: datetime | None = None
+        self._grid_cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
+    def app(self) -> web.Application:
+        """Return the aiohttp application."""
+        app = web.Application()
+        app.cleanup_ctx.append(self._lifecycle)
+        app.router.add_get(SERVER_SCHEDULE_PATH, self.handle_schedule)
+        app.router.add_get("/api/now", self.handle_now)
+        app.router.add_get("/api/range", self.handle_range)
+        app.router.add_get("/api/grid", self.handle_grid)
+        return app
+
+    async def _lifecycle(self, app: web.Application) -> AsyncIterator[None]:
+        async with ClientSession() as session:
+            self.api = CzTVProgramAPI(
+                None,
+                self.username,
+                self.channels,
+                session=session,
+                source_url=self.source_url,
+            )
+            task = asyncio.create_task(self._refresh_loop())
+            yield
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            delay = self.refresh_interval
+            try:
+                if not await self.async_refresh():
+                    delay = RETRY_INTERVAL
+            except Exception:  # noqa: BLE001 - server musí běžet dál
+                _LOGGER.exception("Chyba při aktualizaci TV programu")
+                delay = RETRY_INTERVAL
+            await asyncio.sleep(delay.total_seconds())
+
+    async def async_refresh(self) -> bool:
+        """Fetch the schedule; return whether any programs were received."""
+        data = await self.api.async_update_data()
+        if not any(data.values()):
+            _LOGGER.warning("TV program se nepodařilo načíst, zůstávají stará data")
+            return False
+        self.index = ScheduleIndex(data)
+        self.fetched_at = datetime.now().astimezone()
+        self._grid_cache.clear()
+        _LOGGER.info(
+            "TV program načten: %d pořadů, verze %s, úseky %s",
+            sum(len(programs) for programs in data.values()),
+            self.index.version(),
+            self.api.tracer.last_cycle,
+        )
+        return True
+
+    def _channels(self, request: web.Request) -> list[str]:
+        requested = [c for c in request.query.get("channels", "").split(",") if c]
+        return [c for c in (requested or self.channels) if c in self.index.data]
+
+    def _respond(
+        self, request: web.Request, etag: str, build: Callable[[], Any]
+    ) -> web.Response:
+        """Answer 304 when the client has the current ETag, else build the body."""
+        if self.fetched_at is None:
+            return web.json_response(
+                {"message": "TV program ještě není načtený"}, status=503
+            )
+        headers = {"ETag": f'"{etag}"', "Cache-Control": "no-cache"}
+        if request.headers.get("If-None-Match") == f'"{etag}"':
+            return web.Response(status=304, headers=headers)
+        return web.json_response(build(), headers=headers)
+
+    async def handle_schedule(self, request: web.Request) -> web.Response:
+        """Return the whole schedule of the requested channels."""
+        channels = self._channels(request)
+        return self._respond(
+            request,
+            _etag(self.index.version(channels), ",".join(channels)),
+            lambda: {
+                "version": self.index.version(channels),
+                "fetched_at": self.fetched_at.isoformat(),
+                "channels": {c: self.index.data[c] for c in channels},
+            },
+        )
+
+    async def handle_now(self, request: web.Request) -> web.Response:
+        """Return the running and next programs of the requested channels."""
+        try:
+            count = int(request.query.get("next", SERVER_NEXT_DEFAULT))
+        except ValueError:
+            return web.json_response({"message": "Neplatné parametry"}, status=400)
+        if not 0 <= count <= SERVER_NEXT_MAX:
+            return web.json_response({"message": "Neplatné parametry"}, status=400)
+        channels = self._channels(request)
+        now = datetime.now()
+        result = {
+            channel_id: self.index.now_next(channel_id, now, count)
+            for channel_id in channels
+        }
+        # Mění se s daty a s přechodem na další pořad, ne s každou minutou
+        etag = _etag(
+            self.index.version(channels),
+            count,
+            *(
+                f"{channel_id}:{_starts(current)}:"
+                f"{_starts(following[0] if following else None)}"
+                for channel_id, (current, following) in result.items()
+            ),
+        )
+        return self._respond(
+            request,
+            etag,
+            lambda: {
+                channel_id: {
+                    "name": AVAILABLE_CHANNELS.get(channel_id, channel_id),
+                    "current": current,
+                    "next": following,
+                }
+                for channel_id, (current, following) in result.items()
+            },
+        )
+
+    async def handle_range(self, request: web.Request) -> web.Response:
+        """Return programs of one channel overlapping the start/end window."""
+        query = request.query
+        channel_id = query.get("channel", "")
+        try:
+            start = _naive_local(datetime.fromisoformat(query["start"]))
+            end = _naive_local(datetime.fromisoformat(query["end"]))
+        except (KeyError, ValueError):
+            return web.json_response({"message": "Neplatné parametry"}, status=400)
+        if channel_id not in self.index.data or end <= start:
+            return web.json_response({"message": "Neplatné parametry"}, status=400)
+        return self._respond(
+            request,
+            _etag(self.index.version([channel_id]), channel_id, start, end),
+            lambda: {
+                "channel": channel_id,
+                "programs": self.index.between(channel_id, start, end),
+            },
+        )
+
+    async def handle_grid(self, request: web.Request) -> web.Response:
+        """Return the same grid as /api/cz_tv_program/grid in Home Assistant."""
+        query = request.query
+        try:
+            start = datetime.fromisoformat(query["start"]) if "start" in query else None
+            hours = int(query.get("hours", GRID_DEFAULT_HOURS))
+            slot_minutes = int(query.get("slot", GRID_DEFAULT_SLOT_MINUTES))
+        except ValueError:
+            return web.json_response({"message": "Neplatné parametry"}, status=400)
+        if not 1 <= hours <= GRID_MAX_HOURS or not 5 <= slot_minutes <= 120:
+            return web.json_response({"message": "Neplatné parametry"}, status=400)
+        channels = self._channels(request)
+        window_start, window_end = grid_window(start, hours, slot_minutes)
+        etag = grid_etag(self.index, channels, window_start, hours, slot_minutes)
+
+        def build() -> dict[str, Any]:
+            if (grid := self._grid_cache.get(etag)) is not None:
+                self._grid_cache.move_to_end(etag)
+                return grid
+            grid = build_grid(
+                self.index, channels, window_start, window_end, slot_minutes
+            )
+            grid["etag"] = etag
+            self._grid_cache[etag] = grid
+            while len(self._grid_cache) > GRID_CACHE_SIZE:
+                self._grid_cache.popitem(last=False)
+            return grid
+
+        return self._respond(request, etag, build)
+
+
+def _starts(program: dict[str, Any] | None) -> str:
+    return f"{program.get('date')} {program.get('time')}" if program else "-"
+
+
+def _naive_local(moment: datetime) -> datetime:
+    """Convert an aware datetime to naive local time like the schedule."""
+    if moment.tzinfo is not None:
+        return moment.astimezone().replace(tzinfo=None)
+    return moment
+
+
+def main() -> None:
+    """Run the server until interrupted."""
+    parser = argparse.ArgumentParser(description="Czech TV Program EPG server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=SERVER_DEFAULT_PORT)
+    parser.add_argument(
+        "--channels",
+        default=",".join(AVAILABLE_CHANNELS),
+        help="comma separated channel ids (default: all)",
+    )
+    parser.add_argument("--username", default=DEFAULT_USERNAME)
+    parser.add_argument(
+        "--refresh-hours", type=float, default=SERVER_REFRESH_HOURS
+    )
+    parser.add_argument(
+        "--source-url", help="another EPG server to read instead of ceskatelevize.cz"
+    )
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    channels = [c for c in args.channels.split(",") if c in AVAILABLE_CHANNELS]
+    if not channels:
+        parser.error(f"no known channel, choose from {', '.join(AVAILABLE_CHANNELS)}")
+
+    server = EPGServer(
+        args.username,
+        channels,
+        timedelta(hours=args.refresh_hours),
+        source_url=args.source_url,
+    )
+    web.run_app(server.app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Services for Czech TV Program."""
+
+import logging
+import time
+from typing import Any
+
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+
+from .archive import EPGArchive, decode_cursor, encode_cursor
+from .const import (
+    ARCHIVE_MAX_PAGE_SIZE,
+    ARCHIVE_PAGE_SIZE,
+    AVAILABLE_CHANNELS,
+    DOMAIN,
+    PROFILE_DEFAULT_SECONDS,
+    PROFILE_MAX_SECONDS,
+)
+from .profiling import async_profile
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_QUERY_ARCHIVE = "query_archive"
+SERVICE_PROFILE = "profile"
+
+QUERY_ARCHIVE_SCHEMA = vol.Schema(
+    {
+        vol.Required("start"): cv.datetime,
+        vol.Required("end"): cv.datetime,
+        vol.Optional("channel"): vol.In(AVAILABLE_CHANNELS),
+        vol.Optional("limit", default=ARCHIVE_PAGE_SIZE): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=ARCHIVE_MAX_PAGE_SIZE)
+        ),
+        vol.Optional("cursor"): cv.string,
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional("seconds", default=PROFILE_DEFAULT_SECONDS): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=PROFILE_MAX_SECONDS)
+        ),
+    }
+)
+
+
+def get_entry_data(hass: HomeAssistant) -> dict[str, Any]:
+    """Return runtime data of the (single) loaded config entry."""
+    for entry_data in hass.data.get(DOMAIN, {}).values():
+        return entry_data
+    raise HomeAssistantError("Integrace Czech TV Program není načtená")
+
+
+def get_archive(hass: HomeAssistant) -> EPGArchive:
+    """Return the archive of the loaded config entry."""
+    archive = get_entry_data(hass).get("archive")
+    if archive is None:
+        raise HomeAssistantError("Archiv TV programu je vypnutý")
+    return archive
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Register integration services."""
+
+    async def query_archive(call: ServiceCall) -> ServiceResponse:
+        """Return one page of archived programs."""
+        archive = get_archive(hass)
+        programs, next_cursor = await hass.async_add_executor_job(
+            archive.query,
+            int(call.data["start"].timestamp()),
+            int(call.data["end"].timestamp()),
+            call.data.get("channel"),
+            call.data["limit"],
+            decode_cursor(call.data.get("cursor")),
+        )
+        return {"programs": programs, "next_cursor": encode_cursor(next_cursor)}
+
+    async def profile(call: ServiceCall) -> ServiceResponse:
+        """Profile Home Assistant and write a pstats file to the config dir."""
+        seconds = call.data["seconds"]
+        path = hass.config.path(f"{DOMAIN}_profile_{int(time.time())}.prof")
+        _LOGGER.warning("Profilování na %d s, výsledek: %s", seconds, path)
+        await async_profile(hass, seconds, path)
+        return {
+            "path": path,
+            "seconds": seconds,
+            "spans": get_entry_data(hass)["api"].tracer.as_dict(),
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY_ARCHIVE,
+        query_archive,
+        schema=QUERY_ARCHIVE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
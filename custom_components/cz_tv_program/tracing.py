@@ -0,0 +1,76 @@
+"""Update span timers (no Home Assistant imports, shared with the EPG server)."""
+
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from .const import TRACE_SAMPLE_EVERY
+
+
+class SpanTracer:
+    """Aggregated durations of update stages (fetch, parse, merge, fanout).
+
+    Spans only accumulate into statistics for diagnostics and the profile
+    service. With DEBUG logging enabled, every TRACE_SAMPLE_EVERY-th update
+    also logs its individual spans.
+    """
+
+    def __init__(
+        self, logger: logging.Logger, sample_every: int = TRACE_SAMPLE_EVERY
+    ) -> None:
+        """Initialize empty statistics."""
+        self._logger = logger
+        self._sample_every = sample_every
+        self._cycle = 0
+        self.sampled = False
+        self.spans: dict[str, dict[str, Any]] = {}
+        self.last_cycle: dict[str, float] = {}
+
+    def start_cycle(self) -> None:
+        """Start an update and decide whether it is traced to the DEBUG log."""
+        self._cycle += 1
+        self.last_cycle = {}
+        self.sampled = (
+            self._cycle - 1
+        ) % self._sample_every == 0 and self._logger.isEnabledFor(logging.DEBUG)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Measure the block and add its duration to span name."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - started) * 1000)
+
+    def record(self, name: str, duration_ms: float) -> None:
+        """Add an already measured duration (ms) to span name."""
+        stats = self.spans.get(name)
+        if stats is None:
+            stats = self.spans[name] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+        stats["count"] += 1
+        stats["total_ms"] += duration_ms
+        if duration_ms > stats["max_ms"]:
+            stats["max_ms"] = duration_ms
+        self.last_cycle[name] = self.last_cycle.get(name, 0.0) + duration_ms
+        if self.sampled:
+            self._logger.debug("Span %s: %.1f ms", name, duration_ms)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return span statistics for diagnostics and the profile service."""
+        return {
+            "last_cycle_ms": {
+                name: round(duration, 1) for name, duration in self.last_cycle.items()
+            },
+            "totals": {
+                name: {
+                    "count": stats["count"],
+                    "total_ms": round(stats["total_ms"], 1),
+                    "avg_ms": round(stats["total_ms"] / stats["count"], 1),
+                    "max_ms": round(stats["max_ms"], 1),
+                }
+                for name, stats in self.spans.items()
+            },
+        }
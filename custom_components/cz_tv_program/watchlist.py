@@ -0,0 +1,206 @@
+"""Watchlist matching over the fetched TV schedule."""
+
+import logging
+import unicodedata
+from collections import deque
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from typing import Any
+
+from .api import parse_program_datetime
+from .const import AVAILABLE_CHANNELS
+from .schedule import ScheduleIndex, SliceKey
+
+_LOGGER = logging.getLogger(__name__)
+
+MATCH_FIELDS = ("title", "supertitle", "episode_title", "description")
+
+
+def fold_text(text: str) -> str:
+    """Return text without diacritics and case for matching."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def parse_watchlist(value: str | list[str] | None) -> list[str]:
+    """Split the watchlist option into unique, non-empty patterns."""
+    if not value:
+        return []
+    lines = value.splitlines() if isinstance(value, str) else value
+    patterns: list[str] = []
+    for line in lines:
+        pattern = line.strip()
+        if pattern and pattern not in patterns:
+            patterns.append(pattern)
+    return patterns
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton matching many patterns in one pass over text."""
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        """Build the automaton."""
+        self.patterns = list(patterns)
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple[int, ...]] = [()]
+
+        for index, pattern in enumerate(self.patterns):
+            node = 0
+            for char in pattern:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                node = next_node
+            self._out[node] += (index,)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] += self._out[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterator[tuple[int, int]]:
+        """Yield (end_index, pattern_index) for every occurrence in text."""
+        node = 0
+        goto = self._goto
+        fail = self._fail
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index in self._out[node]:
+                yield position, index
+
+
+class WatchlistMatcher:
+    """Incrementally match watchlist patterns against schedule slices.
+
+    Only (channel, day) slices whose content changed since the previous
+    scan are searched again. A match is reported as new once, even when
+    its slice disappears for a scan (failed fetch) and comes back.
+    """
+
+    def __init__(self, patterns: list[str]) -> None:
+        """Initialize the matcher."""
+        self._fingerprints: dict[SliceKey, str] = {}
+        self._matches: dict[SliceKey, list[dict[str, Any]]] = {}
+        self._reported: set[tuple[str, str, str, str]] = set()
+        self.scanned_slices = 0
+        self.set_patterns(patterns)
+
+    def set_patterns(self, patterns: list[str]) -> None:
+        """Compile new patterns and force a full rescan."""
+        self.patterns = patterns
+        self._folded = [fold_text(pattern) for pattern in patterns]
+        self._automaton = AhoCorasick(self._folded) if patterns else None
+        self._fingerprints = {}
+
+    @property
+    def matches(self) -> list[dict[str, Any]]:
+        """Return all current matches ordered by start."""
+        matches = [match for items in self._matches.values() for match in items]
+        matches.sort(key=lambda match: match["start"])
+        return matches
+
+    def scan(self, index: ScheduleIndex) -> list[dict[str, Any]]:
+        """Scan changed slices and return matches not seen before."""
+        if self._automaton is None:
+            self._fingerprints = {}
+            self._matches = {}
+            self._reported = set()
+            return []
+
+        slices = index.slices
+        fingerprints = index.fingerprints
+        new_matches = []
+        self.scanned_slices = 0
+
+        for key, programs in slices.items():
+            if self._fingerprints.get(key) == fingerprints[key]:
+                continue
+            self.scanned_slices += 1
+            matches = [
+                match
+                for program in programs
+                if (match := self._match_program(key[0], program)) is not None
+            ]
+            self._matches[key] = matches
+            for match in matches:
+                report_key = _report_key(match)
+                if report_key not in self._reported:
+                    self._reported.add(report_key)
+                    new_matches.append(match)
+
+        for key in self._matches.keys() - slices.keys():
+            del self._matches[key]
+        self._fingerprints = fingerprints
+        # Nahlášené shody se zapomínají až po dnech, které z rozvrhu vypadly
+        # kvůli času - ne po kanálu, jehož stažení zrovna selhalo
+        if oldest := min((day for _, day in slices if day), default=None):
+            self._reported = {
+                key for key in self._reported if key[1] >= oldest
+            }
+
+        _LOGGER.debug(
+            "Watchlist: prohledáno %d z %d úseků, %d nových shod",
+            self.scanned_slices,
+            len(slices),
+            len(new_matches),
+        )
+        return new_matches
+
+    def _match_program(
+        self, channel_id: str, program: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """Return match details when any pattern occurs in the program."""
+        found: set[int] = set()
+        for field in MATCH_FIELDS:
+            if text := program.get(field):
+                found.update(self._search(fold_text(text)))
+        if not found:
+            return None
+
+        start = parse_program_datetime(program)
+        return {
+            "channel_id": channel_id,
+            "channel": AVAILABLE_CHANNELS.get(channel_id, channel_id),
+            "date": program.get("date", ""),
+            "time": program.get("time", ""),
+            "start": start.isoformat() if start else "",
+            "title": program.get("title", ""),
+            "supertitle": program.get("supertitle", ""),
+            "episode_title": program.get("episode_title", ""),
+            "patterns": [self.patterns[index] for index in sorted(found)],
+        }
+
+    def _search(self, text: str) -> Iterator[int]:
+        """Yield indexes of patterns occurring in text as whole words."""
+        for end, index in self._automaton.iter_matches(text):
+            start = end - len(self._folded[index]) + 1
+            if start > 0 and text[start - 1].isalnum():
+                continue
+            if end + 1 < len(text) and text[end + 1].isalnum():
+                continue
+            yield index
+
+
+def _report_key(match: dict[str, Any]) -> tuple[str, str, str, str]:
+    return match["channel_id"], match["date"], match["time"], match["title"]
+
+
+def upcoming_matches(
+    matches: list[dict[str, Any]], now: datetime
+) -> list[dict[str, Any]]:
+    """Return matches that have not started yet."""
+    now_str = now.isoformat()
+    return [match for match in matches if match["start"] > now_str]
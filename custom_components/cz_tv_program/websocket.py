@@ -0,0 +1,200 @@
+"""Websocket commands for Czech TV Program."""
+
+import logging
+from typing import Any
+
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .archive import decode_cursor, encode_cursor
+from .const import (
+    ARCHIVE_MAX_PAGE_SIZE,
+    ARCHIVE_PAGE_SIZE,
+    AVAILABLE_CHANNELS,
+    GRID_DEFAULT_HOURS,
+    GRID_DEFAULT_SLOT_MINUTES,
+    GRID_MAX_HOURS,
+)
+from .grid import async_get_grid
+from .services import get_archive, get_entry_data
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register websocket commands."""
+    websocket_api.async_register_command(hass, ws_query_archive)
+    websocket_api.async_register_command(hass, ws_grid)
+    websocket_api.async_register_command(hass, ws_schedule)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "cz_tv_program/archive/query",
+        vol.Required("start"): cv.datetime,
+        vol.Required("end"): cv.datetime,
+        vol.Optional("channel"): vol.In(AVAILABLE_CHANNELS),
+        vol.Optional("page_size", default=ARCHIVE_PAGE_SIZE): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=ARCHIVE_MAX_PAGE_SIZE)
+        ),
+        vol.Optional("max_pages", default=10): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=100)
+        ),
+        vol.Optional("cursor"): cv.string,
+    }
+)
+@websocket_api.async_response
+async def ws_query_archive(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Stream archived programs page by page as websocket events.
+
+    The last event of the stream has done set; its next_cursor continues
+    the query when max_pages ran out, and error is set when a page failed.
+    """
+    try:
+        archive = get_archive(hass)
+    except HomeAssistantError as err:
+        connection.send_error(msg["id"], "not_available", str(err))
+        return
+
+    connection.send_result(msg["id"])
+
+    start_ts = int(msg["start"].timestamp())
+    end_ts = int(msg["end"].timestamp())
+    cursor = decode_cursor(msg.get("cursor"))
+
+    for page in range(1, msg["max_pages"] + 1):
+        try:
+            programs, next_cursor = await hass.async_add_executor_job(
+                archive.query,
+                start_ts,
+                end_ts,
+                msg.get("channel"),
+                msg["page_size"],
+                cursor,
+            )
+        except Exception as err:  # noqa: BLE001 - klient musí dostat konec streamu
+            _LOGGER.error("Chyba při čtení archivu: %s", err)
+            connection.send_message(
+                websocket_api.event_message(
+                    msg["id"],
+                    {
+                        "programs": [],
+                        "next_cursor": encode_cursor(cursor),
+                        "done": True,
+                        "error": str(err),
+                    },
+                )
+            )
+            return
+
+        cursor = next_cursor
+        connection.send_message(
+            websocket_api.event_message(
+                msg["id"],
+                {
+                    "programs": programs,
+                    "next_cursor": encode_cursor(cursor),
+                    "done": cursor is None or page == msg["max_pages"],
+                },
+            )
+        )
+        if cursor is None:
+            break
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "cz_tv_program/grid",
+        vol.Optional("channels"): [vol.In(AVAILABLE_CHANNELS)],
+        vol.Optional("start"): cv.datetime,
+        vol.Optional("hours", default=GRID_DEFAULT_HOURS): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=GRID_MAX_HOURS)
+        ),
+        vol.Optional("slot_minutes", default=GRID_DEFAULT_SLOT_MINUTES): vol.All(
+            vol.Coerce(int), vol.Range(min=5, max=120)
+        ),
+        vol.Optional("etag"): cv.string,
+    }
+)
+@callback
+def ws_grid(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return the program grid, or only its ETag when it did not change."""
+    try:
+        etag, grid = async_get_grid(
+            hass,
+            msg.get("channels"),
+            msg.get("start"),
+            msg["hours"],
+            msg["slot_minutes"],
+        )
+    except HomeAssistantError as err:
+        connection.send_error(msg["id"], "not_available", str(err))
+        return
+
+    if msg.get("etag") == etag:
+        connection.send_result(msg["id"], {"etag": etag, "not_modified": True})
+        return
+    connection.send_result(msg["id"], grid)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "cz_tv_program/schedule",
+        vol.Required("channel"): vol.In(AVAILABLE_CHANNELS),
+        vol.Optional("version"): cv.string,
+    }
+)
+@callback
+def ws_schedule(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return the schedule of one channel by day, or only its version.
+
+    The card keeps the schedule in the browser and sends the version it
+    has; an unchanged schedule is answered with not_modified only.
+    """
+    channel_id = msg["channel"]
+    try:
+        index = get_entry_data(hass)["schedule"]
+    except HomeAssistantError as err:
+        connection.send_error(msg["id"], "not_available", str(err))
+        return
+
+    days = {
+        date: programs
+        for (slice_channel, date), programs in sorted(index.slices.items())
+        if slice_channel == channel_id and date
+    }
+    if not days:
+        connection.send_error(
+            msg["id"], "not_available", "Program kanálu ještě není načtený"
+        )
+        return
+
+    version = index.version([channel_id])
+    if msg.get("version") == version:
+        connection.send_result(msg["id"], {"version": version, "not_modified": True})
+        return
+    connection.send_result(
+        msg["id"],
+        {
+            "channel": channel_id,
+            "name": AVAILABLE_CHANNELS[channel_id],
+            "version": version,
+            "days": days,
+        },
+    )
@@ -0,0 +1,66 @@
+"""Circuit breaker pro stahování z Previo API."""
+from datetime import timedelta
+import time
+
+
+class CircuitBreaker:
+    """Po opakovaných chybách přestane Previo na čas volat.
+
+    - closed: stahuje se normálně, počítají se chyby po sobě
+    - open: po threshold chybách se nevolá, dokud neuplyne backoff
+      (exponenciálně roste s každým dalším otevřením, max. max_backoff)
+    - half_open: po uplynutí backoffu projde jeden zkušební požadavek;
+      úspěch breaker zavře, chyba ho znovu otevře s delším backoffem
+    """
+
+    def __init__(self, threshold, max_backoff):
+        self._threshold = threshold
+        self._max_backoff = max_backoff
+        self.state = "closed"
+        self.failures = 0
+        self.opened = 0
+        self._open_until = 0.0
+
+    def allow(self, now=None):
+        """Smí se teď volat API? Po uplynutí backoffu přejde do half_open."""
+        if self.state != "open":
+            return True
+        now = time.monotonic() if now is None else now
+        if now < self._open_until:
+            return False
+        self.state = "half_open"
+        return True
+
+    def retry_in(self, now=None):
+        """Kolik zbývá do zkušebního požadavku (timedelta)."""
+        now = time.monotonic() if now is None else now
+        return timedelta(seconds=max(0.0, self._open_until - now))
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self.opened = 0
+
+    def record_failure(self, interval, now=None):
+        """Zaznamenej chybu; vrací backoff, pokud se breaker otevřel, jinak None.
+
+        Backoff začíná na dvojnásobku běžného intervalu pollingu.
+        """
+        self.failures += 1
+        if self.state != "half_open" and self.failures < self._threshold:
+            return None
+        self.opened += 1
+        backoff = min(interval * 2 ** self.opened, self._max_backoff)
+        now = time.monotonic() if now is None else now
+        self._open_until = now + backoff.total_seconds()
+        self.state = "open"
+        return backoff
+
+    def as_dict(self):
+        """Stav pro diagnostiku."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.opened,
+            "retry_in_s": round(self.retry_in().total_seconds()) if self.state == "open" else 0,
+        }
@@ -0,0 +1,316 @@
+"""Detekce změn rezervací mezi stahováními a události životního cyklu."""
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    ARCHIVE_MAX_RECORDS,
+    CREDENTIAL_FIELDS,
+    DIFF_IGNORED_FIELDS,
+    DOMAIN,
+    EVENT_RESERVATION_CREATED,
+    EVENT_RESERVATION_REMOVED,
+    EVENT_RESERVATION_STATUS_CHANGED,
+    EVENT_RESERVATION_UPDATED,
+    SNAPSHOT_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from .model import Reservation
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def content_hash(content):
+    """Hash obsahu rezervace nezávislý na pořadí klíčů."""
+    return hashlib.blake2b(
+        json.dumps(content, sort_keys=True, default=str).encode(),
+        digest_size=16,
+    ).hexdigest()
+
+
+def without_credentials(content):
+    """Obsah rezervace bez PINů a klíčů (i v pobytech) pro snapshot a události."""
+    public = {key: value for key, value in content.items() if key not in CREDENTIAL_FIELDS}
+    if "stays" in content:
+        public["stays"] = [
+            {key: value for key, value in stay.items() if key not in CREDENTIAL_FIELDS}
+            for stay in content["stays"]
+        ]
+    return public
+
+
+def credentials_of(reservation):
+    """PINy a klíče po pobytech - pro detekci změny bez jejich ukládání."""
+    return tuple((stay.alfred_pins, stay.card_keys) for stay in reservation.stays)
+
+
+def compact_record(res_id, content):
+    """Kompaktní záznam ukončené rezervace pro archiv."""
+    return {
+        "res_id": res_id,
+        "voucher": content.get("voucher"),
+        "guest": content.get("guest"),
+        "rooms": content.get("rooms"),
+        "checkins": content.get("checkins"),
+        "checkouts": content.get("checkouts"),
+        "status_id": content.get("status_id"),
+        "price": content.get("price_numeric"),
+        "market_codes": content.get("market_codes"),
+    }
+
+
+class ReservationTracker:
+    """Porovnává po sobě jdoucí snapshoty rezervací jedním O(n) průchodem.
+
+    Předchozí snapshot se ukládá do HA storage, takže porovnání (a tedy
+    i události) funguje i přes restart. PINy a klíče se do snapshotu ani
+    do událostí nedostanou; jejich změna se pozná jen v paměti a událost
+    "updated" nese nanejvýš příznak credentials_changed.
+    """
+
+    def __init__(self, hass, entry_id, hotel_id):
+        self.hass = hass
+        self.entry_id = entry_id
+        self.hotel_id = hotel_id
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.snapshot")
+        self._snapshot = {}
+        self._hashes = {}
+        # Přístupové údaje z posledního stažení jen v paměti (po startu neznámé)
+        self._credentials = {}
+        self._last_changed = {}
+        # Rezervace, které zmizely z dat: res_id -> čas odebrání, check-out
+        # a kompaktní záznam (pro pozdější odstranění entity a archiv)
+        self.departed = {}
+        # Bez uloženého snapshotu by první stažení hlásilo vše jako nové
+        self._seeded = False
+        # Kdy byl snapshot naposledy uložen a kdy byla data naposledy úspěšně
+        # stažena (stáří dat obnovených po startu)
+        self.saved_at = None
+        self.last_success = None
+        self.changed_ids = set()
+        self.change_stats = {}
+
+    async def async_load(self):
+        """Načti snapshot uložený při posledním běhu."""
+        stored = await self._store.async_load()
+        if not stored:
+            return
+        # Snapshoty starších verzí obsahovaly PINy a klíče - při příštím
+        # uložení se přepíšou bez nich
+        self._snapshot = {
+            res_id: without_credentials(content)
+            for res_id, content in stored.get("reservations", {}).items()
+        }
+        self._last_changed = stored.get("last_changed", {})
+        self.departed = stored.get("departed", {})
+        if stored.get("saved_at"):
+            self.saved_at = datetime.fromisoformat(stored["saved_at"])
+        # Snapshoty starších verzí čas stažení neměly, ukládaly se hned po něm
+        if stored.get("last_success"):
+            self.last_success = datetime.fromisoformat(stored["last_success"])
+        else:
+            self.last_success = self.saved_at
+        self._hashes = {
+            res_id: content_hash(content) for res_id, content in self._snapshot.items()
+        }
+        self._seeded = True
+        _LOGGER.debug("Loaded snapshot with %d reservations", len(self._snapshot))
+
+    def restore(self):
+        """Rezervace z načteného snapshotu - data pro start bez volání API."""
+        data = {}
+        for res_id, content in self._snapshot.items():
+            try:
+                data[res_id] = Reservation.from_content(
+                    res_id, content, self._last_changed.get(res_id)
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                _LOGGER.warning("Rezervaci %s nelze obnovit ze snapshotu: %s", res_id, e)
+        return data
+
+    async def async_remove(self):
+        """Smaž uložený snapshot (při odebrání integrace)."""
+        await self._store.async_remove()
+
+    def update(self, data):
+        """Porovnej nová data se snapshotem, doplň last_updated a vyvolej události.
+
+        Entity zapisují stav jen pro rezervace v changed_ids a last_updated
+        odpovídá času skutečné změny, ne času stažení.
+        """
+        self.last_success = datetime.now()
+        now = self.last_success.isoformat()
+        previous_snapshot = self._snapshot
+        snapshot = {}
+        hashes = {}
+        credentials = {}
+        changed = set()
+        events = []
+        stats = {"changed": 0, "unchanged": 0, "new": 0, "removed": 0, "status_changed": 0}
+
+        for res_id, reservation in data.items():
+            content = without_credentials(reservation.content())
+            snapshot[res_id] = content
+            digest = hashes[res_id] = content_hash(content)
+            credentials[res_id] = credentials_of(reservation)
+            known_credentials = self._credentials.get(res_id)
+            credentials_changed = (
+                known_credentials is not None and known_credentials != credentials[res_id]
+            )
+
+            self.departed.pop(res_id, None)
+            previous = self._hashes.get(res_id)
+            if previous is None:
+                stats["new"] += 1
+                changed.add(res_id)
+                events.append((EVENT_RESERVATION_CREATED, res_id, {"reservation": content}))
+            elif previous != digest or credentials_changed:
+                stats["changed"] += 1
+                changed.add(res_id)
+                if previous_snapshot.get(res_id, {}).get("status_id") != reservation.status_id:
+                    stats["status_changed"] += 1
+                events.extend(
+                    self._diff_events(
+                        res_id, previous_snapshot.get(res_id, {}), content, credentials_changed
+                    )
+                )
+            else:
+                stats["unchanged"] += 1
+                reservation.last_updated = self._last_changed.get(res_id, now)
+                if known_credentials is None and any(
+                    pins or keys for pins, keys in credentials[res_id]
+                ):
+                    # Po startu ze snapshotu (bez PINů) je třeba údaje promítnout
+                    changed.add(res_id)
+
+        for res_id, content in previous_snapshot.items():
+            if res_id not in snapshot:
+                stats["removed"] += 1
+                self.mark_departed(res_id, content, now)
+                events.append(
+                    (EVENT_RESERVATION_REMOVED, res_id, {"reservation": content})
+                )
+
+        self._snapshot = snapshot
+        self._hashes = hashes
+        self._credentials = credentials
+        self._last_changed = {
+            res_id: reservation.last_updated for res_id, reservation in data.items()
+        }
+        self.changed_ids = changed
+        self.change_stats = stats
+        _LOGGER.debug(
+            "Changes: %d changed, %d unchanged, %d new, %d removed",
+            stats["changed"], stats["unchanged"], stats["new"], stats["removed"],
+        )
+
+        if self._seeded:
+            for event_type, res_id, event_data in events:
+                self.hass.bus.async_fire(
+                    event_type,
+                    {
+                        "entry_id": self.entry_id,
+                        "hotel_id": self.hotel_id,
+                        "res_id": res_id,
+                        **event_data,
+                    },
+                )
+        self._seeded = True
+        self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+
+    def mark_departed(self, res_id, content, now=None):
+        """Zapamatuj si rezervaci, která už není v datech z API."""
+        checkouts = [stay["to"] for stay in content.get("stays", ()) if stay.get("to")]
+        self.departed[res_id] = {
+            "removed_at": now or datetime.now().isoformat(),
+            # ISO čas posledního check-outu (nezávislý na locale zobrazení)
+            "checkout_at": max(checkouts) if checkouts else None,
+            "record": compact_record(res_id, content),
+        }
+
+    def expired(self, retention_days, now=None):
+        """Vrať res_id odebraných rezervací, jejichž retence vypršela.
+
+        Retence se počítá od posledního check-outu, případně od chvíle,
+        kdy rezervace zmizela z dat (i u záznamů starších verzí, které
+        check-out uchovávaly jen jako zobrazovaný text).
+        """
+        now = now or datetime.now()
+        expired = []
+        for res_id, info in self.departed.items():
+            since = datetime.fromisoformat(info.get("checkout_at") or info["removed_at"])
+            if now >= since + timedelta(days=retention_days):
+                expired.append(res_id)
+        return expired
+
+    def forget(self, res_ids):
+        """Vyřaď rezervace po odstranění jejich entit a vrať jejich záznamy."""
+        records = [self.departed.pop(res_id)["record"] for res_id in res_ids]
+        self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+        return records
+
+    @staticmethod
+    def _diff_events(res_id, old, new, credentials_changed=False):
+        """Události pro změněnou rezervaci - jen se změněnými poli.
+
+        Přístupové údaje v událostech nejsou (skončily by v recorderu),
+        jejich změnu hlásí jen příznak credentials_changed.
+        """
+        events = []
+        if old.get("status_id") != new.get("status_id"):
+            events.append((
+                EVENT_RESERVATION_STATUS_CHANGED,
+                res_id,
+                {
+                    "voucher": new.get("voucher"),
+                    "old_status_id": old.get("status_id"),
+                    "new_status_id": new.get("status_id"),
+                    "old_status": old.get("status_name_en"),
+                    "new_status": new.get("status_name_en"),
+                },
+            ))
+
+        changes = {
+            field: {"old": old.get(field), "new": value}
+            for field, value in new.items()
+            if field not in DIFF_IGNORED_FIELDS and old.get(field) != value
+        }
+        if changes or credentials_changed:
+            event_data = {"voucher": new.get("voucher"), "changes": changes}
+            if credentials_changed:
+                event_data["credentials_changed"] = True
+            events.append((EVENT_RESERVATION_UPDATED, res_id, event_data))
+        return events
+
+    def _data_to_save(self):
+        """Data snapshotu pro HA storage."""
+        return {
+            "reservations": self._snapshot,
+            "last_changed": self._last_changed,
+            "departed": self.departed,
+            "saved_at": datetime.now().isoformat(),
+            "last_success": self.last_success.isoformat() if self.last_success else None,
+        }
+
+
+class ReservationArchive:
+    """Kompaktní lokální archiv ukončených rezervací (HA storage)."""
+
+    def __init__(self, hass, entry_id):
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.archive")
+        self._records = None
+
+    async def async_append(self, records):
+        """Přidej záznamy; nejstarší se zahodí nad ARCHIVE_MAX_RECORDS."""
+        if self._records is None:
+            self._records = (await self._store.async_load() or {}).get("records", [])
+        self._records.extend(records)
+        del self._records[:-ARCHIVE_MAX_RECORDS]
+        self._store.async_delay_save(lambda: {"records": self._records}, SNAPSHOT_SAVE_DELAY)
+
+    async def async_remove(self):
+        """Smaž archiv (při odebrání integrace)."""
+        await self._store.async_remove()
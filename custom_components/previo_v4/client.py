@@ -1,58 +1,95 @@
+"""Transport pro Previo XML API - dotaz searchReservations po stránkách."""
 import logging
-import xml.etree.ElementTree as ET
-from aiohttp import ClientSession
+import time
+from xml.sax.saxutils import escape
+
+from .const import API_URL, READ_CHUNK_SIZE
+from .parser import ReservationStreamParser
 
 _LOGGER = logging.getLogger(__name__)
 
+# Podle oficiální Previo API dokumentace:
+# cosId: 1=Option, 2=Confirmed, 3=Checked in, 6=Waiting list,
+#        7=Cancelled, 8=No-show, 9=Checked out, 10=Other
+PAYLOAD_HEAD = """<?xml version="1.0"?>
+<request>
+    <login>{login}</login>
+    <password>{password}</password>
+    <hotId>{hotel_id}</hotId>
+"""
+
+PAYLOAD_TERM = """    <term>
+        <from>{date_from}</from>
+        <to>{date_to}</to>
+    </term>
+"""
+
+PAYLOAD_STATUSES = """    <statuses>
+        <cosId>1</cosId>
+        <cosId>2</cosId>
+        <cosId>3</cosId>
+        <cosId>6</cosId>
+        <cosId>7</cosId>
+        <cosId>8</cosId>
+        <cosId>9</cosId>
+        <cosId>10</cosId>
+    </statuses>
+"""
+
+PAYLOAD_LIMIT = """    <limit><offset>{offset}</offset><limit>{limit}</limit></limit>
+</request>"""
+
+HEADERS = {"Content-Type": "application/xml"}
+
+
 class PrevioClient:
-    def __init__(self, session: ClientSession, url: str, login: str, password: str, hotel_id: str):
+    """Stahuje stránky rezervací přes sdílenou HTTP session HA.
+
+    Část dotazu s přihlašovacími údaji se sestaví jednou; pro každou
+    stránku se doplní jen termín a offset. Odpověď se parsuje průběžně,
+    jak přichází.
+    """
+
+    def __init__(self, session, login, password, hotel_id, limiter):
         self._session = session
-        self._url = url
-        self._login = login
-        self._password = password
-        self._hotel_id = hotel_id
-
-    async def get_data(self):
-        payload = f"""<?xml version="1.0" encoding="UTF-8"?>
-        <request>
-            <credentials>
-                <login>{self._login}</login>
-                <password>{self._password}</password>
-            </credentials>
-            <data>
-                <hotId>{self._hotel_id}</hotId>
-            </data>
-        </request>
-        """
+        # Globální limit souběžných požadavků (sdílený všemi hotely)
+        self._limiter = limiter
+        self._head = PAYLOAD_HEAD.format(
+            login=escape(login),
+            password=escape(password),
+            hotel_id=escape(str(hotel_id)),
+        )
 
-        headers = {
-            "Content-Type": "application/xml"
-        }
-
-        async with self._session.post(self._url, data=payload, headers=headers) as response:
-            response_text = await response.text()
-            return self._parse_response(response_text)
-
-    def _parse_response(self, xml_string):
-        root = ET.fromstring(xml_string)
-        reservations = []
-
-        for res in root.findall(".//reservation"):
-            try:
-                reservation_id = res.findtext("id")
-                voucher = res.findtext("voucher") or ""
-                room = res.findtext("room") or ""
-                checkin = res.findtext("checkIn") or ""
-                checkout = res.findtext("checkOut") or ""
-
-                reservations.append({
-                    "id": reservation_id,
-                    "voucher": voucher,
-                    "room": room,
-                    "checkin": checkin,
-                    "checkout": checkout,
-                })
-            except Exception as e:
-                _LOGGER.error(f"Failed to parse reservation: {e}")
-
-        return reservations
+    def build_payload(self, date_from, date_to, offset, limit):
+        """XML dotaz pro jednu stránku (data ve formátu YYYY-MM-DD)."""
+        return (
+            self._head
+            + PAYLOAD_TERM.format(date_from=date_from, date_to=date_to)
+            + PAYLOAD_STATUSES
+            + PAYLOAD_LIMIT.format(offset=offset, limit=limit)
+        )
+
+    async def async_fetch_page(self, page, page_size, date_from, date_to, builder):
+        """Stáhni stránku a předávej její rezervace builderu.
+
+        Vrací (počet rezervací na stránce, celkový počet nahlášený API nebo
+        None, velikost odpovědi v bajtech, čas parsování v ms).
+        """
+        parser = ReservationStreamParser(page, builder)
+        size = 0
+        parse_time = 0.0
+        async with self._limiter, self._session.post(
+            API_URL,
+            data=self.build_payload(date_from, date_to, page * page_size, page_size),
+            headers=HEADERS,
+        ) as resp:
+            resp.raise_for_status()
+            async for chunk in resp.content.iter_chunked(READ_CHUNK_SIZE):
+                size += len(chunk)
+                started = time.perf_counter()
+                parser.feed(chunk)
+                parse_time += time.perf_counter() - started
+        started = time.perf_counter()
+        count, total = parser.close()
+        parse_time += time.perf_counter() - started
+        return count, total, size, parse_time * 1000
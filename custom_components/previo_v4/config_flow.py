@@ -3,7 +3,20 @@ from homeassistant.core import callback
 import voluptuous as vol
 from typing import Any, Dict, Optional
 
-from .const import DOMAIN
+from .const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_ARCHIVE_REMOVED,
+    CONF_DAYS_AHEAD,
+    CONF_EXPOSE_CREDENTIALS,
+    CONF_RETENTION_DAYS,
+    CONF_UPDATE_INTERVAL,
+    CONF_VERBOSE_LOGGING,
+    DEFAULT_DAYS_AHEAD,
+    DEFAULT_EXPOSE_CREDENTIALS,
+    DEFAULT_RETENTION_DAYS,
+    DEFAULT_UPDATE_INTERVAL,
+    DOMAIN,
+)
 
 DATA_SCHEMA = vol.Schema({
     vol.Required("login"): str,
@@ -70,13 +83,33 @@ class PrevioV4OptionsFlow(config_entries.OptionsFlow):
         
         options_schema = vol.Schema({
             vol.Optional(
-                "update_interval", 
-                default=self.config_entry.options.get("update_interval", 15)
+                CONF_UPDATE_INTERVAL,
+                default=self.config_entry.options.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
             ): vol.All(vol.Coerce(int), vol.Range(min=5, max=60)),
             vol.Optional(
-                "days_ahead", 
-                default=self.config_entry.options.get("days_ahead", 30)
+                CONF_DAYS_AHEAD,
+                default=self.config_entry.options.get(CONF_DAYS_AHEAD, DEFAULT_DAYS_AHEAD)
             ): vol.All(vol.Coerce(int), vol.Range(min=1, max=90)),
+            vol.Optional(
+                CONF_ADAPTIVE_POLLING,
+                default=self.config_entry.options.get(CONF_ADAPTIVE_POLLING, False)
+            ): bool,
+            vol.Optional(
+                CONF_RETENTION_DAYS,
+                default=self.config_entry.options.get(CONF_RETENTION_DAYS, DEFAULT_RETENTION_DAYS)
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=365)),
+            vol.Optional(
+                CONF_ARCHIVE_REMOVED,
+                default=self.config_entry.options.get(CONF_ARCHIVE_REMOVED, False)
+            ): bool,
+            vol.Optional(
+                CONF_EXPOSE_CREDENTIALS,
+                default=self.config_entry.options.get(CONF_EXPOSE_CREDENTIALS, DEFAULT_EXPOSE_CREDENTIALS)
+            ): bool,
+            vol.Optional(
+                CONF_VERBOSE_LOGGING,
+                default=self.config_entry.options.get(CONF_VERBOSE_LOGGING, False)
+            ): bool,
         })
         
         return self.async_show_form(
@@ -84,6 +117,11 @@ class PrevioV4OptionsFlow(config_entries.OptionsFlow):
             data_schema=options_schema,
             description_placeholders={
                 "update_interval": "Interval aktualizace v minutách (5-60)",
-                "days_ahead": "Počet dní dopředu pro načítání rezervací (1-90)"
+                "days_ahead": "Počet dní dopředu pro načítání rezervací (1-90)",
+                "adaptive_polling": "Adaptivní polling (častěji před check-inem/outem, méně v noci)",
+                "retention_days": "Po kolika dnech od check-outu odstranit entitu rezervace (0-365)",
+                "archive_removed": "Archivovat odstraněné rezervace do lokálního úložiště",
+                "expose_credentials": "Zobrazovat PINy a klíče v atributech entit rezervací",
+                "verbose_logging": "Podrobné logování každé aktualizace na úrovni INFO"
             }
         )
\ No newline at end of file
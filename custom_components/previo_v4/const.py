@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 DOMAIN = "previo_v4"
 
 # Status mapping podle oficiální Previo API dokumentace
@@ -27,4 +29,88 @@ STATUS_MAPPING_CZ = {
 
 # Výchozí hodnoty
 DEFAULT_UPDATE_INTERVAL = 15  # minut
-DEFAULT_DAYS_AHEAD = 30       # dní
\ No newline at end of file
+DEFAULT_DAYS_AHEAD = 30       # dní
+
+# Možnosti (options flow)
+CONF_UPDATE_INTERVAL = "update_interval"
+CONF_DAYS_AHEAD = "days_ahead"
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_VERBOSE_LOGGING = "verbose_logging"
+
+# Adaptivní polling
+ADAPTIVE_BUSY_WINDOW = timedelta(hours=2)         # před check-inem/check-outem
+ADAPTIVE_BUSY_INTERVAL = timedelta(minutes=5)
+ADAPTIVE_NIGHT_END_HOUR = 6                       # noc = 0:00 - 6:00
+ADAPTIVE_NIGHT_INTERVAL = timedelta(minutes=60)
+ADAPTIVE_FOLLOW_UP_INTERVAL = timedelta(minutes=2)  # po změně statusu
+
+# Previo XML API
+API_URL = "https://api.previo.app/x1/hotel/searchReservations"
+PAGE_SIZE = 50           # rezervací na stránku
+PAGE_CONCURRENCY = 4     # souběžně stahovaných stránek
+MAX_PAGES = 100          # pojistka při stránkování bez celkového počtu
+READ_CHUNK_SIZE = 64 * 1024  # bajtů odpovědi na jedno krmení parseru
+
+# Circuit breaker - po opakovaných chybách se Previo na čas nevolá
+BREAKER_FAILURE_THRESHOLD = 3                 # chyb po sobě
+BREAKER_MAX_BACKOFF = timedelta(hours=2)
+
+# Více hotelů (config entries) v jedné instanci HA
+DATA_HUB = f"{DOMAIN}_hub"
+GLOBAL_CONCURRENCY = 6   # souběžných požadavků na Previo přes všechny hotely
+
+# Trasování a profilování
+TRACE_SAMPLE_EVERY = 10        # DEBUG trasování každé n-té aktualizace
+PROFILE_DEFAULT_SECONDS = 60
+PROFILE_MAX_SECONDS = 600
+
+# Snapshot rezervací v HA storage
+STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 30  # sekund
+
+# Události životního cyklu rezervací
+EVENT_RESERVATION_CREATED = f"{DOMAIN}_reservation_created"
+EVENT_RESERVATION_UPDATED = f"{DOMAIN}_reservation_updated"
+EVENT_RESERVATION_STATUS_CHANGED = f"{DOMAIN}_reservation_status_changed"
+EVENT_RESERVATION_REMOVED = f"{DOMAIN}_reservation_removed"
+
+# Pole, která se v událostech "updated" nehlásí - odvozené hodnoty
+# a status (ten má vlastní událost "status_changed")
+DIFF_IGNORED_FIELDS = {
+    "status_id",
+    "status_name",
+    "status_name_en",
+    "status_name_cz",
+    "days_until_checkin",
+    "price",
+    "price_formatted",
+    "room",
+    "alfred_pin",
+    "alfred_pins",
+    "card_key",
+    "card_keys",
+    "com_id",
+    "checkin",
+    "checkout",
+    "market_codes_text",
+    "stays",
+}
+
+# Životnost entit ukončených rezervací
+CONF_RETENTION_DAYS = "retention_days"
+CONF_ARCHIVE_REMOVED = "archive_removed"
+DEFAULT_RETENTION_DAYS = 3     # dní po check-outu
+ARCHIVE_MAX_RECORDS = 10000
+
+# Formát zobrazovaných časů check-in/out
+DISPLAY_DATETIME_FORMAT = "%B %d, %Y at %I:%M:%S %p"
+
+# Obsazenost pokojů - zrušené rezervace a no-show pokoj neblokují
+INACTIVE_STATUS_IDS = {"7", "8"}
+
+# Přístupové údaje (Alfred PIN, card key)
+CONF_EXPOSE_CREDENTIALS = "expose_credentials"
+# Pole s PINy a klíči - nikdy nejdou do událostí, recorderu ani do snapshotu
+CREDENTIAL_FIELDS = frozenset({"alfred_pin", "alfred_pins", "card_key", "card_keys"})
+DEFAULT_EXPOSE_CREDENTIALS = False  # atributy entit jen na vyžádání, jinak get_credentials
+CREDENTIALS_EXCLUDED_STATUS_IDS = INACTIVE_STATUS_IDS | {"9"}   # + odhlášen
@@ -1,33 +1,373 @@
+"""Koordinátor Previo v4 - jediný zdroj dat pro všechny platformy."""
+import asyncio
+from datetime import datetime, timedelta
 import logging
-from datetime import timedelta
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+import time
+
+from defusedxml.ElementTree import ParseError
+from homeassistant.core import callback
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .breaker import CircuitBreaker
+from .changes import ReservationTracker
 from .client import PrevioClient
+from .const import (
+    ADAPTIVE_BUSY_INTERVAL,
+    ADAPTIVE_BUSY_WINDOW,
+    ADAPTIVE_FOLLOW_UP_INTERVAL,
+    ADAPTIVE_NIGHT_END_HOUR,
+    ADAPTIVE_NIGHT_INTERVAL,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_MAX_BACKOFF,
+    CONF_ADAPTIVE_POLLING,
+    CONF_DAYS_AHEAD,
+    CONF_UPDATE_INTERVAL,
+    CONF_VERBOSE_LOGGING,
+    DEFAULT_DAYS_AHEAD,
+    DEFAULT_UPDATE_INTERVAL,
+    DOMAIN,
+    MAX_PAGES,
+    PAGE_CONCURRENCY,
+    PAGE_SIZE,
+)
+from .credentials import CredentialIndex
+from .hub import async_get_hub
+from .occupancy import OccupancyIndex
+from .parser import ReservationBuilder
+from .profiling import SpanTracer
 
 _LOGGER = logging.getLogger(__name__)
 
-class PrevioDataUpdateCoordinator(DataUpdateCoordinator):
-    def __init__(self, hass, entry):
-        self.hass = hass
-        self.url = entry.data["url"]
-        self.login = entry.data["login"]
-        self.password = entry.data["password"]
-        self.hotel_id = entry.data["hotel_id"]
 
-        self.client = PrevioClient(
-            session=async_get_clientsession(hass),
-            url=self.url,
-            login=self.login,
-            password=self.password,
-            hotel_id=self.hotel_id
-        )
+class PrevioCoordinator(DataUpdateCoordinator):
+    """Stahuje rezervace hotelu (klient), skládá je (parser) a drží indexy.
 
+    Vytváří se jednou pro config entry v __init__ a platformy ho sdílejí
+    přes hass.data.
+    """
+
+    def __init__(self, hass, config_entry):
         super().__init__(
             hass,
             _LOGGER,
-            name="Previo v4",
-            update_interval=timedelta(minutes=15),
+            name=DOMAIN,
+            update_interval=timedelta(
+                minutes=config_entry.options.get(
+                    CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL
+                )
+            ),
+        )
+        self.config_entry = config_entry
+        self.fetch_stats = {}
+        # Počty neúspěšných stažení od startu (pro diagnostiku)
+        self.error_counts = {"xml": 0, "request": 0}
+        self.poll_mode = "normal"
+        self.occupancy = OccupancyIndex({})
+        self.credentials = CredentialIndex()
+        # Stale-while-revalidate: při chybě zůstávají poslední platná data
+        self.breaker = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_MAX_BACKOFF)
+        self.data_as_of = None
+        # Data jsou ze snapshotu a ještě se nepodařilo stáhnout živá
+        self.restored = False
+        # Časy úseků aktualizace a volitelné podrobné logy
+        self.tracer = SpanTracer(_LOGGER)
+        self.tracer.verbose = config_entry.options.get(CONF_VERBOSE_LOGGING, False)
+        # Detekce změn mezi stahováními a události životního cyklu
+        self.tracker = ReservationTracker(
+            hass, config_entry.entry_id, config_entry.data["hotel_id"]
         )
+        # Jeden klient nad sdílenou HTTP session HA (znovupoužití spojení),
+        # požadavky všech hotelů omezuje společný limit z hubu
+        self.hub = async_get_hub(hass)
+        self.client = PrevioClient(
+            async_get_clientsession(hass),
+            config_entry.data["login"],
+            config_entry.data["password"],
+            config_entry.data["hotel_id"],
+            self.hub.limiter,
+        )
+
+    @callback
+    def async_restore(self):
+        """Naplň data ze snapshotu z posledního běhu, bez volání API.
+
+        Entity tak vzniknou hned při startu HA a živá data se do nich
+        promítnou po prvním stažení na pozadí. Do té doby jsou data
+        zastaralá (stale) a data_as_of je čas posledního úspěšného stažení
+        před restartem. Vrací počet rezervací.
+        """
+        data = self.tracker.restore()
+        if not data:
+            return 0
+        self.data = data
+        self.restored = True
+        self.data_as_of = self.tracker.last_success
+        self.occupancy = OccupancyIndex(data)
+        self.credentials.update(data, data.keys())
+        return len(data)
+
+    def _term(self):
+        """Termín dotazu: od dneška na days_ahead dní dopředu."""
+        today = datetime.now()
+        to_date = today + timedelta(
+            days=self.config_entry.options.get(CONF_DAYS_AHEAD, DEFAULT_DAYS_AHEAD)
+        )
+        return today.strftime("%Y-%m-%d"), to_date.strftime("%Y-%m-%d")
+
+    async def _fetch_page(self, page, term, builder):
+        """Stáhni a průběžně rozparsuj jednu stránku výsledků, změř latenci.
+
+        Vrací (stránka, počet rezervací na stránce, celkový počet nahlášený
+        API nebo None).
+        """
+        started = time.monotonic()
+        with self.tracer.span("fetch"):
+            count, total, size, parse_ms = await self.client.async_fetch_page(
+                page, PAGE_SIZE, *term, builder
+            )
+        self.tracer.record("parse", parse_ms)
+        latency_ms = round((time.monotonic() - started) * 1000)
+        self.fetch_stats["page_latency_ms"].append(latency_ms)
+        self.tracer.detail(
+            "Previo response received (page %d), length: %d, %d reservations, %d ms",
+            page, size, count, latency_ms,
+        )
+        return page, count, total
 
     async def _async_update_data(self):
-        return await self.client.get_data()
\ No newline at end of file
+        """Stáhni a rozparsoj XML z Previa (všechny stránky)."""
+        self.tracer.start_cycle()
+        self.tracer.detail("=== STARTING DATA UPDATE ===")
+
+        hotel_id = self.config_entry.data["hotel_id"]
+        term = self._term()
+        started = time.monotonic()
+        self.fetch_stats = {"pages": 0, "page_latency_ms": [], "total_reported": None}
+
+        # Rezervace se seskupují podle resId průběžně během parsování
+        builder = ReservationBuilder(
+            hotel_id, self.tracer.detail if self.tracer.detailed else None
+        )
+
+        if not self.breaker.allow():
+            self.update_interval = max(self.breaker.retry_in(), timedelta(seconds=1))
+            raise UpdateFailed(
+                f"Previo API je po {self.breaker.failures} chybách vypnuté, "
+                f"další pokus za {round(self.breaker.retry_in().total_seconds())} s"
+            )
+
+        try:
+            # První stránka - zjistí celkový počet rezervací
+            _, count, total = await self._fetch_page(0, term, builder)
+        except Exception as e:
+            raise self._failed(e) from e
+        self.fetch_stats["pages"] = 1
+        self.fetch_stats["total_reported"] = total
+
+        # Chyba další stránky nezahodí stránky, které prošly
+        failed_pages = {}
+        counts = {0: count}
+        page = 0
+        if total is not None and total > PAGE_SIZE:
+            # Zbývající stránky podle nahlášeného počtu paralelně s omezeným
+            # počtem požadavků, každá se zpracuje hned, jak dorazí
+            semaphore = asyncio.Semaphore(PAGE_CONCURRENCY)
+
+            async def fetch_limited(page):
+                async with semaphore:
+                    return await self._fetch_page(page, term, builder)
+
+            pages = range(1, min(-(-total // PAGE_SIZE), MAX_PAGES))
+            results = await asyncio.gather(
+                *(fetch_limited(page) for page in pages), return_exceptions=True
+            )
+            for page, result in zip(pages, results):
+                if isinstance(result, Exception):
+                    failed_pages[page] = result
+                else:
+                    counts[page] = result[1]
+                    self.fetch_stats["pages"] += 1
+
+        # Formát celkového počtu API nedokumentuje (může to být i počet na
+        # stránce), proto se stránkuje dál, dokud je poslední stránka plná
+        while counts.get(page, 0) >= PAGE_SIZE and page + 1 < MAX_PAGES:
+            page += 1
+            try:
+                _, counts[page], _ = await self._fetch_page(page, term, builder)
+            except Exception as e:
+                failed_pages[page] = e
+                break
+            self.fetch_stats["pages"] += 1
+
+        rows = sum(counts.values())
+        self.fetch_stats["rows"] = rows
+        if total is not None and not failed_pages and rows != total:
+            _LOGGER.warning(
+                "Previo nahlásilo %d rezervací, stránky jich obsahovaly %d", total, rows
+            )
+
+        self.fetch_stats["total_ms"] = round((time.monotonic() - started) * 1000)
+        self.fetch_stats["parse_errors"] = builder.failed
+        self.fetch_stats["failed_pages"] = len(failed_pages)
+        self.tracer.detail(
+            "Grouped into %d unique reservations from %d page(s) in %d ms",
+            len(builder),
+            self.fetch_stats["pages"],
+            self.fetch_stats["total_ms"],
+        )
+
+        with self.tracer.span("build"):
+            if failed_pages:
+                data = self._merge_partial(builder, failed_pages)
+            else:
+                data = builder.build()
+
+        self.tracer.detail("Final data: %d reservations processed", len(data))
+        with self.tracer.span("merge"):
+            self.tracker.update(data)
+            self._update_occupancy(data)
+            self.credentials.update(data, self.tracker.changed_ids)
+        self.hub.record(hotel_id, self.fetch_stats)
+        self.breaker.record_success()
+        self.restored = False
+        self.data_as_of = self.tracker.last_success
+        self.update_interval = self._next_update_interval(data)
+        return data
+
+    def _failed(self, err):
+        """Započítej chybu stažení a vrať UpdateFailed.
+
+        Poslední platná data zůstávají v self.data (entity zůstanou
+        dostupné jako zastaralá); po opakovaných chybách se breaker otevře
+        a další pokus se odloží s exponenciálním backoffem.
+        """
+        self.error_counts["xml" if isinstance(err, ParseError) else "request"] += 1
+        backoff = self.breaker.record_failure(self._base_interval())
+        if backoff is not None:
+            self.poll_mode = "backoff"
+            self.update_interval = backoff
+            _LOGGER.warning(
+                "Previo API selhalo %d× po sobě, další pokus za %s",
+                self.breaker.failures, backoff,
+            )
+        if isinstance(err, ParseError):
+            return UpdateFailed(f"Chyba při parsování XML: {err}")
+        return UpdateFailed(f"Chyba při volání Previa: {err}")
+
+    def _merge_partial(self, builder, failed_pages):
+        """Data z neúplného stažení doplněná o předchozí verze rezervací.
+
+        Rezervace z chybějících stránek nejsou v odpovědi, proto zůstanou
+        v předchozí podobě (neoznačí se jako odebrané). Stejně tak
+        rezervace na hranici chybějící stránky, u kterých by mohla chybět
+        část pokojů.
+        """
+        for page in failed_pages:
+            builder.discard_page(page)
+        incomplete = builder.incomplete(failed_pages)
+        fresh = builder.build()
+        previous = self.data or {}
+        _LOGGER.warning(
+            "Previo: %d page(s) failed (%s), keeping previous data for missing reservations",
+            len(failed_pages),
+            "; ".join(f"{page}: {err}" for page, err in sorted(failed_pages.items())),
+        )
+
+        data = dict(previous)
+        for res_id, reservation in fresh.items():
+            if res_id in incomplete and res_id in previous:
+                continue
+            data[res_id] = reservation
+        return data
+
+    @property
+    def stale(self):
+        """Poslouží se zastaralými daty (ze snapshotu nebo po chybě stažení)?"""
+        if self.data is None:
+            return False
+        return self.restored or not self.last_update_success
+
+    def _update_occupancy(self, data):
+        """Přestav index obsazenosti a zaloguj nově nalezené double-bookingy."""
+        known = {
+            (conflict["room"], *conflict["res_ids"]) for conflict in self.occupancy.conflicts
+        }
+        self.occupancy = OccupancyIndex(data)
+        for conflict in self.occupancy.conflicts:
+            if (conflict["room"], *conflict["res_ids"]) not in known:
+                _LOGGER.warning(
+                    "Double booking in room %s: reservations %s overlap %s - %s",
+                    conflict["room"], " a ".join(conflict["res_ids"]),
+                    conflict["from"], conflict["to"],
+                )
+
+    def _base_interval(self):
+        """Běžný interval pollingu z možností."""
+        return timedelta(
+            minutes=self.config_entry.options.get(
+                CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL
+            )
+        )
+
+    def _next_update_interval(self, data):
+        """Interval do dalšího stažení podle nastavení a aktuálních dat.
+
+        V adaptivním režimu se polluje častěji před nejbližším check-inem
+        nebo check-outem, méně v noci a hned po změně statusu se stahuje
+        znovu, aby se navazující změny z recepce projevily co nejdřív.
+        Běžný a noční interval se zarovná na fázi hotelu z hubu, aby více
+        hotelů nestahovalo ve stejnou chvíli.
+        """
+        options = self.config_entry.options
+        base = self._base_interval()
+        if not options.get(CONF_ADAPTIVE_POLLING, False):
+            self.poll_mode = "normal"
+            return self.hub.phase_delay(self.config_entry.entry_id, base)
+
+        now = datetime.now()
+        if self.tracker.change_stats.get("status_changed"):
+            self.poll_mode = "follow_up"
+            return ADAPTIVE_FOLLOW_UP_INTERVAL
+
+        window_end = now + ADAPTIVE_BUSY_WINDOW
+        for reservation in data.values():
+            for stay in reservation.stays:
+                if any(
+                    moment and now <= moment <= window_end
+                    for moment in (stay.checkin, stay.checkout)
+                ):
+                    self.poll_mode = "busy"
+                    return min(base, ADAPTIVE_BUSY_INTERVAL)
+
+        if now.hour < ADAPTIVE_NIGHT_END_HOUR:
+            self.poll_mode = "night"
+            return self.hub.phase_delay(
+                self.config_entry.entry_id, max(base, ADAPTIVE_NIGHT_INTERVAL)
+            )
+
+        self.poll_mode = "normal"
+        return self.hub.phase_delay(self.config_entry.entry_id, base)
+
+    @callback
+    def async_update_listeners(self):
+        """Rozešli nová data entitám a změř, kolik to stojí."""
+        with self.tracer.span("fanout"):
+            super().async_update_listeners()
+
+    @callback
+    def async_apply_options(self):
+        """Použij změněné možnosti bez reloadu integrace."""
+        self.tracer.verbose = self.config_entry.options.get(CONF_VERBOSE_LOGGING, False)
+        if self.breaker.state == "closed":
+            self.update_interval = self._base_interval()
+
+    @property
+    def changed_ids(self):
+        """Rezervace nové nebo změněné při posledním stažení."""
+        return self.tracker.changed_ids
+
+    @property
+    def change_stats(self):
+        """Počty změněných/nezměněných/nových/odebraných rezervací."""
+        return self.tracker.change_stats
@@ -0,0 +1,98 @@
+"""Přístupové údaje (Alfred PIN, card key) po pokojích pro automatizace zámků."""
+from bisect import bisect_right
+from collections import defaultdict
+
+from .const import CREDENTIALS_EXCLUDED_STATUS_IDS
+
+
+class CredentialIndex:
+    """Mapa pokoj -> časově omezené přístupové údaje.
+
+    Aktualizuje se inkrementálně: po stažení se přepočítají jen rezervace
+    nové, změněné a odebrané a znovu se seřadí jen jejich pokoje. Vyhledání
+    platných údajů pokoje v daném čase je O(log n) přes bisect nad začátky
+    pobytů a průběžným maximem konců.
+    """
+
+    def __init__(self):
+        self._by_res = {}
+        self._rooms = {}
+        # Po startu (snapshot ze storage) nejsou v changed_ids nezměněné
+        # rezervace, první aktualizace proto projde všechny
+        self._seeded = False
+
+    def update(self, data, changed_ids):
+        """Promítni změny rezervací z posledního stažení."""
+        if not self._seeded:
+            changed_ids = data.keys()
+            self._seeded = True
+        dirty_rooms = set()
+        for res_id in set(self._by_res) - data.keys():
+            dirty_rooms.update(entry[0] for entry in self._by_res.pop(res_id))
+
+        for res_id in changed_ids:
+            old = self._by_res.pop(res_id, [])
+            new = self._entries(res_id, data[res_id])
+            dirty_rooms.update(entry[0] for entry in old)
+            dirty_rooms.update(entry[0] for entry in new)
+            if new:
+                self._by_res[res_id] = new
+
+        if not dirty_rooms:
+            return
+        by_room = defaultdict(list)
+        for entries in self._by_res.values():
+            for room, start, end, res_id, pins, keys in entries:
+                if room in dirty_rooms:
+                    by_room[room].append((start, end, res_id, pins, keys))
+        for room in dirty_rooms:
+            self._rooms.pop(room, None)
+            if by_room[room]:
+                self._rooms[room] = self._build_room(by_room[room])
+
+    @staticmethod
+    def _entries(res_id, reservation):
+        """Pobyty rezervace s přístupovými údaji."""
+        if reservation.status_id in CREDENTIALS_EXCLUDED_STATUS_IDS:
+            return []
+        return [
+            (stay.room, stay.checkin, stay.checkout, res_id, stay.alfred_pins, stay.card_keys)
+            for stay in reservation.stays
+            if stay.room and stay.checkin and stay.checkout
+            and (stay.alfred_pins or stay.card_keys)
+        ]
+
+    @staticmethod
+    def _build_room(stays):
+        """Seřazené pobyty pokoje, jejich začátky a průběžné maximum konců."""
+        stays.sort(key=lambda stay: (stay[0], stay[1], stay[2]))
+        max_ends = []
+        max_end = None
+        for stay in stays:
+            max_end = stay[1] if max_end is None or stay[1] > max_end else max_end
+            max_ends.append(max_end)
+        return stays, [stay[0] for stay in stays], max_ends
+
+    @property
+    def rooms(self):
+        """Pokoje, pro které existují nějaké přístupové údaje."""
+        return sorted(self._rooms)
+
+    def lookup(self, room, moment):
+        """Přístupové údaje platné pro pokoj v daném okamžiku."""
+        if room not in self._rooms:
+            return []
+        stays, starts, max_ends = self._rooms[room]
+        lo = bisect_right(max_ends, moment)
+        hi = bisect_right(starts, moment)
+        return [
+            {
+                "res_id": res_id,
+                "from": start.isoformat(),
+                "to": end.isoformat(),
+                "alfred_pins": list(pins),
+                "card_keys": list(keys),
+            }
+            for start, end, res_id, pins, keys in stays[lo:hi]
+            if end > moment
+        ]
@@ -0,0 +1,80 @@
+"""Diagnostika pro Previo v4.
+
+Vše se skládá z dat koordinátoru a z entit této config entry v registru,
+bez procházení všech stavů HA.
+"""
+from collections import Counter
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from .const import CREDENTIAL_FIELDS, DOMAIN
+
+TO_REDACT = {"login", "password", "guest", *CREDENTIAL_FIELDS}
+
+
+def _entity_stats(hass, entry, data):
+    """Entity config entry podle typu a statusu rezervace."""
+    hotel_id = entry.data["hotel_id"]
+    room_prefix = f"{DOMAIN}_room_{hotel_id}_"
+    reservation_prefix = f"{DOMAIN}_{hotel_id}_"
+    stats = {"reservations": 0, "rooms": 0, "disabled": 0, "without_state": 0}
+    per_status = Counter()
+
+    for reg_entry in er.async_entries_for_config_entry(er.async_get(hass), entry.entry_id):
+        if reg_entry.disabled_by is not None:
+            stats["disabled"] += 1
+        if hass.states.get(reg_entry.entity_id) is None:
+            stats["without_state"] += 1
+        if reg_entry.unique_id.startswith(room_prefix):
+            stats["rooms"] += 1
+        elif reg_entry.unique_id.startswith(reservation_prefix):
+            stats["reservations"] += 1
+            reservation = data.get(reg_entry.unique_id[len(reservation_prefix):])
+            per_status[reservation.status_name_en if reservation else "not_in_data"] += 1
+
+    stats["per_status"] = dict(per_status)
+    return stats
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry):
+    """Vrať diagnostická data pro config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    data = coordinator.data or {}
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "last_update_success": coordinator.last_update_success,
+        "reservations": len(data),
+        "reservations_per_status": dict(
+            Counter(reservation.status_name_en for reservation in data.values())
+        ),
+        "fetch": coordinator.fetch_stats,
+        "errors": coordinator.error_counts,
+        "breaker": coordinator.breaker.as_dict(),
+        "stale": coordinator.stale,
+        "restored": coordinator.restored,
+        "data_as_of": coordinator.data_as_of.isoformat() if coordinator.data_as_of else None,
+        "changes": coordinator.change_stats,
+        "entities": _entity_stats(hass, entry, data),
+        "occupancy": {
+            "rooms": len(coordinator.occupancy.rooms),
+            "conflicts": coordinator.occupancy.conflicts,
+        },
+        "credentials": {"rooms": len(coordinator.credentials.rooms)},
+        "latency": coordinator.hub.latency.get(entry.data["hotel_id"]),
+        "polling": {
+            "mode": coordinator.poll_mode,
+            "update_interval_s": coordinator.update_interval.total_seconds(),
+        },
+        "spans": coordinator.tracer.as_dict(),
+        "reservation_data": {
+            res_id: async_redact_data(reservation.content(), TO_REDACT)
+            for res_id, reservation in data.items()
+        },
+    }
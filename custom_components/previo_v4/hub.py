@@ -0,0 +1,67 @@
+"""Sdílený hub pro více hotelů (config entries) jedné instance HA."""
+import asyncio
+import statistics
+import time
+from datetime import timedelta
+
+from homeassistant.core import callback
+
+from .const import DATA_HUB, GLOBAL_CONCURRENCY
+
+
+class PrevioHub:
+    """Koordinuje všechny hotely proti api.previo.app.
+
+    - globální limit souběžných požadavků na Previo přes všechny hotely
+    - rozložení fází pollingu, aby se hotely netrefovaly do stejné chvíle
+    - latence stahování po hotelech
+    """
+
+    def __init__(self):
+        self.limiter = asyncio.Semaphore(GLOBAL_CONCURRENCY)
+        self._entries = {}
+        self.latency = {}
+
+    def register(self, entry_id, hotel_id):
+        self._entries[entry_id] = hotel_id
+
+    def unregister(self, entry_id):
+        hotel_id = self._entries.pop(entry_id, None)
+        if hotel_id not in self._entries.values():
+            self.latency.pop(hotel_id, None)
+
+    def phase_delay(self, entry_id, interval, now=None):
+        """Zpoždění dalšího stažení tak, aby padlo do fáze tohoto hotelu.
+
+        Fáze hotelů jsou rovnoměrně rozložené v rámci intervalu (podle
+        pořadí entry_id). Výsledek je mezi polovinou a jedenapůlnásobkem
+        intervalu, takže se polling nikdy výrazně nezrychlí ani nezpozdí.
+        """
+        entries = sorted(self._entries)
+        if len(entries) < 2 or entry_id not in entries:
+            return interval
+        period = interval.total_seconds()
+        offset = entries.index(entry_id) * period / len(entries)
+        now = time.time() if now is None else now
+        delay = period - ((now - offset) % period)
+        if delay < period / 2:
+            delay += period
+        return timedelta(seconds=delay)
+
+    def record(self, hotel_id, fetch_stats):
+        """Zapamatuj latenci posledního stažení hotelu."""
+        pages = fetch_stats.get("page_latency_ms") or []
+        stats = self.latency.setdefault(hotel_id, {"updates": 0})
+        stats["updates"] += 1
+        stats["last_total_ms"] = fetch_stats.get("total_ms")
+        stats["last_pages"] = fetch_stats.get("pages")
+        stats["page_median_ms"] = statistics.median(pages) if pages else None
+        stats["page_max_ms"] = max(pages) if pages else None
+
+
+@callback
+def async_get_hub(hass):
+    """Hub sdílený všemi config entries (vytvoří se při prvním použití)."""
+    if DATA_HUB not in hass.data:
+        hass.data[DATA_HUB] = PrevioHub()
+    return hass.data[DATA_HUB]
@@ -0,0 +1,297 @@
+"""Typovaný model rezervace s nativními datetime.
+
+Časy check-in/out se z API parsují jednou. Zobrazované řetězce a odvozené
+hodnoty (počet dní do příjezdu, cena, názvy statusů) se počítají až při
+čtení, takže nic nezastará mezi stahováními.
+"""
+import sys
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime
+
+from .const import DISPLAY_DATETIME_FORMAT, STATUS_MAPPING, STATUS_MAPPING_CZ
+
+# Nastavení jazyka pro statusy (změňte na STATUS_MAPPING_CZ pro češtinu)
+USE_STATUS_MAPPING = STATUS_MAPPING  # nebo STATUS_MAPPING_CZ
+
+API_DATETIME_EXAMPLE = "2025-01-31 14:00:00"
+API_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_api_datetime(value):
+    """Čas z API ("2025-01-31 14:00:00") jako datetime, jinak None."""
+    if not value:
+        return None
+    if (
+        len(value) == len(API_DATETIME_EXAMPLE)
+        and value[4] == value[7] == "-"
+        and value[10] == " "
+        and value[13] == value[16] == ":"
+    ):
+        try:
+            # fromisoformat je řádově rychlejší než strptime a formát API pokrývá
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    # Ostatní tvary (např. bez úvodních nul) posoudí strptime jako dřív
+    try:
+        return datetime.strptime(value, API_DATETIME_FORMAT)
+    except ValueError:
+        return None
+
+
+def intern(value):
+    """Opakované řetězce (status, pokoj) drž v paměti jen jednou."""
+    return sys.intern(value) if value else value
+
+
+def _display(moment):
+    return moment.strftime(DISPLAY_DATETIME_FORMAT) if moment else None
+
+
+@dataclass(slots=True, frozen=True)
+class Stay:
+    """Jedna pod-rezervace = jeden pokoj a jeho termín.
+
+    checkin_raw/checkout_raw drží čas z API, který nejde přečíst - zobrazí
+    se tak, jak přišel, ale do výpočtů (dny do příjezdu, obsazenost) nejde.
+    """
+
+    room: str | None = None
+    checkin: datetime | None = None
+    checkout: datetime | None = None
+    checkin_raw: str | None = None
+    checkout_raw: str | None = None
+    guest: str | None = None
+    com_id: str | None = None
+    price: float = 0.0
+    alfred_pins: tuple = ()
+    card_keys: tuple = ()
+
+    @property
+    def checkin_display(self):
+        return _display(self.checkin) or self.checkin_raw
+
+    @property
+    def checkout_display(self):
+        return _display(self.checkout) or self.checkout_raw
+
+    def as_dict(self):
+        """Serializovatelná podoba pro snapshot a události."""
+        stay = {
+            "room": self.room,
+            "from": self.checkin.isoformat() if self.checkin else None,
+            "to": self.checkout.isoformat() if self.checkout else None,
+            "guest": self.guest,
+            "com_id": self.com_id,
+            "price": self.price,
+            "alfred_pins": list(self.alfred_pins),
+            "card_keys": list(self.card_keys),
+        }
+        if self.checkin_raw:
+            stay["from_raw"] = self.checkin_raw
+        if self.checkout_raw:
+            stay["to_raw"] = self.checkout_raw
+        return stay
+
+    @classmethod
+    def from_dict(cls, stay):
+        """Pobyt ze snapshotu (inverze as_dict)."""
+        return cls(
+            room=intern(stay.get("room")),
+            checkin=datetime.fromisoformat(stay["from"]) if stay.get("from") else None,
+            checkout=datetime.fromisoformat(stay["to"]) if stay.get("to") else None,
+            checkin_raw=stay.get("from_raw"),
+            checkout_raw=stay.get("to_raw"),
+            guest=stay.get("guest"),
+            com_id=stay.get("com_id"),
+            price=stay.get("price", 0.0),
+            alfred_pins=tuple(stay.get("alfred_pins", ())),
+            card_keys=tuple(stay.get("card_keys", ())),
+        )
+
+
+@dataclass(slots=True)
+class Reservation:
+    """Rezervace (SINGLE i GROUP) složená z pobytů v pokojích."""
+
+    res_id: str
+    hotel_id: str
+    voucher: str
+    status_id: str
+    stays: tuple = ()
+    market_codes: tuple = ()
+    last_updated: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    @classmethod
+    def from_content(cls, res_id, content, last_updated=None):
+        """Rezervace obnovená z uloženého snapshotu (výstupu content())."""
+        stays = [Stay.from_dict(stay) for stay in content.get("stays", [])]
+        # Snapshoty starších verzí neměly u pobytu hosta ani cenu
+        if stays and not any(stay.guest for stay in stays):
+            stays[0] = replace(stays[0], guest=content.get("guest"))
+        if stays and not any(stay.price for stay in stays):
+            stays[0] = replace(stays[0], price=content.get("price_numeric") or 0.0)
+        reservation = cls(
+            res_id=res_id,
+            hotel_id=content.get("hotel_id"),
+            voucher=content.get("voucher"),
+            status_id=intern(content.get("status_id")),
+            stays=tuple(stays),
+            market_codes=tuple(intern(code) for code in content.get("market_codes", [])),
+        )
+        if last_updated:
+            reservation.last_updated = last_updated
+        return reservation
+
+    # Pokoje a hosté
+    @property
+    def rooms(self):
+        return [stay.room for stay in self.stays if stay.room]
+
+    @property
+    def room(self):
+        return ", ".join(self.rooms) if self.rooms else "neznámý pokoj"
+
+    @property
+    def room_count(self):
+        return len(self.rooms)
+
+    @property
+    def is_group(self):
+        return len(self.stays) > 1
+
+    @property
+    def guest(self):
+        return next((stay.guest for stay in self.stays if stay.guest), "Host")
+
+    # PINy, klíče, comId - single jen když je právě jeden
+    @property
+    def alfred_pins(self):
+        return [pin for stay in self.stays for pin in stay.alfred_pins]
+
+    @property
+    def alfred_pin(self):
+        pins = self.alfred_pins
+        return pins[0] if len(pins) == 1 else None
+
+    @property
+    def card_keys(self):
+        return [key for stay in self.stays for key in stay.card_keys]
+
+    @property
+    def card_key(self):
+        keys = self.card_keys
+        return keys[0] if len(keys) == 1 else None
+
+    @property
+    def com_ids(self):
+        return [stay.com_id for stay in self.stays if stay.com_id]
+
+    @property
+    def com_id(self):
+        com_ids = self.com_ids
+        return com_ids[0] if len(com_ids) == 1 else None
+
+    # Časy
+    @property
+    def checkin_times(self):
+        return [stay.checkin for stay in self.stays if stay.checkin]
+
+    @property
+    def checkout_times(self):
+        return [stay.checkout for stay in self.stays if stay.checkout]
+
+    @property
+    def checkins(self):
+        """Zobrazované check-iny včetně nečitelných časů v podobě z API."""
+        return [moment for moment in (stay.checkin_display for stay in self.stays) if moment]
+
+    @property
+    def checkouts(self):
+        return [moment for moment in (stay.checkout_display for stay in self.stays) if moment]
+
+    @property
+    def checkin(self):
+        checkins = self.checkins
+        return checkins[0] if checkins else None
+
+    @property
+    def checkout(self):
+        checkouts = self.checkouts
+        return checkouts[0] if checkouts else None
+
+    def days_until_checkin(self, today=None):
+        """Dní do prvního check-inu vůči dnešku (None bez čitelného check-inu)."""
+        first = next(
+            (stay for stay in self.stays if stay.checkin or stay.checkin_raw), None
+        )
+        if first is None or first.checkin is None:
+            return None
+        return (first.checkin.date() - (today or date.today())).days
+
+    # Cena
+    @property
+    def price_numeric(self):
+        return sum(stay.price for stay in self.stays)
+
+    @property
+    def price(self):
+        return f"{self.price_numeric:.2f}"
+
+    @property
+    def price_formatted(self):
+        total = self.price_numeric
+        return f"{total:.2f} CZK" if total > 0 else "0 CZK"
+
+    # Status
+    @property
+    def status_name(self):
+        return USE_STATUS_MAPPING.get(self.status_id, f"Unknown Status {self.status_id}")
+
+    @property
+    def status_name_en(self):
+        return STATUS_MAPPING.get(self.status_id, f"Unknown Status {self.status_id}")
+
+    @property
+    def status_name_cz(self):
+        return STATUS_MAPPING_CZ.get(self.status_id, f"Neznámý status {self.status_id}")
+
+    @property
+    def market_codes_text(self):
+        return ", ".join(self.market_codes) if self.market_codes else "žádné"
+
+    def content(self):
+        """Obsah rezervace jako dict - pro detekci změn, snapshot a události.
+
+        Bez last_updated a hodnot závislých na aktuálním dni, aby se
+        rezervace nehlásila jako změněná jen kvůli půlnoci.
+        """
+        return {
+            "voucher": self.voucher,
+            "guest": self.guest,
+            "room": self.room,
+            "rooms": self.rooms,
+            "alfred_pin": self.alfred_pin,
+            "alfred_pins": self.alfred_pins,
+            "card_key": self.card_key,
+            "card_keys": self.card_keys,
+            "com_id": self.com_id,
+            "com_ids": self.com_ids,
+            "checkin": self.checkin,
+            "checkout": self.checkout,
+            "checkins": self.checkins,
+            "checkouts": self.checkouts,
+            "stays": [stay.as_dict() for stay in self.stays],
+            "price": self.price,
+            "price_numeric": self.price_numeric,
+            "price_formatted": self.price_formatted,
+            "status_id": self.status_id,
+            "status_name": self.status_name,
+            "status_name_en": self.status_name_en,
+            "status_name_cz": self.status_name_cz,
+            "market_codes": list(self.market_codes),
+            "market_codes_text": self.market_codes_text,
+            "hotel_id": self.hotel_id,
+            "is_group": self.is_group,
+            "room_count": self.room_count,
+        }
@@ -0,0 +1,106 @@
+"""Obsazenost pokojů - intervalový index nad pobyty z rezervací."""
+import heapq
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+
+from .const import INACTIVE_STATUS_IDS
+
+
+def find_overlaps(stays):
+    """Najdi překrývající se pobyty jednoho pokoje (sweep line).
+
+    `stays` jsou (začátek, konec, res_id) seřazené podle začátku. Halda
+    drží konce aktivních pobytů, takže každý pobyt se porovná jen
+    s pobyty, které v jeho začátku ještě trvají.
+    """
+    overlaps = []
+    active = []
+    for start, end, res_id in stays:
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for other_end, other_start, other_id in active:
+            if other_id != res_id:
+                overlaps.append((other_id, res_id, start, min(end, other_end)))
+        heapq.heappush(active, (end, start, res_id))
+    return overlaps
+
+
+class OccupancyIndex:
+    """Seřazené intervaly pobytů pro každý pokoj.
+
+    Sestavuje se po každém stažení dat. Dotaz na pokoj a časové okno je
+    O(log n + k) - bisect nad začátky pobytů a nad průběžným maximem konců.
+    Zrušené rezervace a no-show pokoj neobsazují.
+    """
+
+    def __init__(self, data):
+        by_room = defaultdict(list)
+        for res_id, reservation in data.items():
+            if reservation.status_id in INACTIVE_STATUS_IDS:
+                continue
+            for stay in reservation.stays:
+                start, end = stay.checkin, stay.checkout
+                if not stay.room or start is None or end is None or end <= start:
+                    continue
+                by_room[stay.room].append((start, end, res_id))
+
+        self._rooms = {}
+        self.conflicts = []
+        for room, stays in by_room.items():
+            stays.sort()
+            max_ends = []
+            max_end = None
+            for _, end, _ in stays:
+                max_end = end if max_end is None or end > max_end else max_end
+                max_ends.append(max_end)
+            self._rooms[room] = (stays, [stay[0] for stay in stays], max_ends)
+
+            for first_id, second_id, start, end in find_overlaps(stays):
+                self.conflicts.append({
+                    "room": room,
+                    "res_ids": [first_id, second_id],
+                    "from": start.isoformat(),
+                    "to": end.isoformat(),
+                })
+
+    @property
+    def rooms(self):
+        """Názvy všech pokojů, které mají nějaký pobyt."""
+        return sorted(self._rooms)
+
+    def stays(self, room, start, end):
+        """Pobyty pokoje, které zasahují do okna <start, end)."""
+        if room not in self._rooms:
+            return []
+        stays, starts, max_ends = self._rooms[room]
+        lo = bisect_right(max_ends, start)
+        hi = bisect_left(starts, end)
+        return [stay for stay in stays[lo:hi] if stay[1] > start]
+
+    def occupant(self, room, moment):
+        """Pobyt, který v daném okamžiku pokoj obsazuje (nebo None)."""
+        if room not in self._rooms:
+            return None
+        stays, starts, max_ends = self._rooms[room]
+        lo = bisect_right(max_ends, moment)
+        hi = bisect_right(starts, moment)
+        for stay in stays[lo:hi]:
+            if stay[1] > moment:
+                return stay
+        return None
+
+    def next_stay(self, room, moment):
+        """Nejbližší pobyt pokoje začínající po daném okamžiku (nebo None)."""
+        if room not in self._rooms:
+            return None
+        stays, starts, _ = self._rooms[room]
+        index = bisect_right(starts, moment)
+        return stays[index] if index < len(stays) else None
+
+    def free_rooms(self, start, end):
+        """Pokoje bez pobytu v okně <start, end)."""
+        return [room for room in self.rooms if not self.stays(room, start, end)]
+
+    def room_conflicts(self, room):
+        """Překrývající se pobyty (double-booking) daného pokoje."""
+        return [conflict for conflict in self.conflicts if conflict["room"] == room]
@@ -0,0 +1,248 @@
+"""Streamované parsování odpovědí searchReservations."""
+import logging
+from collections import defaultdict
+from xml.etree.ElementTree import TreeBuilder
+
+from defusedxml.ElementTree import DefusedXMLParser
+
+from .const import STATUS_MAPPING
+from .model import Reservation, Stay, intern, parse_api_datetime
+from .xmlfields import Field, FieldSpec
+
+_LOGGER = logging.getLogger(__name__)
+
+# Možná jména celkového počtu výsledků - dokumentace API je neuvádí, počet
+# slouží jen k paralelnímu stažení stránek, konec určí neplná stránka
+TOTAL_ATTRIBUTES = ("total", "count")
+TOTAL_ELEMENTS = ("totalCount", "total")
+
+
+class _ReservationTarget:
+    """Cíl XML parseru, který drží v paměti jen rozpracovanou <reservation>.
+
+    Každý uzavřený element rezervace se předá builderu a zahodí. Mimo
+    rezervace se sleduje jen celkový počet výsledků, pokud ho API uvádí.
+    """
+
+    def __init__(self, page, builder):
+        self._page = page
+        self._builder = builder
+        self._tree = None
+        self._depth = 0
+        self._is_root = True
+        self._text = []
+        self._totals = {}
+        self.count = 0
+
+    @property
+    def total(self):
+        """Celkový počet rezervací (atribut kořene má přednost před elementy)."""
+        for key in TOTAL_ATTRIBUTES + TOTAL_ELEMENTS:
+            candidate = self._totals.get(key)
+            if candidate and candidate.isdigit():
+                return int(candidate)
+        return None
+
+    def start(self, tag, attrib):
+        if self._tree is not None:
+            self._depth += 1
+            self._tree.start(tag, attrib)
+            return
+        if tag == "reservation":
+            self._tree = TreeBuilder()
+            self._depth = 1
+            self._tree.start(tag, attrib)
+            return
+        if self._is_root:
+            self._is_root = False
+            for key in TOTAL_ATTRIBUTES:
+                if key in attrib:
+                    self._totals[key] = attrib[key]
+        self._text = []
+
+    def data(self, data):
+        if self._tree is not None:
+            self._tree.data(data)
+        else:
+            self._text.append(data)
+
+    def end(self, tag):
+        if self._tree is None:
+            if tag in TOTAL_ELEMENTS:
+                self._totals.setdefault(tag, "".join(self._text).strip())
+            self._text = []
+            return
+        self._tree.end(tag)
+        self._depth -= 1
+        if self._depth == 0:
+            element = self._tree.close()
+            self._tree = None
+            self._builder.add(self._page, self.count, element)
+            self.count += 1
+
+    def close(self):
+        return None
+
+
+class ReservationStreamParser:
+    """Inkrementální parser jedné stránky odpovědi (bez DTD a entit).
+
+    Tělo odpovědi se předává po kusech přes feed(), takže špička paměti
+    nezávisí na velikosti odpovědi, jen na velikosti jedné rezervace.
+    """
+
+    def __init__(self, page, builder):
+        self._target = _ReservationTarget(page, builder)
+        self._parser = DefusedXMLParser(target=self._target)
+
+    def feed(self, chunk):
+        self._parser.feed(chunk)
+
+    def close(self):
+        """Dokonči parsování; vrací (počet rezervací, celkový počet nebo None)."""
+        self._parser.close()
+        return self._target.count, self._target.total
+
+
+# Pole jednoho elementu <reservation>, připravená jednou pro všechny stránky
+SUB_RESERVATION_FIELDS = FieldSpec({
+    "res_id": Field("resId"),
+    "voucher": Field("voucher", default=None),
+    "status_id": Field("status/statusId", default="0", intern=True),
+    "room": Field("object", child="name", default=None, intern=True),
+    "checkin": Field("term/from", default=None),
+    "checkout": Field("term/to", default=None),
+    "guest": Field("guest", child="name", default=None),
+    "com_id": Field("comId", default=None),
+    "price": Field("price", default="0"),
+    "alfred_pins": Field("alfredCodeList/alfredCode", many=True, child="pin"),
+    "card_keys": Field("cardDataList/cardData", many=True, child="key"),
+    "market_codes": Field("marketCodeList/marketCode", intern=True, many=True),
+})
+
+
+def parse_sub_reservation(fields):
+    """Jedna pod-rezervace (pokoj) z polí extrahovaných z <reservation>."""
+    # Cena
+    try:
+        price = float(fields["price"] or 0)
+    except ValueError:
+        price = 0.0
+
+    # Nečitelný čas se zobrazí tak, jak přišel z API
+    checkin = parse_api_datetime(fields["checkin"])
+    checkout = parse_api_datetime(fields["checkout"])
+
+    # Pokoj, host (první v této pod-rezervaci), check-in/out
+    stay = Stay(
+        room=fields["room"] or None,
+        checkin=checkin,
+        checkout=checkout,
+        checkin_raw=fields["checkin"] if checkin is None and fields["checkin"] else None,
+        checkout_raw=fields["checkout"] if checkout is None and fields["checkout"] else None,
+        guest=fields["guest"] or None,
+        com_id=fields["com_id"] or None,
+        price=price,
+        alfred_pins=fields["alfred_pins"],
+        card_keys=fields["card_keys"],
+    )
+    voucher = fields["voucher"] or "není"
+    return voucher, fields["status_id"], stay, fields["market_codes"]
+
+
+class ReservationBuilder:
+    """Skládá rezervace z pod-rezervací průběžně, jak přicházejí stránky.
+
+    Pod-rezervace se seskupují podle resId s klíčem (stránka, pozice), aby
+    výsledek nezávisel na pořadí, v jakém stránky dorazí.
+    """
+
+    def __init__(self, hotel_id, log=None):
+        self._hotel_id = hotel_id
+        # Podrobný log po rezervacích (jen s verbose_logging nebo při trasování)
+        self._log = log
+        self._parts = defaultdict(list)
+        self._failed = set()
+        self._page_counts = {}
+
+    def __len__(self):
+        return len(self._parts)
+
+    @property
+    def failed(self):
+        """Počet rezervací vynechaných kvůli chybě při zpracování."""
+        return len(self._failed)
+
+    def add(self, page, position, element):
+        """Zpracuj jeden element <reservation> a zapomeň ho."""
+        fields = SUB_RESERVATION_FIELDS.extract(element, intern)
+        res_id = fields.get("res_id")
+        if not res_id:
+            return
+        try:
+            part = parse_sub_reservation(fields)
+        except Exception as e:
+            _LOGGER.error("Chyba při zpracování rezervace %s: %s", res_id, e)
+            self._failed.add(res_id)
+            return
+        self._parts[res_id].append(((page, position), part))
+        self._page_counts[page] = max(self._page_counts.get(page, 0), position + 1)
+
+    def discard_page(self, page):
+        """Zahoď pod-rezervace stránky, jejíž stažení nebo parsování selhalo."""
+        for res_id in list(self._parts):
+            parts = [part for part in self._parts[res_id] if part[0][0] != page]
+            if parts:
+                self._parts[res_id] = parts
+            else:
+                del self._parts[res_id]
+        self._page_counts.pop(page, None)
+
+    def incomplete(self, failed_pages):
+        """Rezervace, které mohou mít část pokojů na chybějící stránce.
+
+        Skupinová rezervace může přesahovat hranici stránky, takže nejistá
+        je poslední rezervace před chybějící stránkou a první za ní.
+        """
+        boundary = set()
+        for page in failed_pages:
+            if page - 1 in self._page_counts:
+                boundary.add((page - 1, self._page_counts[page - 1] - 1))
+            if page + 1 in self._page_counts:
+                boundary.add((page + 1, 0))
+        return {
+            res_id
+            for res_id, parts in self._parts.items()
+            if any(key in boundary for key, _ in parts)
+        }
+
+    def build(self):
+        """Rezervace v pořadí, v jakém je vrátilo API."""
+        data = {}
+        for res_id, parts in sorted(
+            self._parts.items(), key=lambda item: min(key for key, _ in item[1])
+        ):
+            if res_id in self._failed:
+                continue
+            parts.sort(key=lambda item: item[0])
+            voucher, status_id, _, _ = parts[0][1]
+
+            market_codes = []
+            for _, (_, _, _, codes) in parts:
+                for code in codes:
+                    if code not in market_codes:
+                        market_codes.append(code)
+
+            data[res_id] = Reservation(
+                res_id=res_id,
+                hotel_id=self._hotel_id,
+                voucher=voucher,
+                status_id=status_id,
+                stays=tuple(stay for _, (_, _, stay, _) in parts),
+                market_codes=tuple(market_codes),
+            )
+            if self._log is not None:
+                self._log("Processed reservation %s (%s): %d rooms, status: %s",
+                          res_id, "GROUP" if len(parts) > 1 else "SINGLE", len(parts),
+                          STATUS_MAPPING.get(status_id, f"Status {status_id}"))
+        return data
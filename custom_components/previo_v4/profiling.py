@@ -0,0 +1,107 @@
+"""Časy úseků aktualizace (spany) a profilování event loopu přes cProfile."""
+import asyncio
+import cProfile
+from contextlib import contextmanager
+import logging
+import time
+
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import TRACE_SAMPLE_EVERY
+
+
+class SpanTracer:
+    """Souhrnné časy úseků aktualizace (fetch, parse, merge, fanout).
+
+    Spany se jen přičítají do statistik (pro diagnostiku a službu profile).
+    Podrobné logy jdou na INFO jen se zapnutou volbou verbose_logging;
+    jinak se při zapnutém DEBUG logu vypisuje jen každá
+    TRACE_SAMPLE_EVERY-tá aktualizace.
+    """
+
+    def __init__(self, logger, sample_every=TRACE_SAMPLE_EVERY):
+        self._logger = logger
+        self._sample_every = sample_every
+        self._cycle = 0
+        self.verbose = False
+        self.sampled = False
+        self.spans = {}
+        self.last_cycle = {}
+
+    @property
+    def detailed(self):
+        """Logují se v této aktualizaci podrobnosti?"""
+        return self.verbose or self.sampled
+
+    def start_cycle(self):
+        """Začátek aktualizace - rozhodne, zda se bude trasovat do DEBUG logu."""
+        self._cycle += 1
+        self.last_cycle = {}
+        self.sampled = (
+            (self._cycle - 1) % self._sample_every == 0
+            and self._logger.isEnabledFor(logging.DEBUG)
+        )
+
+    @contextmanager
+    def span(self, name):
+        """Změř dobu běhu bloku a přičti ji ke spanu name."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - started) * 1000)
+
+    def record(self, name, duration_ms):
+        """Přičti už změřenou dobu (ms) ke spanu name."""
+        stats = self.spans.get(name)
+        if stats is None:
+            stats = self.spans[name] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+        stats["count"] += 1
+        stats["total_ms"] += duration_ms
+        if duration_ms > stats["max_ms"]:
+            stats["max_ms"] = duration_ms
+        self.last_cycle[name] = self.last_cycle.get(name, 0.0) + duration_ms
+        if self.sampled:
+            self._logger.debug("Span %s: %.1f ms", name, duration_ms)
+
+    def detail(self, msg, *args):
+        """Podrobný log - INFO s verbose_logging, jinak vzorkovaný DEBUG."""
+        if self.verbose:
+            self._logger.info(msg, *args)
+        elif self.sampled:
+            self._logger.debug(msg, *args)
+
+    def as_dict(self):
+        """Statistiky spanů pro diagnostiku a odpověď služby profile."""
+        return {
+            "last_cycle_ms": {
+                name: round(duration, 1) for name, duration in self.last_cycle.items()
+            },
+            "totals": {
+                name: {
+                    "count": stats["count"],
+                    "total_ms": round(stats["total_ms"], 1),
+                    "avg_ms": round(stats["total_ms"] / stats["count"], 1),
+                    "max_ms": round(stats["max_ms"], 1),
+                }
+                for name, stats in self.spans.items()
+            },
+        }
+
+
+async def async_profile(hass, seconds, path):
+    """Profiluj event loop HA po dobu seconds a ulož výsledek (pstats) do path.
+
+    cProfile zachytí jen vlákno event loopu - tam běží stahování, parsování
+    i zápisy stavů entit.
+    """
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as err:
+        raise HomeAssistantError(f"Profilování už běží: {err}") from err
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.disable()
+    await hass.async_add_executor_job(profiler.dump_stats, path)
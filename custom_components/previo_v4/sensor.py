@@ -1,32 +1,34 @@
 # sensor.py
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
-import xml.etree.ElementTree as ET
-from collections import defaultdict
 
 from homeassistant.components.sensor import SensorEntity
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-)
+from homeassistant.helpers.event import async_track_point_in_time, async_track_time_change
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, STATUS_MAPPING, STATUS_MAPPING_CZ
+from .changes import ReservationArchive
+from .const import (
+    CONF_ARCHIVE_REMOVED,
+    CONF_EXPOSE_CREDENTIALS,
+    CONF_RETENTION_DAYS,
+    CREDENTIAL_FIELDS,
+    DEFAULT_EXPOSE_CREDENTIALS,
+    DEFAULT_RETENTION_DAYS,
+    DOMAIN,
+)
 
 _LOGGER = logging.getLogger(__name__)
-SCAN_INTERVAL = timedelta(minutes=15)
-
-# Nastavení jazyka pro statusy (změňte na STATUS_MAPPING_CZ pro češtinu)
-USE_STATUS_MAPPING = STATUS_MAPPING  # nebo STATUS_MAPPING_CZ
 
 # ------------------------------------------------------------------ #
 # 1. Nastavení platformy                                             #
 # ------------------------------------------------------------------ #
 async def async_setup_entry(hass, config_entry, async_add_entities):
-    """Nastav koordinátora a vytvoř senzory."""
-    coordinator = PrevioCoordinator(hass, config_entry)
-    await coordinator.async_config_entry_first_refresh()
+    """Vytvoř senzory nad sdíleným koordinátorem z __init__."""
+    entry_data = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator = entry_data['coordinator']
 
     hotel_id = config_entry.data["hotel_id"]
     device = DeviceInfo(
@@ -36,315 +38,165 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
     )
 
     tracked = set()
+    sensors = {}
+    tracked_rooms = set()
+    registry = er.async_get(hass)
+    archive = ReservationArchive(hass, config_entry.entry_id)
+    unique_prefix = f"{DOMAIN}_{hotel_id}_"
+
+    # Entity z registru, které nejsou v aktuálních datech (např. z doby před
+    # restartem), podléhají stejné retenci jako rezervace odebrané za běhu
+    for reg_entry in er.async_entries_for_config_entry(registry, config_entry.entry_id):
+        if not reg_entry.unique_id.startswith(unique_prefix):
+            continue
+        res_id = reg_entry.unique_id[len(unique_prefix):]
+        if res_id in (coordinator.data or {}):
+            continue
+        if res_id not in coordinator.tracker.departed:
+            coordinator.tracker.mark_departed(res_id, {})
 
+    def _prune_entities():
+        """Odstraň entity rezervací, jejichž retence po check-outu vypršela."""
+        retention = config_entry.options.get(CONF_RETENTION_DAYS, DEFAULT_RETENTION_DAYS)
+        expired = [
+            res_id
+            for res_id in coordinator.tracker.expired(retention)
+            if res_id not in (coordinator.data or {})
+        ]
+        if not expired:
+            return
+
+        for res_id in expired:
+            entity_id = registry.async_get_entity_id("sensor", DOMAIN, unique_prefix + res_id)
+            if entity_id:
+                registry.async_remove(entity_id)
+            tracked.discard(res_id)
+            sensors.pop(res_id, None)
+        records = coordinator.tracker.forget(expired)
+        _LOGGER.info("Removed %d finished reservation entities", len(expired))
+
+        if config_entry.options.get(CONF_ARCHIVE_REMOVED, False):
+            hass.async_create_task(archive.async_append(records))
+
+    @callback
     def _sync_entities():
         """Přidej nové senzory, které ještě nejsou sledovány."""
-        _LOGGER.info("=== SYNC ENTITIES START ===")
-        _LOGGER.info("Coordinator data: %s", coordinator.data)
-        _LOGGER.info("Tracked: %s", tracked)
+        with coordinator.tracer.span("sync"):
+            # Podrobné logy jen s verbose_logging nebo ve vzorkované aktualizaci
+            tracer = coordinator.tracer
+            detailed = tracer.detailed
+            tracer.detail("=== SYNC ENTITIES START ===")
+            tracer.detail("Coordinator data: %s", coordinator.data)
+            tracer.detail("Tracked: %s", tracked)
         
-        new_entities = []
-        if coordinator.data:
-            for res_id in coordinator.data:
-                _LOGGER.info("Processing res_id: %s, tracked: %s", res_id, res_id in tracked)
-                if res_id not in tracked:
-                    _LOGGER.info("Creating new sensor for %s", res_id)
-                    new_entities.append(
-                        PrevioV4Sensor(coordinator, res_id, device, hotel_id)
-                    )
-                    tracked.add(res_id)
+            new_entities = []
+            if coordinator.data:
+                for res_id in coordinator.data:
+                    if detailed:
+                        tracer.detail("Processing res_id: %s, tracked: %s", res_id, res_id in tracked)
+                    if res_id not in tracked:
+                        tracer.detail("Creating new sensor for %s", res_id)
+                        sensors[res_id] = PrevioV4Sensor(coordinator, res_id, device, hotel_id)
+                        new_entities.append(sensors[res_id])
+                        tracked.add(res_id)
+
+            # Senzor obsazenosti pro každý pokoj, který se objevil v pobytech
+            for room in coordinator.occupancy.rooms:
+                if room not in tracked_rooms:
+                    new_entities.append(PrevioRoomSensor(coordinator, room, device, hotel_id))
+                    tracked_rooms.add(room)
         
-        if new_entities:
-            _LOGGER.info("Adding %d new entities", len(new_entities))
-            async_add_entities(new_entities)
-        else:
-            _LOGGER.info("No new entities to add")
-        _LOGGER.info("=== SYNC ENTITIES END ===")
+            if new_entities:
+                _LOGGER.debug("Adding %d new entities", len(new_entities))
+                async_add_entities(new_entities)
+            else:
+                tracer.detail("No new entities to add")
+            _prune_entities()
+            tracer.detail("=== SYNC ENTITIES END ===")
 
     # Uložení dat pro debug služby
-    if DOMAIN not in hass.data:
-        hass.data[DOMAIN] = {}
-    
-    hass.data[DOMAIN][config_entry.entry_id] = {
-        'coordinator': coordinator,
+    entry_data.update({
         'sync_callback': _sync_entities,
         'tracked': tracked
-    }
-
-    _sync_entities()
-    coordinator.async_add_listener(_sync_entities)
+    })
 
+    @callback
+    def _midnight(_now):
+        """Po půlnoci přepočítej days_until_checkin bez čekání na další stažení."""
+        for sensor in sensors.values():
+            if sensor.hass is not None and sensor.available:
+                sensor.async_write_ha_state()
 
-# ------------------------------------------------------------------ #
-# 2. Koordinátor – načítá data z API každých 15 min                  #
-# ------------------------------------------------------------------ #
-class PrevioCoordinator(DataUpdateCoordinator):
-    def __init__(self, hass, config_entry):
-        super().__init__(
-            hass,
-            _LOGGER,
-            name=DOMAIN,
-            update_interval=SCAN_INTERVAL,
-        )
-        self.config_entry = config_entry
-
-    async def _async_update_data(self):
-        """Stáhni a rozparsoj XML z Previa."""
-        _LOGGER.info("=== STARTING DATA UPDATE ===")
-        
-        login = self.config_entry.data["login"]
-        password = self.config_entry.data["password"]
-        hotel_id = self.config_entry.data["hotel_id"]
-        session = async_get_clientsession(self.hass)
-
-        today = datetime.now()
-        to_date = today + timedelta(days=30)
-
-        # Podle oficiální Previo API dokumentace:
-        # cosId: 1=Option, 2=Confirmed, 3=Checked in, 6=Waiting list, 
-        #        7=Cancelled, 8=No-show, 9=Checked out, 10=Other
-        xml_payload = f"""<?xml version="1.0"?>
-<request>
-    <login>{login}</login>
-    <password>{password}</password>
-    <hotId>{hotel_id}</hotId>
-    <term>
-        <from>{today.strftime('%Y-%m-%d')}</from>
-        <to>{to_date.strftime('%Y-%m-%d')}</to>
-    </term>
-    <statuses>
-        <cosId>1</cosId>
-        <cosId>2</cosId>
-        <cosId>3</cosId>
-        <cosId>6</cosId>
-        <cosId>7</cosId>
-        <cosId>8</cosId>
-        <cosId>9</cosId>
-        <cosId>10</cosId>
-    </statuses>
-    <limit><offset>0</offset><limit>50</limit></limit>
-</request>"""
-
-        try:
-            async with session.post(
-                "https://api.previo.app/x1/hotel/searchReservations",
-                data=xml_payload,
-                headers={"Content-Type": "application/xml"},
-            ) as resp:
-                text = await resp.text()
-                _LOGGER.info("Previo response received, length: %d", len(text))
-        except Exception as e:
-            _LOGGER.error("Chyba při volání Previa: %s", e)
-            return {}
-
-        # Seskupení rezervací podle resId
-        grouped_reservations = defaultdict(list)
-        
-        try:
-            tree = ET.fromstring(text)
-            reservations = tree.findall(".//reservation")
-            _LOGGER.info("Found %d reservations in XML", len(reservations))
-            
-            for res in reservations:
-                res_id = res.findtext("resId")
-                if not res_id:
-                    continue
-                grouped_reservations[res_id].append(res)
-            
-            _LOGGER.info("Grouped into %d unique reservations", len(grouped_reservations))
-            
-        except Exception as e:
-            _LOGGER.error("Chyba při parsování XML: %s", e)
-            return {}
-
-        # Zpracování seskupených rezervací
-        data = {}
-        
-        for res_id, res_list in grouped_reservations.items():
-            try:
-                # Detekce SINGLE vs GROUP
-                is_group = len(res_list) > 1
-                _LOGGER.info("Processing resId %s: %s reservation with %d room(s)", 
-                           res_id, "GROUP" if is_group else "SINGLE", len(res_list))
-                
-                # Inicializace agregovaných dat
-                rooms = []
-                com_ids = []
-                alfred_pins = []
-                card_keys = []
-                checkins = []
-                checkouts = []
-                prices = []
-                guests = []
-                market_codes_all = []
-                
-                # První rezervace pro základní údaje
-                first_res = res_list[0]
-                voucher = first_res.findtext("voucher") or "není"
-                status_id = first_res.findtext("status/statusId", "0")
-                
-                # Zpracování každé pod-rezervace (pokoje)
-                for res in res_list:
-                    # comId
-                    com_id = res.findtext("comId")
-                    if com_id:
-                        com_ids.append(com_id)
-                    
-                    # Pokoj
-                    room_el = res.find("object")
-                    if room_el is not None:
-                        room_name = room_el.findtext("name")
-                        if room_name:
-                            rooms.append(room_name)
-                    
-                    # Host (první v této pod-rezervaci)
-                    guest_el = res.find("guest")
-                    if guest_el is not None:
-                        guest_name = guest_el.findtext("name")
-                        if guest_name:
-                            guests.append(guest_name)
-                    
-                    # Alfred PIN
-                    alfred_code_list = res.find("alfredCodeList")
-                    if alfred_code_list is not None:
-                        for alfred_code in alfred_code_list.findall("alfredCode"):
-                            pin = alfred_code.findtext("pin")
-                            if pin:
-                                alfred_pins.append(pin)
-                    
-                    # Card Key
-                    card_data_list = res.find("cardDataList")
-                    if card_data_list is not None:
-                        for card_data in card_data_list.findall("cardData"):
-                            key = card_data.findtext("key")
-                            if key:
-                                card_keys.append(key)
-                    
-                    # Check-in/out
-                    checkin_str = res.findtext("term/from")
-                    checkout_str = res.findtext("term/to")
-                    
-                    if checkin_str:
-                        try:
-                            dt = datetime.strptime(checkin_str, "%Y-%m-%d %H:%M:%S")
-                            checkins.append(dt.strftime("%B %d, %Y at %I:%M:%S %p"))
-                        except ValueError:
-                            checkins.append(checkin_str)
-                    
-                    if checkout_str:
-                        try:
-                            dt = datetime.strptime(checkout_str, "%Y-%m-%d %H:%M:%S")
-                            checkouts.append(dt.strftime("%B %d, %Y at %I:%M:%S %p"))
-                        except ValueError:
-                            checkouts.append(checkout_str)
-                    
-                    # Cena
-                    price_str = res.findtext("price", "0")
-                    try:
-                        price_float = float(price_str) if price_str else 0.0
-                        prices.append(price_float)
-                    except ValueError:
-                        prices.append(0.0)
-                    
-                    # Market codes
-                    market_code_list = res.find("marketCodeList")
-                    if market_code_list is not None:
-                        for market_code in market_code_list.findall("marketCode"):
-                            code = market_code.text
-                            if code and code not in market_codes_all:
-                                market_codes_all.append(code)
-                
-                # Agregace dat
-                total_price = sum(prices)
-                
-                # Výpočet dnů do check-in (z prvního check-in)
-                days_until_checkin = None
-                if checkins:
-                    try:
-                        checkin_dt = datetime.strptime(checkins[0], "%B %d, %Y at %I:%M:%S %p")
-                        today = datetime.now()
-                        days_until_checkin = (checkin_dt.date() - today.date()).days
-                    except ValueError:
-                        pass
-                
-                # Sestavení finálních dat
-                data[res_id] = {
-                    "voucher": voucher,
-                    "guest": guests[0] if guests else "Host",  # První host
-                    
-                    # SINGLE/GROUP konzistence
-                    "room": ", ".join(rooms) if rooms else "neznámý pokoj",  # String pro backward compatibility
-                    "rooms": rooms,  # List
-                    
-                    "alfred_pin": alfred_pins[0] if len(alfred_pins) == 1 else None,  # Single
-                    "alfred_pins": alfred_pins,  # List
-                    
-                    "card_key": card_keys[0] if len(card_keys) == 1 else None,  # Single
-                    "card_keys": card_keys,  # List
-                    
-                    "com_id": com_ids[0] if len(com_ids) == 1 else None,  # Single
-                    "com_ids": com_ids,  # List
-                    
-                    "checkin": checkins[0] if checkins else None,  # První pro backward compatibility
-                    "checkout": checkouts[0] if checkouts else None,  # První
-                    "checkins": checkins,  # List všech
-                    "checkouts": checkouts,  # List všech
-                    
-                    "price": f"{total_price:.2f}",
-                    "price_numeric": total_price,
-                    "price_formatted": f"{total_price:.2f} CZK" if total_price > 0 else "0 CZK",
-                    
-                    "status_id": status_id,
-                    "status_name": USE_STATUS_MAPPING.get(status_id, f"Unknown Status {status_id}"),
-                    "status_name_en": STATUS_MAPPING.get(status_id, f"Unknown Status {status_id}"),
-                    "status_name_cz": STATUS_MAPPING_CZ.get(status_id, f"Neznámý status {status_id}"),
-                    
-                    "market_codes": market_codes_all,
-                    "market_codes_text": ", ".join(market_codes_all) if market_codes_all else "žádné",
-                    
-                    "days_until_checkin": days_until_checkin,
-                    "hotel_id": hotel_id,
-                    "last_updated": datetime.now().isoformat(),
-                    
-                    # Metadata
-                    "is_group": is_group,
-                    "room_count": len(rooms),
-                }
-                
-                _LOGGER.info("Processed reservation %s (%s): %d rooms, status: %s", 
-                           res_id, "GROUP" if is_group else "SINGLE", len(rooms), 
-                           STATUS_MAPPING.get(status_id, f"Status {status_id}"))
-                
-            except Exception as e:
-                _LOGGER.error("Chyba při zpracování rezervace %s: %s", res_id, e)
-                continue
-
-        _LOGGER.info("Final data: %d reservations processed", len(data))
-        return data
+    _sync_entities()
+    config_entry.async_on_unload(coordinator.async_add_listener(_sync_entities))
+    config_entry.async_on_unload(
+        async_track_time_change(hass, _midnight, hour=0, minute=0, second=0)
+    )
 
 
 # ------------------------------------------------------------------ #
-# 3. Senzor – jedna rezervace = jedna entita                         #
+# 2. Senzor – jedna rezervace = jedna entita                         #
 # ------------------------------------------------------------------ #
 class PrevioV4Sensor(CoordinatorEntity, SensorEntity):
+    # PINy a klíče (s expose_credentials) jen ve stavu, recorder je neukládá
+    _unrecorded_attributes = CREDENTIAL_FIELDS
+
     def __init__(self, coordinator, res_id, device, hotel_id):
         super().__init__(coordinator)
         self._res_id = res_id
         self._attr_device_info = device
         self._attr_unique_id = f"{DOMAIN}_{hotel_id}_{res_id}"
+        self._last_available = None
+        self._last_expose = None
+        self._last_stale = None
+
+    async def async_added_to_hass(self):
+        """Zapamatuj dostupnost z prvního zápisu stavu."""
+        await super().async_added_to_hass()
+        self._last_available = self.available
+        self._last_expose = self._expose_credentials
+        self._last_stale = self.coordinator.stale
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Zapiš stav jen při změně rezervace, dostupnosti nebo zastarání dat.
+
+        Při chybě stažení zůstávají data koordinátoru, takže se entita
+        nezapisuje při každém neúspěšném pokusu - jen jednou při přechodu
+        do zastaralého stavu a zpět.
+        """
+        available = self.available
+        expose = self._expose_credentials
+        stale = self.coordinator.stale
+        if (
+            available == self._last_available
+            and expose == self._last_expose
+            and stale == self._last_stale
+            and (stale or not available or self._res_id not in self.coordinator.changed_ids)
+        ):
+            return
+        self._last_available = available
+        self._last_expose = expose
+        self._last_stale = stale
+        self.async_write_ha_state()
+
+    @property
+    def _expose_credentials(self):
+        return self.coordinator.config_entry.options.get(
+            CONF_EXPOSE_CREDENTIALS, DEFAULT_EXPOSE_CREDENTIALS
+        )
 
     @property
     def name(self):
         if not self.available:
             return f"Previo v4 {self._res_id}"
-        voucher = self.coordinator.data[self._res_id].get("voucher", "rezervace")
-        return f"Previo v4 {voucher}"
+        return f"Previo v4 {self.coordinator.data[self._res_id].voucher}"
 
     @property
     def native_value(self):
         if not self.available:
             return None
-        return self.coordinator.data[self._res_id].get("voucher")
+        return self.coordinator.data[self._res_id].voucher
 
     @property
     def extra_state_attributes(self):
@@ -353,54 +205,162 @@ class PrevioV4Sensor(CoordinatorEntity, SensorEntity):
             
         info = self.coordinator.data[self._res_id]
         
-        return {
+        attributes = {
             "res_id": self._res_id,
-            "guest": info["guest"],
+            "guest": info.guest,
             
             # Pokoje
-            "room": info["room"],  # String pro backward compatibility
-            "rooms": info["rooms"],  # List
-            "room_count": info["room_count"],
-            "is_group": info["is_group"],
-            
-            # PINy a klíče
-            "alfred_pin": info.get("alfred_pin"),  # Single nebo None
-            "alfred_pins": info["alfred_pins"],  # List
-            "card_key": info.get("card_key"),  # Single nebo None
-            "card_keys": info["card_keys"],  # List
+            "room": info.room,  # String pro backward compatibility
+            "rooms": info.rooms,  # List
+            "room_count": info.room_count,
+            "is_group": info.is_group,
             
             # ComId
-            "com_id": info.get("com_id"),  # Single nebo None
-            "com_ids": info["com_ids"],  # List
+            "com_id": info.com_id,  # Single nebo None
+            "com_ids": info.com_ids,  # List
             
             # Časy
-            "checkin": info["checkin"],  # První (backward compatibility)
-            "checkout": info["checkout"],  # První
-            "checkins": info["checkins"],  # List všech
-            "checkouts": info["checkouts"],  # List všech
-            "days_until_checkin": info["days_until_checkin"],
+            "checkin": info.checkin,  # První (backward compatibility)
+            "checkout": info.checkout,  # První
+            "checkins": info.checkins,  # List všech
+            "checkouts": info.checkouts,  # List všech
+            "days_until_checkin": info.days_until_checkin(),
             
             # Ceny
-            "price": info["price_formatted"],
-            "price_numeric": info["price_numeric"],
+            "price": info.price_formatted,
+            "price_numeric": info.price_numeric,
             
             # Status (všechny verze pro flexibilitu)
-            "status_id": info["status_id"],
-            "status": info["status_name"],          # Vybraný jazyk
-            "status_en": info["status_name_en"],    # Anglicky
-            "status_cz": info["status_name_cz"],    # Česky
+            "status_id": info.status_id,
+            "status": info.status_name,          # Vybraný jazyk
+            "status_en": info.status_name_en,    # Anglicky
+            "status_cz": info.status_name_cz,    # Česky
             
             # Ostatní
-            "market_codes": info["market_codes"],
-            "market_codes_text": info["market_codes_text"],
-            "hotel_id": info["hotel_id"],
-            "last_updated": info["last_updated"],
+            "market_codes": list(info.market_codes),
+            "market_codes_text": info.market_codes_text,
+            "hotel_id": info.hotel_id,
+            "last_updated": info.last_updated,
         }
 
+        # Poslední stažení selhalo - zobrazují se data z data_as_of
+        if self.coordinator.stale:
+            data_as_of = self.coordinator.data_as_of
+            attributes["stale"] = True
+            attributes["data_as_of"] = data_as_of.isoformat() if data_as_of else None
+
+        # PINy a klíče - volitelně, jinak jen přes službu get_credentials
+        if self._expose_credentials:
+            attributes.update({
+                "alfred_pin": info.alfred_pin,  # Single nebo None
+                "alfred_pins": info.alfred_pins,  # List
+                "card_key": info.card_key,  # Single nebo None
+                "card_keys": info.card_keys,  # List
+            })
+        return attributes
+
     @property
     def available(self):
+        # Při chybě stažení zůstává rezervace dostupná z posledních dat
         return (
-            self.coordinator.last_update_success 
-            and self.coordinator.data is not None
+            self.coordinator.data is not None
             and self._res_id in self.coordinator.data
-        )
\ No newline at end of file
+        )
+
+
+# ------------------------------------------------------------------ #
+# 3. Senzor – obsazenost jednoho pokoje                              #
+# ------------------------------------------------------------------ #
+class PrevioRoomSensor(CoordinatorEntity, SensorEntity):
+    """Obsazenost pokoje podle indexu pobytů (occupied / free)."""
+
+    def __init__(self, coordinator, room, device, hotel_id):
+        super().__init__(coordinator)
+        self._room = room
+        self._attr_device_info = device
+        self._attr_unique_id = f"{DOMAIN}_room_{hotel_id}_{room}"
+        self._attr_name = f"Previo v4 pokoj {room}"
+        self._attr_icon = "mdi:bed"
+        self._unsub_boundary = None
+        self._last_written = None
+
+    async def async_added_to_hass(self):
+        """Spočítej obsazenost po přidání entity."""
+        await super().async_added_to_hass()
+        self._update_occupancy()
+        self._last_written = (self._attr_native_value, self._attr_extra_state_attributes)
+
+    async def async_will_remove_from_hass(self):
+        """Zruš čekání na další check-in/out."""
+        self._cancel_boundary()
+        await super().async_will_remove_from_hass()
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Zapiš stav jen při změně obsazenosti pokoje."""
+        self._update_occupancy()
+        written = (self._attr_native_value, self._attr_extra_state_attributes)
+        if written == self._last_written:
+            return
+        self._last_written = written
+        self.async_write_ha_state()
+
+    @property
+    def available(self):
+        # Index obsazenosti zůstává z posledních platných dat
+        return self.coordinator.data is not None
+
+    @callback
+    def _update_occupancy(self):
+        """Aktuální a příští pobyt z indexu; časovač na nejbližší hranici pobytu.
+
+        Stav se tak přepne přesně v čase check-inu/check-outu, ne až při
+        dalším stažení dat.
+        """
+        self._cancel_boundary()
+        index = self.coordinator.occupancy
+        now = datetime.now()
+        current = index.occupant(self._room, now)
+        upcoming = index.next_stay(self._room, now)
+        data = self.coordinator.data or {}
+
+        attributes = {"room": self._room}
+        if current:
+            reservation = data.get(current[2])
+            attributes.update({
+                "res_id": current[2],
+                "voucher": reservation.voucher if reservation else None,
+                "guest": reservation.guest if reservation else None,
+                "checkin": current[0].isoformat(),
+                "checkout": current[1].isoformat(),
+            })
+        if upcoming:
+            attributes.update({
+                "next_res_id": upcoming[2],
+                "next_guest": data[upcoming[2]].guest if upcoming[2] in data else None,
+                "next_checkin": upcoming[0].isoformat(),
+            })
+        attributes["conflicts"] = index.room_conflicts(self._room)
+
+        self._attr_native_value = "occupied" if current else "free"
+        self._attr_extra_state_attributes = attributes
+
+        boundaries = [stay[1] for stay in (current,) if stay] + [
+            stay[0] for stay in (upcoming,) if stay
+        ]
+        if boundaries:
+            self._unsub_boundary = async_track_point_in_time(
+                self.hass, self._handle_boundary, min(boundaries)
+            )
+
+    @callback
+    def _handle_boundary(self, _now):
+        """Check-in nebo check-out právě nastal."""
+        self._unsub_boundary = None
+        self._handle_coordinator_update()
+
+    @callback
+    def _cancel_boundary(self):
+        if self._unsub_boundary is not None:
+            self._unsub_boundary()
+            self._unsub_boundary = None
@@ -0,0 +1,238 @@
+"""Služby Previo v4 - registrované jednou, směrované na konkrétní hotel."""
+import inspect
+import logging
+import time
+from datetime import datetime, timedelta
+
+import voluptuous as vol
+import homeassistant.helpers.config_validation as cv
+from homeassistant.core import HomeAssistant, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, PROFILE_DEFAULT_SECONDS, PROFILE_MAX_SECONDS
+from .profiling import async_profile
+
+_LOGGER = logging.getLogger(__name__)
+
+# Cíl služby: config entry nebo hotel (bez zadání jediný načtený hotel,
+# u manual_refresh a debug_entities všechny)
+TARGET_SCHEMA = {
+    vol.Exclusive("entry_id", "target"): cv.string,
+    vol.Exclusive("hotel_id", "target"): cv.string,
+}
+
+TARGET_ONLY_SCHEMA = vol.Schema(TARGET_SCHEMA)
+
+QUERY_OCCUPANCY_SCHEMA = vol.Schema({
+    **TARGET_SCHEMA,
+    vol.Optional("room"): cv.string,
+    vol.Optional("start"): cv.datetime,
+    vol.Optional("end"): cv.datetime,
+})
+
+GET_CREDENTIALS_SCHEMA = vol.Schema({
+    **TARGET_SCHEMA,
+    vol.Required("room"): cv.string,
+    vol.Optional("at"): cv.datetime,
+})
+
+
+PROFILE_SCHEMA = vol.Schema({
+    vol.Optional("seconds", default=PROFILE_DEFAULT_SECONDS): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=PROFILE_MAX_SECONDS)
+    ),
+})
+
+
+def _local_naive(value):
+    """Časy pobytů z Previo jsou lokální bez časové zóny."""
+    if value is None or value.tzinfo is None:
+        return value
+    return dt_util.as_local(value).replace(tzinfo=None)
+
+
+def target_entries(hass, call, allow_all=False):
+    """Data config entries, na které služba míří, jako [(entry_id, data)].
+
+    Bez entry_id/hotel_id je cílem jediný načtený hotel; při více hotelech
+    jen u služeb, které dávají smysl pro všechny (allow_all).
+    """
+    loaded = hass.data.get(DOMAIN, {})
+    if entry_id := call.data.get("entry_id"):
+        if entry_id not in loaded:
+            raise HomeAssistantError(f"Previo config entry {entry_id} není načtená")
+        return [(entry_id, loaded[entry_id])]
+    if hotel_id := call.data.get("hotel_id"):
+        matches = [
+            (entry_id, entry_data)
+            for entry_id, entry_data in loaded.items()
+            if str(entry_data['coordinator'].config_entry.data["hotel_id"]) == hotel_id
+        ]
+        if not matches:
+            raise HomeAssistantError(f"Hotel {hotel_id} není načtený")
+        return matches
+    if not loaded:
+        raise HomeAssistantError("Integrace Previo v4 není načtená")
+    if len(loaded) > 1 and not allow_all:
+        raise HomeAssistantError(
+            "Je načteno více hotelů - zadejte entry_id nebo hotel_id"
+        )
+    return list(loaded.items())
+
+
+def _single_target(hass, call):
+    """Koordinátor jediného cílového hotelu a identifikace pro odpověď."""
+    (entry_id, entry_data), = target_entries(hass, call)
+    coordinator = entry_data['coordinator']
+    return coordinator, {
+        "entry_id": entry_id,
+        "hotel_id": coordinator.config_entry.data["hotel_id"],
+    }
+
+
+def async_setup_services(hass: HomeAssistant):
+    """Zaregistruj služby integrace (jednou, pro všechny hotely)."""
+
+    async def debug_previo_service(call):
+        """Debug služba pro Previo - manuální refresh."""
+        for entry_id, entry_data in target_entries(hass, call, allow_all=True):
+            coordinator = entry_data['coordinator']
+            sync_callback = entry_data['sync_callback']
+            tracked = entry_data['tracked']
+
+            _LOGGER.info("=== MANUAL REFRESH START (%s) ===", entry_id)
+            _LOGGER.info("Current coordinator data: %s", coordinator.data)
+            _LOGGER.info("Currently tracked: %s", tracked)
+            _LOGGER.info("Coordinator last update success: %s", coordinator.last_update_success)
+            _LOGGER.info("Requesting manual refresh...")
+
+            await coordinator.async_request_refresh()
+
+            _LOGGER.info("Manual refresh completed")
+            _LOGGER.info("New coordinator data: %s", coordinator.data)
+            _LOGGER.info("Calling sync callback manually...")
+
+            # Synchronizace entit je @callback - volá registr a async_add_entities,
+            # takže musí běžet ve smyčce událostí, ne v executoru
+            if inspect.iscoroutinefunction(sync_callback):
+                await sync_callback()
+            else:
+                sync_callback()
+
+            _LOGGER.info("Manual sync completed")
+
+    async def debug_entities_service(call):
+        """Debug služba - zobrazí všechny entity."""
+        registry = er.async_get(hass)
+        for entry_id, entry_data in target_entries(hass, call, allow_all=True):
+            coordinator = entry_data['coordinator']
+            tracked = entry_data['tracked']
+
+            _LOGGER.info("=== ENTITIES DEBUG (%s) ===", entry_id)
+            _LOGGER.info("Tracked reservations: %s", tracked)
+            _LOGGER.info("Coordinator data keys: %s", list(coordinator.data.keys()) if coordinator.data else [])
+            _LOGGER.info("Latency: %s", coordinator.hub.latency.get(coordinator.config_entry.data["hotel_id"]))
+
+            # Jen entity této config entry z registru, ne všechny stavy HA
+            for reg_entry in er.async_entries_for_config_entry(registry, entry_id):
+                entity = hass.states.get(reg_entry.entity_id)
+                _LOGGER.info("Entity: %s", reg_entry.entity_id)
+                if entity is None:
+                    _LOGGER.info("  State: není (disabled_by: %s)", reg_entry.disabled_by)
+                    continue
+                _LOGGER.info("  State: %s", entity.state)
+                _LOGGER.info("  Attributes: %s", dict(entity.attributes))
+
+    async def query_occupancy_service(call):
+        """Obsazenost pokojů v časovém okně z indexu pobytů."""
+        coordinator, target = _single_target(hass, call)
+        index = coordinator.occupancy
+
+        start = _local_naive(call.data.get("start")) or datetime.now()
+        end = _local_naive(call.data.get("end")) or start + timedelta(seconds=1)
+        if end <= start:
+            end = start + timedelta(seconds=1)
+        rooms = [call.data["room"]] if call.data.get("room") else index.rooms
+
+        occupancy = {}
+        for room in rooms:
+            occupancy[room] = [
+                {
+                    "res_id": res_id,
+                    "voucher": coordinator.data[res_id].voucher,
+                    "guest": coordinator.data[res_id].guest,
+                    "from": stay_start.isoformat(),
+                    "to": stay_end.isoformat(),
+                }
+                for stay_start, stay_end, res_id in index.stays(room, start, end)
+            ]
+
+        return {
+            **target,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "rooms": occupancy,
+            "free_rooms": [room for room in rooms if not occupancy[room]],
+            "conflicts": [
+                conflict for conflict in index.conflicts
+                if conflict["room"] in occupancy
+                and conflict["from"] < end.isoformat()
+                and conflict["to"] > start.isoformat()
+            ],
+        }
+
+    async def get_credentials_service(call):
+        """Přístupové údaje platné pro pokoj v daném čase (pro zámky)."""
+        coordinator, target = _single_target(hass, call)
+        at = _local_naive(call.data.get("at")) or datetime.now()
+        return {
+            **target,
+            "room": call.data["room"],
+            "at": at.isoformat(),
+            "credentials": coordinator.credentials.lookup(call.data["room"], at),
+        }
+
+    async def profile_service(call):
+        """Profiluj HA po zadanou dobu a ulož pstats soubor do konfigurace."""
+        seconds = call.data["seconds"]
+        path = hass.config.path(f"{DOMAIN}_profile_{int(time.time())}.prof")
+        _LOGGER.warning("Profilování na %d s, výsledek: %s", seconds, path)
+        await async_profile(hass, seconds, path)
+        return {
+            "path": path,
+            "seconds": seconds,
+            "spans": {
+                entry_id: entry_data['coordinator'].tracer.as_dict()
+                for entry_id, entry_data in hass.data.get(DOMAIN, {}).items()
+            },
+        }
+
+    hass.services.async_register(
+        DOMAIN, "manual_refresh", debug_previo_service, schema=TARGET_ONLY_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, "debug_entities", debug_entities_service, schema=TARGET_ONLY_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        "query_occupancy",
+        query_occupancy_service,
+        schema=QUERY_OCCUPANCY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        "get_credentials",
+        get_credentials_service,
+        schema=GET_CREDENTIALS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        "profile",
+        profile_service,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,147 @@
+"""Deklarativní extrakce polí z XML přes dispatch tabulku tagů."""
+from dataclasses import dataclass
+
+_MISSING = object()
+
+# Druh uzlu tabulky podle polí, která přes něj vedou
+_SINGLE, _MANY_PARENT, _MANY_ITEM = "single", "many parent", "many item"
+
+
+def _no_intern(text):
+    return text
+
+
+@dataclass(slots=True, frozen=True)
+class Field:
+    """Jedno pole záznamu z textu (vnořeného) potomka.
+
+    path je relativní k elementu záznamu ("term/from") a čte se jako
+    findtext(path): platí první výskyt v pořadí dokumentu, prázdný element
+    dá "", chybějící default; bez defaultu pole v záznamu chybí. S child je
+    hodnotou find(path).findtext(child), tedy text potomka prvního elementu
+    na cestě ("guest" s child="name"), i když ho má až další element.
+
+    S many=True jsou položkami všechny elementy posledního kroku cesty
+    v prvním rodiči, jako find("marketCodeList").findall("marketCode"), a do
+    tuple se sbírají jejich neprázdné texty (s child text jejich potomka).
+    """
+
+    path: str
+    convert: object = None
+    default: object = _MISSING
+    intern: bool = False
+    many: bool = False
+    child: str | None = None
+
+
+def _build_table(fields):
+    """Z cest polí postav vnořené tabulky tag -> (listy, potomci, jen první)."""
+    tree = {}
+    for name, field in fields.items():
+        if field.child is not None and not field.many and field.default is _MISSING:
+            raise ValueError(f"Pole {name} s child potřebuje default")
+        *parents, leaf = field.path.split("/")
+        node = tree
+        for tag in parents:
+            entry = node.setdefault(tag, ([], {}, set()))
+            entry[2].add(_MANY_PARENT if field.many else _SINGLE)
+            node = entry[1]
+        entry = node.setdefault(leaf, ([], {}, set()))
+        entry[2].add(_MANY_ITEM if field.many else _SINGLE)
+        entry[0].append(
+            (name, field.convert, field.intern, field.many, field.child, field.default)
+        )
+
+    def freeze(node):
+        table = {}
+        for tag, (leaves, children, kinds) in node.items():
+            if len(kinds) > 1 and kinds & {_MANY_PARENT, _MANY_ITEM}:
+                # Rodič pole many se čte jen první, položky many všechny -
+                # jiná pole přes stejný tag by tím změnila význam
+                raise ValueError(f"Element <{tag}> nemůže nést pole many i další pole")
+            table[tag] = (
+                tuple(leaves),
+                freeze(children) if children else None,
+                kinds == {_MANY_PARENT},
+            )
+        return table
+
+    return freeze(tree)
+
+
+class FieldSpec:
+    """Specifikace polí připravená jednou, použitá přes extract(element, intern).
+
+    Z cest polí vznikne strom dispatch tabulek podle tagu. extract naplní
+    záznam jedním průchodem přes potomky elementu, tag každého potomka
+    vyhledá v tabulce (a zanoří se jen tam, kde nějaké pole je) místo
+    samostatného find() pro každé pole. intern se použije na text polí
+    s intern=True před převodem.
+    """
+
+    __slots__ = ("_defaults", "_many", "_table")
+
+    def __init__(self, fields):
+        if not fields:
+            raise ValueError("FieldSpec potřebuje alespoň jedno pole")
+        self._table = _build_table(fields)
+        self._defaults = {
+            name: field.default
+            for name, field in fields.items()
+            if not field.many and field.default is not _MISSING
+        }
+        self._many = tuple(name for name, field in fields.items() if field.many)
+
+    def extract(self, element, intern=_no_intern):
+        """Záznam jednoho elementu."""
+        record = {name: [] for name in self._many}
+        _walk(element, self._table, record, intern)
+        for name in self._many:
+            record[name] = tuple(record[name])
+        for name, default in self._defaults.items():
+            if name not in record:
+                record[name] = default
+        return record
+
+
+def _walk(element, table, record, intern):
+    """Naplň záznam z potomků elementu uvedených v tabulce."""
+    seen = None
+    for child in element:
+        tag = child.tag
+        entry = table.get(tag)
+        if entry is None:
+            continue
+        leaves, children, first_only = entry
+        if first_only:
+            # Rodič polí many: jen první element s tímto tagem, jako find()
+            if seen is None:
+                seen = {tag}
+            elif tag in seen:
+                continue
+            else:
+                seen.add(tag)
+        for name, convert, interned, many, sub, default in leaves:
+            if many:
+                text = child.text if sub is None else child.findtext(sub)
+                if not text:
+                    continue
+            elif name in record:
+                # První výskyt vyhrává, jako findtext()
+                continue
+            elif sub is None:
+                text = child.text or ""
+            else:
+                text = child.findtext(sub)
+                if text is None:
+                    record[name] = default
+                    continue
+            value = intern(text) if interned else text
+            if convert is not None:
+                value = convert(value)
+            if many:
+                record[name].append(value)
+            else:
+                record[name] = value
+        if children is not None:
+            _walk(child, children, record, intern)
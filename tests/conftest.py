@@ -0,0 +1,5 @@
+"""Společné nastavení testů: kořen repozitáře na sys.path."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,104 @@
+"""Archiv TV programu: zápis a stránkování podle keyset kurzoru."""
+from datetime import datetime
+
+import pytest
+
+from custom_components.cz_tv_program.archive import (
+    EPGArchive,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+def _program(day, time, title):
+    return {"date": day, "time": time, "title": title, "live": False, "premiere": True}
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = EPGArchive(str(tmp_path / "archive.db"), retention_days=36500)
+    # Všechny pořady ve stejné minutě na třech kanálech + pár dalších
+    archive.write(
+        {
+            "ct1": [_program("2020-01-01", "20:00", "A1"), _program("2020-01-01", "21:00", "A2")],
+            "ct2": [_program("2020-01-01", "20:00", "B1"), _program("2020-01-01", "22:00", "B2")],
+            "ct24": [_program("2020-01-01", "20:00", "C1"), _program("2020-01-02", "06:00", "C2")],
+        }
+    )
+    yield archive
+    archive.close()
+
+
+def _range(start, end):
+    return int(datetime.fromisoformat(start).timestamp()), int(datetime.fromisoformat(end).timestamp())
+
+
+def _all_pages(archive, start_ts, end_ts, limit, channel=None):
+    pages, cursor = [], None
+    while True:
+        programs, cursor = archive.query(start_ts, end_ts, channel, limit, cursor)
+        pages.append([program["title"] for program in programs])
+        if cursor is None:
+            return pages
+
+
+def test_pages_cover_range_once_in_order(archive):
+    start_ts, end_ts = _range("2020-01-01 00:00", "2020-01-03 00:00")
+    pages = _all_pages(archive, start_ts, end_ts, limit=2)
+    assert pages == [["A1", "B1"], ["C1", "A2"], ["B2", "C2"]]
+
+
+def test_cursor_splits_programs_with_equal_start(archive):
+    # Kurzor (start_ts, channel) uprostřed tří pořadů se stejným začátkem
+    start_ts, end_ts = _range("2020-01-01 00:00", "2020-01-03 00:00")
+    assert _all_pages(archive, start_ts, end_ts, limit=1) == [
+        ["A1"], ["B1"], ["C1"], ["A2"], ["B2"], ["C2"],
+    ]
+
+
+def test_last_full_page_has_no_cursor(archive):
+    start_ts, end_ts = _range("2020-01-01 00:00", "2020-01-03 00:00")
+    programs, cursor = archive.query(start_ts, end_ts, None, 6)
+    assert len(programs) == 6
+    assert cursor is None
+
+
+def test_range_is_half_open_and_filters_channel(archive):
+    start_ts, end_ts = _range("2020-01-01 20:00", "2020-01-01 22:00")
+    assert _all_pages(archive, start_ts, end_ts, limit=10) == [["A1", "B1", "C1", "A2"]]
+    assert _all_pages(archive, start_ts, end_ts, limit=10, channel="ct2") == [["B1"]]
+
+
+def test_rows_are_decoded(archive):
+    start_ts, end_ts = _range("2020-01-01 20:00", "2020-01-01 20:01")
+    programs, _ = archive.query(start_ts, end_ts, "ct1")
+    assert programs == [
+        {
+            "title": "A1",
+            "supertitle": "",
+            "episode_title": "",
+            "episode": "",
+            "genre": "",
+            "duration": "",
+            "description": "",
+            "link": "",
+            "live": False,
+            "premiere": True,
+            "channel_id": "ct1",
+            "start": "2020-01-01T20:00:00",
+        }
+    ]
+
+
+def test_aired_programs_are_not_rewritten(archive):
+    archive.write({"ct1": [_program("2020-01-01", "20:00", "Jiný název")]})
+    start_ts, end_ts = _range("2020-01-01 20:00", "2020-01-01 20:01")
+    programs, _ = archive.query(start_ts, end_ts, "ct1")
+    assert [program["title"] for program in programs] == ["A1"]
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor((1577905200, "ct24"))) == (1577905200, "ct24")
+    assert encode_cursor(None) is None
+    assert decode_cursor(None) is None
+    assert decode_cursor("nesmysl") is None
@@ -0,0 +1,169 @@
+"""Mřížka programu: okno, překrývající se pořady a stabilita ETagu."""
+import copy
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.cz_tv_program.const import DOMAIN
+from custom_components.cz_tv_program.grid import async_get_grid
+from custom_components.cz_tv_program.schedule import (
+    ScheduleIndex,
+    build_grid,
+    grid_etag,
+    grid_window,
+)
+
+DAY = datetime(2026, 10, 19)
+
+
+def _program(hour, minute, title, duration="30", genre="Zprávy", live=False):
+    return {
+        "date": DAY.strftime("%Y-%m-%d"),
+        "time": f"{hour:02d}:{minute:02d}",
+        "title": title,
+        "genre": genre,
+        "duration": duration,
+        "live": live,
+        "premiere": False,
+    }
+
+
+def _schedule():
+    return {
+        "ct1": [
+            _program(9, 30, "Ráno"),
+            _program(10, 0, "Film", "90", "Film"),
+            # Film podle stopáže běží do 11:30, končí ale začátkem dalšího pořadu
+            _program(10, 45, "Zprávy", live=True),
+            _program(11, 15, "Seriál", "60", "Seriál"),
+        ],
+        "ct24": [_program(10, 0, "Studio 6", "240")],
+    }
+
+
+def _titles(grid, column):
+    return [grid["strings"][sid] for sid in column["title"]]
+
+
+def _column(grid, channel_id):
+    return next(column for column in grid["channels"] if column["id"] == channel_id)
+
+
+@pytest.mark.parametrize(
+    ("start", "slot", "expected"),
+    [
+        (DAY.replace(hour=10, minute=17, second=42), 30, DAY.replace(hour=10)),
+        (DAY.replace(hour=10, minute=17), 15, DAY.replace(hour=10, minute=15)),
+        (DAY.replace(hour=10, minute=30), 30, DAY.replace(hour=10, minute=30)),
+    ],
+)
+def test_window_aligns_down_to_slot(start, slot, expected):
+    assert grid_window(start, 3, slot) == (expected, expected + timedelta(hours=3))
+
+
+def test_window_converts_aware_start_to_local_time():
+    aware = DAY.replace(hour=10, minute=5).astimezone(timezone.utc)
+    start, _ = grid_window(aware, 1, 30)
+    assert start.tzinfo is None
+    assert start == DAY.replace(hour=10)
+
+
+def test_grid_clips_programs_to_window():
+    index = ScheduleIndex(_schedule())
+    start, end = grid_window(DAY.replace(hour=10, minute=10), 1, 30)
+    grid = build_grid(index, ["ct1", "ct24"], start, end, 30)
+
+    assert (grid["start"], grid["end"], grid["slots"]) == (
+        int(start.timestamp()), int(end.timestamp()), 2
+    )
+    ct1 = _column(grid, "ct1")
+    # Ráno skončilo v 10:00 přesně na začátku okna, Seriál začíná po jeho konci
+    assert _titles(grid, ct1) == ["Film", "Zprávy"]
+    # Časy zůstanou skutečné, slot a span jen v rámci okna
+    assert ct1["start"][0] == int(DAY.replace(hour=10).timestamp())
+    assert ct1["slot"] == [0, 1]
+    assert ct1["span"] == [2, 1]
+    ct24 = _column(grid, "ct24")
+    assert (ct24["slot"], ct24["span"]) == ([0], [2])
+    assert ct24["end"] == [int(DAY.replace(hour=14).timestamp())]
+
+
+def test_overlapping_programs_end_at_next_start():
+    index = ScheduleIndex(_schedule())
+    start, end = grid_window(DAY.replace(hour=10), 2, 15)
+    ct1 = _column(build_grid(index, ["ct1"], start, end, 15), "ct1")
+
+    assert ct1["end"][0] == ct1["start"][1] == int(DAY.replace(hour=10, minute=45).timestamp())
+    # Sloty pořadů se nepřekrývají a na sebe navazují
+    assert ct1["slot"] == [0, 3, 5]
+    assert ct1["span"] == [3, 2, 3]
+    assert ct1["flags"] == [0, 1, 0]
+
+
+def test_programs_with_same_start_take_one_cell():
+    data = _schedule()
+    data["ct1"].insert(2, _program(10, 45, "Předpověď"))
+    index = ScheduleIndex(data)
+    start, end = grid_window(DAY.replace(hour=10), 2, 15)
+    grid = build_grid(index, ["ct1"], start, end, 15)
+    ct1 = _column(grid, "ct1")
+
+    # Pořad s nulovou délkou (začátek stejný jako další) v mřížce není
+    assert _titles(grid, ct1) == ["Film", "Zprávy", "Seriál"]
+    assert ct1["slot"] == [0, 3, 5]
+
+
+def test_strings_are_shared_between_channels():
+    index = ScheduleIndex(_schedule())
+    start, end = grid_window(DAY.replace(hour=10), 2, 30)
+    grid = build_grid(index, ["ct1", "ct24"], start, end, 30)
+    assert len(grid["strings"]) == len(set(grid["strings"]))
+    assert _column(grid, "ct1")["genre"][1] == _column(grid, "ct24")["genre"][0]
+
+
+def test_etag_is_stable_for_unchanged_data():
+    start, _ = grid_window(DAY.replace(hour=10), 3, 30)
+    etag = grid_etag(ScheduleIndex(_schedule()), ["ct1"], start, 3, 30)
+    # Nově stažený, obsahově stejný rozvrh
+    assert grid_etag(ScheduleIndex(copy.deepcopy(_schedule())), ["ct1"], start, 3, 30) == etag
+
+    # Změna jiného kanálu ETag mřížky nezmění
+    other = _schedule()
+    other["ct24"][0]["title"] = "Události"
+    assert grid_etag(ScheduleIndex(other), ["ct1"], start, 3, 30) == etag
+
+    changed = _schedule()
+    changed["ct1"][1]["title"] = "Jiný film"
+    assert grid_etag(ScheduleIndex(changed), ["ct1"], start, 3, 30) != etag
+    index = ScheduleIndex(_schedule())
+    assert grid_etag(index, ["ct1"], start + timedelta(minutes=30), 3, 30) != etag
+    assert grid_etag(index, ["ct1"], start, 4, 30) != etag
+    assert grid_etag(index, ["ct1"], start, 3, 15) != etag
+    assert grid_etag(index, ["ct1", "ct24"], start, 3, 30) != etag
+
+
+async def test_unchanged_grid_is_served_from_cache(hass):
+    entry_data = {
+        "schedule": ScheduleIndex(_schedule()),
+        "api": SimpleNamespace(channels=["ct1", "ct24"]),
+    }
+    hass.data[DOMAIN] = {"entry": entry_data}
+    moment = DAY.replace(hour=10, minute=5)
+
+    etag, grid = async_get_grid(hass, ["ct1", "ct9"], moment, 2, 30)
+    assert [column["id"] for column in grid["channels"]] == ["ct1"]
+    assert grid["etag"] == etag
+
+    # Nový index se stejným obsahem: stejný ETag i objekt z cache
+    entry_data["schedule"] = ScheduleIndex(copy.deepcopy(_schedule()))
+    again = async_get_grid(hass, ["ct1"], moment + timedelta(minutes=10), 2, 30)
+    assert again[0] == etag
+    assert again[1] is grid
+
+    changed = _schedule()
+    changed["ct1"][1]["title"] = "Jiný film"
+    entry_data["schedule"] = ScheduleIndex(changed)
+    new_etag, new_grid = async_get_grid(hass, ["ct1"], moment, 2, 30)
+    assert new_etag != etag
+    assert "Jiný film" in new_grid["strings"]
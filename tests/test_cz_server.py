@@ -0,0 +1,189 @@
+"""Samostatný EPG server a čtení rozvrhu z něj (source_url)."""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from aiohttp import ClientSession, web
+
+from custom_components.cz_tv_program.api import CzTVProgramAPI
+from custom_components.cz_tv_program.server import EPGServer
+
+# Skutečné spojení přes localhost mezi klientem, serverem a upstreamem
+pytestmark = pytest.mark.usefixtures("socket_enabled")
+
+
+def _program(start, title, duration="30"):
+    return {
+        "date": start.strftime("%Y-%m-%d"),
+        "time": start.strftime("%H:%M"),
+        "title": title,
+        "genre": "Dokument",
+        "duration": duration,
+        "live": False,
+        "premiere": False,
+    }
+
+
+def _schedule():
+    now = datetime.now().replace(second=0, microsecond=0)
+    return {
+        "ct1": [
+            _program(now - timedelta(minutes=10), "Zprávy"),
+            _program(now + timedelta(minutes=20), "Počasí"),
+            _program(now + timedelta(minutes=50), "Film", "90"),
+        ],
+        "ct24": [_program(now - timedelta(minutes=5), "Studio 6")],
+    }
+
+
+class Upstream:
+    """EPG server na druhé straně source_url: ETag, 304 a řízené výpadky."""
+
+    def __init__(self, data):
+        self.data = data
+        self.etag = '"v1"'
+        self.status = 200
+        self.requests = []
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get("/api/schedule", self.handle)
+        return app
+
+    async def handle(self, request):
+        self.requests.append((request.query.get("channels"), request.headers.get("If-None-Match")))
+        if self.status != 200:
+            return web.Response(status=self.status)
+        if request.headers.get("If-None-Match") == self.etag:
+            return web.Response(status=304, headers={"ETag": self.etag})
+        channels = request.query["channels"].split(",")
+        return web.json_response(
+            {"channels": {c: self.data[c] for c in channels if c in self.data}},
+            headers={"ETag": self.etag},
+        )
+
+
+@pytest.fixture
+async def upstream(aiohttp_client):
+    upstream = Upstream(_schedule())
+    client = await aiohttp_client(upstream.app())
+    upstream.url = str(client.make_url(""))
+    return upstream
+
+
+async def test_remote_fetch_revalidates_with_etag(upstream):
+    async with ClientSession() as session:
+        api = CzTVProgramAPI(None, "test", ["ct1", "ct24"], session=session, source_url=upstream.url)
+        first = await api.async_update_data()
+        assert [p["title"] for p in first["ct1"]] == ["Zprávy", "Počasí", "Film"]
+        assert api.text_stats["references"] > 0
+
+        # Nezměněný rozvrh: 304 a stejná data bez nového parsování
+        second = await api.async_update_data()
+        assert second is first
+        assert upstream.requests == [("ct1,ct24", None), ("ct1,ct24", '"v1"')]
+
+        upstream.etag = '"v2"'
+        upstream.data["ct24"] = [_program(datetime.now(), "Události")]
+        third = await api.async_update_data()
+        assert [p["title"] for p in third["ct24"]] == ["Události"]
+
+
+async def test_remote_fetch_keeps_last_schedule_on_errors(upstream):
+    async with ClientSession() as session:
+        api = CzTVProgramAPI(None, "test", ["ct1"], session=session, source_url=upstream.url)
+        upstream.status = 500
+        # Bez předchozích dat není co vrátit
+        assert await api.async_update_data() == {}
+
+        upstream.status = 200
+        data = await api.async_update_data()
+        upstream.status = 503
+        assert await api.async_update_data() is data
+        # Po chybě se dál revaliduje posledním ETagem
+        upstream.status = 200
+        assert await api.async_update_data() is data
+        assert upstream.requests[-1] == ("ct1", '"v1"')
+
+    async with ClientSession() as session:
+        api = CzTVProgramAPI(
+            None, "test", ["ct1"], session=session, source_url="http://127.0.0.1:9"
+        )
+        assert await api.async_update_data() == {}
+
+
+@pytest.fixture
+async def server(upstream, aiohttp_client):
+    """EPG server čtoucí upstream přes source_url, po prvním načtení."""
+    server = EPGServer("test", ["ct1", "ct24"], timedelta(hours=6), source_url=upstream.url)
+    client = await aiohttp_client(server.app())
+    for _ in range(200):
+        if server.fetched_at is not None:
+            break
+        await asyncio.sleep(0.01)
+    assert server.fetched_at is not None
+    return client
+
+
+async def test_server_endpoints(server):
+    response = await server.get("/api/schedule", params={"channels": "ct1"})
+    assert response.status == 200
+    body = await response.json()
+    assert list(body["channels"]) == ["ct1"]
+    assert len(body["channels"]["ct1"]) == 3
+
+    response = await server.get("/api/now", params={"next": "2"})
+    body = await response.json()
+    assert body["ct1"]["current"]["title"] == "Zprávy"
+    assert [p["title"] for p in body["ct1"]["next"]] == ["Počasí", "Film"]
+    assert body["ct24"]["current"]["title"] == "Studio 6"
+
+    start = datetime.now().replace(second=0, microsecond=0)
+    response = await server.get(
+        "/api/range",
+        params={
+            "channel": "ct1",
+            "start": (start + timedelta(minutes=25)).isoformat(),
+            "end": (start + timedelta(minutes=55)).isoformat(),
+        },
+    )
+    assert [p["title"] for p in (await response.json())["programs"]] == ["Počasí", "Film"]
+
+    response = await server.get("/api/grid", params={"channels": "ct1", "hours": "2"})
+    assert response.status == 200
+    grid = await response.json()
+    assert grid["etag"] == response.headers["ETag"].strip('"')
+
+
+@pytest.mark.parametrize(
+    "path", ["/api/schedule", "/api/now", "/api/grid?hours=3"]
+)
+async def test_server_answers_304_for_current_etag(server, path):
+    response = await server.get(path)
+    etag = response.headers["ETag"]
+    response = await server.get(path, headers={"If-None-Match": etag})
+    assert response.status == 304
+    response = await server.get(path, headers={"If-None-Match": '"old"'})
+    assert response.status == 200
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/api/now?next=x",
+        "/api/now?next=1000",
+        "/api/range?channel=ct1",
+        "/api/range?channel=ct9&start=2026-01-01T00:00&end=2026-01-02T00:00",
+        "/api/grid?hours=0",
+        "/api/grid?slot=1",
+    ],
+)
+async def test_server_rejects_invalid_parameters(server, path):
+    assert (await server.get(path)).status == 400
+
+
+async def test_server_without_data_answers_503(aiohttp_client):
+    server = EPGServer("test", ["ct1"], timedelta(hours=6), source_url="http://127.0.0.1:9")
+    client = await aiohttp_client(server.app())
+    response = await client.get("/api/schedule")
+    assert response.status == 503
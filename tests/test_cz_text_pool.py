@@ -0,0 +1,91 @@
+"""TextPool: opakované texty programu sdílí jeden objekt a statistiky sedí."""
+import sys
+from datetime import datetime
+
+from custom_components.cz_tv_program.api import CzTVProgramAPI, TextPool
+
+DESCRIPTION = "Zpravodajská relace s přehledem událostí dne. " * 4
+
+
+def _copy(text):
+    """Stejný text jako nový objekt (jako by ho vrátil parser XML)."""
+    return "".join(list(text))
+
+
+def _porad(time, title, genre="Zpravodajství", description=DESCRIPTION):
+    return (
+        f"<porad><cas>{time}</cas><datum>2026-10-19</datum>"
+        f"<nazvy><nazev>{title}</nazev></nazvy><zanr>{genre}</zanr>"
+        f"<noticka>{description}</noticka></porad>"
+    )
+
+
+def _program_xml(*porady):
+    return f"<program>{''.join(porady)}</program>"
+
+
+def test_pool_returns_one_object_per_text():
+    pool = TextPool()
+    first = pool.intern(_copy("Události"))
+    second = pool.intern(_copy("Události"))
+    assert first == second == "Události"
+    assert first is second
+    assert pool.intern(_copy("Počasí")) is not first
+    # Prázdné texty se vrací beze změny a nepočítají se
+    assert pool.intern(None) is None
+    assert pool.intern("") == ""
+    assert pool.references == 3
+
+
+def test_stats_count_references_and_bytes():
+    pool = TextPool()
+    assert pool.stats() == {
+        "unique_strings": 0,
+        "references": 0,
+        "bytes_without_pool": 0,
+        "bytes_with_pool": 0,
+        "saved_ratio": 0.0,
+    }
+
+    texts = [DESCRIPTION] * 3 + ["Události"] * 2 + ["Počasí"]
+    for text in texts:
+        pool.intern(_copy(text))
+    raw = sum(sys.getsizeof(text) for text in texts)
+    pooled = sys.getsizeof(DESCRIPTION) + sys.getsizeof("Události") + sys.getsizeof("Počasí")
+    assert pool.stats() == {
+        "unique_strings": 3,
+        "references": 6,
+        "bytes_without_pool": raw,
+        "bytes_with_pool": pooled,
+        "saved_ratio": round(1 - pooled / raw, 3),
+    }
+
+
+def test_parsed_schedule_shares_texts_across_channels():
+    api = CzTVProgramAPI(None, "test", ["ct1", "ct24"], session=object())
+    pool = TextPool()
+    day = datetime(2026, 10, 19)
+    ct1 = api._parse_xml(
+        _program_xml(_porad("18:00", "Události"), _porad("19:00", "Počasí", "Magazín")),
+        day,
+        pool,
+    )
+    ct24 = api._parse_xml(
+        _program_xml(_porad("18:00", "Události"), _porad("20:00", "Události")), day, pool
+    )
+
+    programs = ct1 + ct24
+    news = [program for program in programs if program["title"] == "Události"]
+    assert len(news) == 3
+    # Titul, žánr, popis i datum jsou ve všech pořadech tentýž objekt
+    for field in ("title", "genre", "description", "date"):
+        assert all(program[field] is news[0][field] for program in news)
+    assert ct1[0]["time"] is ct24[0]["time"]
+    assert all(program["description"] is news[0]["description"] for program in programs)
+
+    # Každý pořad: čas, datum, titul, žánr a popis
+    stats = pool.stats()
+    assert stats["references"] == 5 * len(programs)
+    # 18:00, 19:00, 20:00, datum, 2 tituly, 2 žánry, popis
+    assert stats["unique_strings"] == 9
+    assert stats["bytes_with_pool"] < stats["bytes_without_pool"] / 2
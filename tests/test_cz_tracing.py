@@ -0,0 +1,101 @@
+"""Spany aktualizace programu ČT (vnoření, časy, vzorkování) a služba profile."""
+import logging
+import pstats
+
+import pytest
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.cz_tv_program import profiling, tracing
+from custom_components.cz_tv_program.profiling import async_profile
+from custom_components.cz_tv_program.tracing import SpanTracer
+
+
+class Clock:
+    """perf_counter, který se posouvá jen ručně."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(tracing, "time", clock)
+    return clock
+
+
+def test_nested_spans_are_timed_separately(clock):
+    tracer = SpanTracer(logging.getLogger("test"))
+    tracer.start_cycle()
+    # Stažení všech kanálů s parsováním každého z nich uvnitř
+    with tracer.span("fetch"):
+        for duration in (0.020, 0.030):
+            clock.now += 0.100
+            with tracer.span("parse"):
+                clock.now += duration
+    with tracer.span("fanout"):
+        clock.now += 0.002
+
+    assert tracer.as_dict() == {
+        "last_cycle_ms": {"parse": 50.0, "fetch": 250.0, "fanout": 2.0},
+        "totals": {
+            "parse": {"count": 2, "total_ms": 50.0, "avg_ms": 25.0, "max_ms": 30.0},
+            "fetch": {"count": 1, "total_ms": 250.0, "avg_ms": 250.0, "max_ms": 250.0},
+            "fanout": {"count": 1, "total_ms": 2.0, "avg_ms": 2.0, "max_ms": 2.0},
+        },
+    }
+
+    # Nová aktualizace začne last_cycle znovu, součty zůstávají
+    tracer.start_cycle()
+    with tracer.span("fanout"):
+        clock.now += 0.004
+    stats = tracer.as_dict()
+    assert stats["last_cycle_ms"] == {"fanout": 4.0}
+    assert stats["totals"]["fanout"] == {
+        "count": 2, "total_ms": 6.0, "avg_ms": 3.0, "max_ms": 4.0,
+    }
+
+
+def test_span_is_recorded_when_block_raises(clock):
+    tracer = SpanTracer(logging.getLogger("test"))
+    with pytest.raises(TimeoutError), tracer.span("fetch"):
+        clock.now += 0.003
+        raise TimeoutError
+    assert tracer.spans["fetch"]["total_ms"] == pytest.approx(3.0)
+
+
+def test_debug_tracing_samples_every_nth_cycle(caplog):
+    logger = logging.getLogger("test.cz.tracing")
+    tracer = SpanTracer(logger, sample_every=2)
+
+    # Bez DEBUG logu se netrasuje ani vzorkovaná aktualizace
+    caplog.set_level(logging.INFO, logger.name)
+    tracer.start_cycle()
+    assert not tracer.sampled
+
+    caplog.set_level(logging.DEBUG, logger.name)
+    sampled = []
+    for _ in range(4):
+        tracer.start_cycle()
+        sampled.append(tracer.sampled)
+        tracer.record("fetch", 1.5)
+    assert sampled == [False, True, False, True]
+    assert [r.getMessage() for r in caplog.records] == ["Span fetch: 1.5 ms"] * 2
+
+
+async def test_profile_writes_stats_and_rejects_parallel_run(hass, tmp_path):
+    path = tmp_path / "cz.prof"
+    await async_profile(hass, 0.01, str(path))
+    assert pstats.Stats(str(path)).total_calls > 0
+
+    profiler = profiling.cProfile.Profile()
+    profiler.enable()
+    try:
+        with pytest.raises(HomeAssistantError):
+            await async_profile(hass, 0.01, str(tmp_path / "second.prof"))
+    finally:
+        profiler.disable()
+    assert not (tmp_path / "second.prof").exists()
@@ -0,0 +1,119 @@
+"""Watchlist: automat Aho-Corasick a inkrementální hledání po úsecích."""
+from collections import defaultdict
+
+from custom_components.cz_tv_program.schedule import ScheduleIndex
+from custom_components.cz_tv_program.watchlist import (
+    AhoCorasick,
+    WatchlistMatcher,
+    fold_text,
+    parse_watchlist,
+)
+
+
+def _naive_matches(patterns, text):
+    return sorted(
+        (start + len(pattern) - 1, index)
+        for index, pattern in enumerate(patterns)
+        for start in range(len(text))
+        if text.startswith(pattern, start)
+    )
+
+
+def test_aho_corasick_finds_overlapping_patterns():
+    patterns = ["he", "she", "his", "hers"]
+    automaton = AhoCorasick(patterns)
+    text = "ushers and his sheep"
+    assert sorted(automaton.iter_matches(text)) == _naive_matches(patterns, text)
+
+
+def test_aho_corasick_follows_failure_links():
+    # "abcd" selže na "e" a musí pokračovat z "bc" -> "bcde"
+    patterns = ["abcd", "bcde", "c", "cd"]
+    automaton = AhoCorasick(patterns)
+    for text in ("abcde", "xabcabcdex", "cccd", "", "zzz"):
+        assert sorted(automaton.iter_matches(text)) == _naive_matches(patterns, text)
+
+
+def test_aho_corasick_duplicate_and_nested_patterns():
+    patterns = ["aa", "a", "aa"]
+    automaton = AhoCorasick(patterns)
+    assert sorted(automaton.iter_matches("aaa")) == _naive_matches(patterns, "aaa")
+
+
+def test_fold_text_and_parse_watchlist():
+    assert fold_text("Příliš ŽLUŤOUČKÝ kůň") == "prilis zlutoucky kun"
+    assert parse_watchlist("  Kriminálka \n\nZprávy\nKriminálka") == ["Kriminálka", "Zprávy"]
+    assert parse_watchlist(["a", " a ", "b"]) == ["a", "b"]
+    assert parse_watchlist(None) == []
+
+
+def _program(day, time, title, **fields):
+    return {"date": day, "time": time, "title": title, **fields}
+
+
+def _index(*programs_by_channel):
+    data = defaultdict(list)
+    for channel_id, program in programs_by_channel:
+        data[channel_id].append(program)
+    return ScheduleIndex(dict(data))
+
+
+def test_matches_whole_words_without_diacritics():
+    matcher = WatchlistMatcher(["zpravy", "Kriminálka"])
+    index = _index(
+        ("ct1", _program("2026-10-19", "19:00", "Události", description="Hlavní ZPRÁVY dne")),
+        ("ct1", _program("2026-10-19", "20:00", "Zpravodajství")),
+        ("ct2", _program("2026-10-19", "21:00", "KRIMINALKA Anděl")),
+    )
+    matches = matcher.scan(index)
+    assert [(m["channel_id"], m["title"], m["patterns"]) for m in matches] == [
+        ("ct1", "Události", ["zpravy"]),
+        ("ct2", "KRIMINALKA Anděl", ["Kriminálka"]),
+    ]
+    assert matches[0]["start"] == "2026-10-19T19:00:00"
+
+
+def test_only_changed_slices_are_rescanned():
+    matcher = WatchlistMatcher(["film"])
+    day1 = _program("2026-10-19", "20:00", "Film")
+    day2 = _program("2026-10-20", "20:00", "Seriál")
+    assert len(matcher.scan(_index(("ct1", day1), ("ct1", day2)))) == 1
+    assert matcher.scanned_slices == 2
+
+    changed = _program("2026-10-20", "20:00", "Film o filmu")
+    new = matcher.scan(_index(("ct1", day1), ("ct1", changed)))
+    assert matcher.scanned_slices == 1
+    assert [m["title"] for m in new] == ["Film o filmu"]
+    assert [m["title"] for m in matcher.matches] == ["Film", "Film o filmu"]
+
+
+def test_failed_channel_does_not_repeat_matches():
+    matcher = WatchlistMatcher(["film"])
+    ct1 = _program("2026-10-19", "20:00", "Film")
+    ct2 = _program("2026-10-19", "21:00", "Film na dvojce")
+    assert len(matcher.scan(_index(("ct1", ct1), ("ct2", ct2)))) == 2
+
+    # Stažení ct2 selhalo - kanál v rozvrhu chybí
+    assert matcher.scan(_index(("ct1", ct1))) == []
+    assert [m["channel_id"] for m in matcher.matches] == ["ct1"]
+
+    # Po úspěšném stažení už shoda na ct2 není nová
+    assert matcher.scan(_index(("ct1", ct1), ("ct2", ct2))) == []
+    assert len(matcher.matches) == 2
+
+
+def test_reported_matches_expire_with_their_day():
+    matcher = WatchlistMatcher(["film"])
+    old = _program("2026-10-19", "20:00", "Film")
+    assert len(matcher.scan(_index(("ct1", old)))) == 1
+    matcher.scan(_index(("ct1", _program("2026-10-20", "20:00", "Zprávy"))))
+    # Den 19. z rozvrhu vypadl, jeho shody se zapomněly
+    assert len(matcher.scan(_index(("ct1", old)))) == 1
+
+
+def test_empty_watchlist_clears_matches():
+    matcher = WatchlistMatcher(["film"])
+    matcher.scan(_index(("ct1", _program("2026-10-19", "20:00", "Film"))))
+    matcher.set_patterns([])
+    assert matcher.scan(_index(("ct1", _program("2026-10-19", "20:00", "Film")))) == []
+    assert matcher.matches == []
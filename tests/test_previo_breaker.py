@@ -0,0 +1,179 @@
+"""Circuit breaker a zachování posledních dat při chybách Previa."""
+from datetime import timedelta
+
+import pytest
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    MockEntityPlatform,
+    async_fire_time_changed,
+)
+
+from custom_components.previo_v4.breaker import CircuitBreaker
+from custom_components.previo_v4.const import BREAKER_FAILURE_THRESHOLD, SNAPSHOT_SAVE_DELAY
+from custom_components.previo_v4.coordinator import PrevioCoordinator
+from custom_components.previo_v4.parser import ReservationStreamParser
+from custom_components.previo_v4.sensor import PrevioV4Sensor
+
+INTERVAL = timedelta(minutes=5)
+
+
+def test_breaker_opens_after_threshold_and_blocks_until_backoff():
+    breaker = CircuitBreaker(3, timedelta(hours=2))
+    assert breaker.record_failure(INTERVAL, now=0) is None
+    assert breaker.record_failure(INTERVAL, now=0) is None
+    assert breaker.allow(now=0)
+
+    assert breaker.record_failure(INTERVAL, now=100) == timedelta(minutes=10)
+    assert breaker.state == "open"
+    assert not breaker.allow(now=699)
+    assert breaker.retry_in(now=600) == timedelta(seconds=100)
+    assert breaker.allow(now=700)
+    assert breaker.state == "half_open"
+
+
+def test_failed_trial_reopens_with_longer_backoff_up_to_limit():
+    breaker = CircuitBreaker(1, timedelta(minutes=30))
+    assert breaker.record_failure(INTERVAL, now=0) == timedelta(minutes=10)
+    assert breaker.allow(now=600)
+    # Jedna chyba zkušebního požadavku stačí k dalšímu otevření
+    assert breaker.record_failure(INTERVAL, now=600) == timedelta(minutes=20)
+    assert breaker.allow(now=1800)
+    assert breaker.record_failure(INTERVAL, now=1800) == timedelta(minutes=30)
+    assert breaker.opened == 3
+
+
+def test_success_closes_and_resets_breaker():
+    breaker = CircuitBreaker(2, timedelta(hours=2))
+    breaker.record_failure(INTERVAL, now=0)
+    breaker.record_failure(INTERVAL, now=0)
+    breaker.allow(now=10_000)
+    breaker.record_success()
+    assert breaker.as_dict() == {
+        "state": "closed",
+        "consecutive_failures": 0,
+        "times_opened": 0,
+        "retry_in_s": 0,
+    }
+    assert breaker.record_failure(INTERVAL, now=10_000) is None
+
+
+class FlakyClient:
+    """Jedna stránka s jednou rezervací, dokud se nenastaví chyba."""
+
+    def __init__(self):
+        self.error = None
+        self.calls = 0
+
+    async def async_fetch_page(self, page, page_size, date_from, date_to, builder):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        body = (
+            b'<?xml version="1.0"?><reservations><reservation><resId>1</resId>'
+            b"<voucher>V1</voucher><status><statusId>2</statusId></status>"
+            b"<object><name>101</name></object>"
+            b"<term><from>2026-10-19 14:00:00</from><to>2026-10-21 10:00:00</to></term>"
+            b"</reservation></reservations>"
+        )
+        parser = ReservationStreamParser(page, builder)
+        parser.feed(body)
+        count, total = parser.close()
+        return count, total, len(body), 0.0
+
+
+@pytest.fixture
+async def coordinator(hass):
+    entry = MockConfigEntry(
+        domain="previo_v4",
+        data={"login": "test", "password": "test", "hotel_id": "1"},
+    )
+    entry.add_to_hass(hass)
+    coordinator = PrevioCoordinator(hass, entry)
+    coordinator.client = FlakyClient()
+    return coordinator
+
+
+async def test_errors_keep_last_data_and_open_breaker(coordinator):
+    await coordinator.async_refresh()
+    assert list(coordinator.data) == ["1"]
+    assert not coordinator.stale
+
+    coordinator.client.error = ConnectionError("Previo nedostupné")
+    for _ in range(BREAKER_FAILURE_THRESHOLD):
+        await coordinator.async_refresh()
+
+    # Entity zůstanou u posledních dat, jen jako zastaralá
+    assert list(coordinator.data) == ["1"]
+    assert coordinator.stale
+    assert coordinator.error_counts["request"] == BREAKER_FAILURE_THRESHOLD
+    assert coordinator.breaker.state == "open"
+    assert coordinator.poll_mode == "backoff"
+    assert coordinator.update_interval == coordinator._base_interval() * 2
+
+    # Otevřený breaker Previo nevolá
+    calls = coordinator.client.calls
+    await coordinator.async_refresh()
+    assert coordinator.client.calls == calls
+    assert list(coordinator.data) == ["1"]
+
+
+async def test_successful_trial_closes_breaker(coordinator):
+    coordinator.client.error = ConnectionError("Previo nedostupné")
+    for _ in range(BREAKER_FAILURE_THRESHOLD):
+        await coordinator.async_refresh()
+    assert coordinator.data is None
+
+    coordinator.breaker._open_until = 0.0
+    coordinator.client.error = None
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert coordinator.breaker.state == "closed"
+    assert list(coordinator.data) == ["1"]
+
+
+async def _restarted(hass, coordinator):
+    """Ulož snapshot a vytvoř koordinátor jako po restartu HA, obnovený z něj."""
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=SNAPSHOT_SAVE_DELAY + 1))
+    await hass.async_block_till_done()
+    restarted = PrevioCoordinator(hass, coordinator.config_entry)
+    restarted.client = FlakyClient()
+    await restarted.tracker.async_load()
+    assert restarted.async_restore() == 1
+    return restarted
+
+
+@pytest.mark.parametrize("fails", [False, True])
+async def test_restored_data_is_stale_until_first_refresh(hass, coordinator, fails):
+    await coordinator.async_refresh()
+    last_success = coordinator.data_as_of
+    restarted = await _restarted(hass, coordinator)
+
+    # Ze snapshotu: zastaralé, se stářím z posledního úspěšného stažení
+    assert restarted.stale
+    assert restarted.data_as_of == last_success
+    sensor = PrevioV4Sensor(restarted, "1", None, "1")
+    await MockEntityPlatform(hass).async_add_entities([sensor])
+    attributes = hass.states.get(sensor.entity_id).attributes
+    assert attributes["stale"] is True
+    assert attributes["data_as_of"] == last_success.isoformat()
+
+    # První stažení na pozadí jako v async_setup_entry
+    if fails:
+        restarted.client.error = ConnectionError("Previo nedostupné")
+    restarted.config_entry.async_create_background_task(
+        hass, restarted.async_refresh(), "first_refresh"
+    )
+    await hass.async_block_till_done(wait_background_tasks=True)
+    attributes = hass.states.get(sensor.entity_id).attributes
+    if fails:
+        assert restarted.stale
+        assert restarted.data_as_of == last_success
+        assert attributes["stale"] is True
+    else:
+        assert not restarted.stale
+        assert restarted.data_as_of > last_success
+        assert "stale" not in attributes
+        assert "data_as_of" not in attributes
+    assert attributes["room"] == "101"
+    await sensor.async_remove()
@@ -0,0 +1,162 @@
+"""Detekce změn rezervací: události, snapshot a retence odebraných."""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_capture_events, async_fire_time_changed
+
+from custom_components.previo_v4.changes import ReservationTracker
+from custom_components.previo_v4.const import (
+    EVENT_RESERVATION_CREATED,
+    EVENT_RESERVATION_REMOVED,
+    EVENT_RESERVATION_UPDATED,
+    SNAPSHOT_SAVE_DELAY,
+)
+from custom_components.previo_v4.model import Reservation, Stay
+
+SNAPSHOT_KEY = "previo_v4.entry.snapshot"
+
+
+def _reservation(res_id, pins=("1234",), keys=("CARD-1",), guest="Jan Novák", status="2"):
+    return Reservation(
+        res_id=res_id,
+        hotel_id="1",
+        voucher=f"V{res_id}",
+        status_id=status,
+        stays=(
+            Stay(
+                room="101",
+                checkin=datetime(2026, 10, 19, 14, 0),
+                checkout=datetime(2026, 10, 21, 10, 0),
+                guest=guest,
+                alfred_pins=pins,
+                card_keys=keys,
+            ),
+        ),
+    )
+
+
+async def _flush_store(hass):
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=SNAPSHOT_SAVE_DELAY + 1))
+    await hass.async_block_till_done()
+
+
+async def _seeded_tracker(hass, data):
+    tracker = ReservationTracker(hass, "entry", "1")
+    tracker.update(data)
+    return tracker
+
+
+def _assert_no_credentials(payload):
+    text = json.dumps(payload, default=str)
+    for secret in ("1234", "5678", "CARD-1", "CARD-2"):
+        assert secret not in text
+
+
+async def test_events_never_carry_credentials(hass):
+    created = async_capture_events(hass, EVENT_RESERVATION_CREATED)
+    updated = async_capture_events(hass, EVENT_RESERVATION_UPDATED)
+    removed = async_capture_events(hass, EVENT_RESERVATION_REMOVED)
+    tracker = await _seeded_tracker(hass, {"1": _reservation("1")})
+
+    tracker.update({"1": _reservation("1"), "2": _reservation("2")})
+    tracker.update({"1": _reservation("1", pins=("5678",), keys=("CARD-2",))})
+    await hass.async_block_till_done()
+
+    assert [event.data["res_id"] for event in created] == ["2"]
+    assert [event.data["res_id"] for event in removed] == ["2"]
+    assert [event.data for event in updated] == [
+        {
+            "entry_id": "entry",
+            "hotel_id": "1",
+            "res_id": "1",
+            "voucher": "V1",
+            "changes": {},
+            "credentials_changed": True,
+        }
+    ]
+    for event in created + updated + removed:
+        _assert_no_credentials(event.data)
+    assert tracker.changed_ids == {"1"}
+
+
+async def test_other_changes_are_reported_without_credentials_flag(hass):
+    updated = async_capture_events(hass, EVENT_RESERVATION_UPDATED)
+    tracker = await _seeded_tracker(hass, {"1": _reservation("1")})
+    tracker.update({"1": _reservation("1", guest="Eva Černá")})
+    await hass.async_block_till_done()
+
+    assert len(updated) == 1
+    assert updated[0].data["changes"] == {"guest": {"old": "Jan Novák", "new": "Eva Černá"}}
+    assert "credentials_changed" not in updated[0].data
+
+
+async def test_snapshot_is_stored_without_credentials(hass, hass_storage):
+    tracker = await _seeded_tracker(hass, {"1": _reservation("1")})
+    await _flush_store(hass)
+
+    stored = hass_storage[SNAPSHOT_KEY]["data"]
+    assert stored["reservations"]["1"]["stays"][0]["room"] == "101"
+    _assert_no_credentials(stored)
+    assert tracker.changed_ids == {"1"}
+
+
+async def test_legacy_snapshot_with_credentials_is_redacted(hass, hass_storage):
+    legacy = _reservation("1").content()
+    hass_storage[SNAPSHOT_KEY] = {
+        "version": 1,
+        "key": SNAPSHOT_KEY,
+        "data": {"reservations": {"1": legacy}, "last_changed": {}, "departed": {}},
+    }
+    tracker = ReservationTracker(hass, "entry", "1")
+    await tracker.async_load()
+    restored = tracker.restore()
+    assert restored["1"].alfred_pins == []
+
+    updated = async_capture_events(hass, EVENT_RESERVATION_UPDATED)
+    tracker.update({"1": _reservation("1")})
+    await _flush_store(hass)
+
+    # Po startu se údaje znovu promítnou (changed_ids), ale bez události
+    assert tracker.changed_ids == {"1"}
+    assert updated == []
+    _assert_no_credentials(hass_storage[SNAPSHOT_KEY]["data"])
+
+
+@pytest.mark.parametrize("pins", [(), ("1234",)])
+async def test_restart_does_not_report_unchanged_reservations(hass, hass_storage, pins):
+    tracker = await _seeded_tracker(hass, {"1": _reservation("1", pins=pins, keys=())})
+    await _flush_store(hass)
+
+    restarted = ReservationTracker(hass, "entry", "1")
+    await restarted.async_load()
+    updated = async_capture_events(hass, EVENT_RESERVATION_UPDATED)
+    restarted.update({"1": _reservation("1", pins=pins, keys=())})
+    await hass.async_block_till_done()
+
+    assert updated == []
+    assert restarted.change_stats["unchanged"] == 1
+    assert restarted.changed_ids == ({"1"} if pins else set())
+    assert tracker.changed_ids == {"1"}
+
+
+async def test_retention_counts_from_iso_checkout(hass):
+    tracker = await _seeded_tracker(hass, {"1": _reservation("1")})
+    tracker.update({})
+    assert tracker.departed["1"]["checkout_at"] == "2026-10-21T10:00:00"
+    assert tracker.expired(3, now=datetime(2026, 10, 24, 9, 59)) == []
+    assert tracker.expired(3, now=datetime(2026, 10, 24, 10, 0)) == ["1"]
+
+
+async def test_retention_without_checkout_counts_from_removal(hass):
+    tracker = ReservationTracker(hass, "entry", "1")
+    tracker.mark_departed("1", {}, now="2026-10-19T08:00:00")
+    # Záznam starší verze s check-outem jen jako zobrazovaný text
+    tracker.departed["2"] = {
+        "removed_at": "2026-10-20T08:00:00",
+        "checkout": "October 18, 2026 at 10:00:00 AM",
+        "record": {},
+    }
+    assert tracker.expired(1, now=datetime(2026, 10, 20, 8, 0)) == ["1"]
+    assert tracker.expired(1, now=datetime(2026, 10, 21, 8, 0)) == ["1", "2"]
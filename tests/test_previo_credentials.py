@@ -0,0 +1,159 @@
+"""Přístupové údaje: index pro get_credentials a jejich (ne)zobrazení v entitách."""
+import random
+from datetime import datetime, timedelta
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry, MockEntityPlatform
+
+from custom_components.previo_v4.const import CONF_EXPOSE_CREDENTIALS, CREDENTIAL_FIELDS, DOMAIN
+from custom_components.previo_v4.coordinator import PrevioCoordinator
+from custom_components.previo_v4.credentials import CredentialIndex
+from custom_components.previo_v4.model import Reservation, Stay
+from custom_components.previo_v4.parser import ReservationStreamParser
+from custom_components.previo_v4.sensor import PrevioV4Sensor
+
+BASE = datetime(2026, 10, 1)
+
+
+def _at(hours):
+    return BASE + timedelta(hours=hours)
+
+
+def _reservation(res_id, room, start, end, pins=(), keys=(), status="2"):
+    return Reservation(
+        res_id=res_id,
+        hotel_id="1",
+        voucher=f"V{res_id}",
+        status_id=status,
+        stays=(
+            Stay(room=room, checkin=_at(start), checkout=_at(end), alfred_pins=pins, card_keys=keys),
+        ),
+    )
+
+
+def _random_reservation(rng, res_id):
+    start = rng.randrange(0, 24 * 20)
+    return _reservation(
+        res_id,
+        f"1{rng.randrange(4)}",
+        start,
+        start + rng.randrange(1, 72),
+        pins=(str(rng.randrange(10_000)),) if rng.random() < 0.8 else (),
+        keys=(f"K{res_id}",) if rng.random() < 0.3 else (),
+        status=rng.choice(("2", "2", "2", "8", "9")),
+    )
+
+
+def _lookups(index, rng):
+    return [
+        (room, moment, index.lookup(room, moment))
+        for room, moment in (
+            (f"1{rng.randrange(5)}", _at(rng.randrange(-12, 24 * 22))) for _ in range(200)
+        )
+    ]
+
+
+def test_lookup_returns_credentials_valid_at_moment():
+    index = CredentialIndex()
+    data = {
+        "1": _reservation("1", "101", 0, 24, pins=("1111",)),
+        "2": _reservation("2", "101", 24, 48, keys=("K2",)),
+        "3": _reservation("3", "101", 10, 30, pins=("3333",), status="9"),
+        "4": _reservation("4", "102", 0, 24),
+    }
+    index.update(data, set())
+    assert index.rooms == ["101"]
+    assert index.lookup("101", _at(23)) == [{
+        "res_id": "1",
+        "from": _at(0).isoformat(),
+        "to": _at(24).isoformat(),
+        "alfred_pins": ["1111"],
+        "card_keys": [],
+    }]
+    # Check-out je exkluzivní, check-in inkluzivní
+    assert [entry["res_id"] for entry in index.lookup("101", _at(24))] == ["2"]
+    assert index.lookup("101", _at(48)) == []
+    assert index.lookup("102", _at(12)) == []
+
+
+def test_incremental_updates_match_full_rebuild():
+    rng = random.Random(37)
+    data = {str(res_id): _random_reservation(rng, str(res_id)) for res_id in range(80)}
+    index = CredentialIndex()
+    index.update(data, set(data))
+
+    for _ in range(10):
+        changed = set()
+        for res_id in rng.sample(sorted(data), 10):
+            del data[res_id]
+        for res_id in rng.sample(sorted(data), 10):
+            data[res_id] = _random_reservation(rng, res_id)
+            changed.add(res_id)
+        for res_id in (str(rng.randrange(80, 200)) for _ in range(10)):
+            data[res_id] = _random_reservation(rng, res_id)
+            changed.add(res_id)
+        index.update(data, changed)
+
+        rebuilt = CredentialIndex()
+        rebuilt.update(data, set())
+        assert index.rooms == rebuilt.rooms
+        seed = rng.random()
+        assert _lookups(index, random.Random(seed)) == _lookups(rebuilt, random.Random(seed))
+
+
+def test_first_update_indexes_unchanged_reservations():
+    # Po startu ze snapshotu jsou changed_ids prázdné, první update projde vše
+    index = CredentialIndex()
+    index.update({"1": _reservation("1", "101", 0, 24, pins=("1111",))}, set())
+    assert [entry["res_id"] for entry in index.lookup("101", _at(1))] == ["1"]
+    index.update({}, set())
+    assert index.rooms == []
+
+
+class PinClient:
+    """Jedna rezervace s Alfred PINem a kartou."""
+
+    async def async_fetch_page(self, page, page_size, date_from, date_to, builder):
+        body = (
+            b'<?xml version="1.0"?><reservations><reservation><resId>1</resId>'
+            b"<voucher>V1</voucher><status><statusId>2</statusId></status>"
+            b"<object><name>101</name></object>"
+            b"<term><from>2026-10-19 14:00:00</from><to>2026-10-21 10:00:00</to></term>"
+            b"<alfredCodeList><alfredCode><pin>1234</pin></alfredCode></alfredCodeList>"
+            b"<cardDataList><cardData><key>K1</key></cardData></cardDataList>"
+            b"</reservation></reservations>"
+        )
+        parser = ReservationStreamParser(page, builder)
+        parser.feed(body)
+        count, total = parser.close()
+        return count, total, len(body), 0.0
+
+
+async def _reservation_state(hass, options):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"login": "test", "password": "test", "hotel_id": "1"},
+        options=options,
+    )
+    entry.add_to_hass(hass)
+    coordinator = PrevioCoordinator(hass, entry)
+    coordinator.client = PinClient()
+    await coordinator.async_refresh()
+    sensor = PrevioV4Sensor(coordinator, "1", None, "1")
+    await MockEntityPlatform(hass).async_add_entities([sensor])
+    state = hass.states.get(sensor.entity_id)
+    # Odebrání entity zruší plánovanou obnovu koordinátoru
+    await sensor.async_remove()
+    return state
+
+
+async def test_reservation_entity_hides_credentials_by_default(hass):
+    state = await _reservation_state(hass, {})
+    assert state.attributes["room"] == "101"
+    assert not CREDENTIAL_FIELDS & set(state.attributes)
+
+
+async def test_exposed_credentials_are_not_recorded(hass):
+    state = await _reservation_state(hass, {CONF_EXPOSE_CREDENTIALS: True})
+    assert state.attributes["alfred_pins"] == ["1234"]
+    assert state.attributes["card_keys"] == ["K1"]
+    assert CREDENTIAL_FIELDS <= state.state_info["unrecorded_attributes"]
@@ -0,0 +1,74 @@
+"""Diagnostika Previo: přihlašovací údaje, PINy, klíče ani hosté v ní nejsou."""
+import json
+
+from homeassistant.components.diagnostics import REDACTED
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.previo_v4.const import CREDENTIAL_FIELDS, DOMAIN
+from custom_components.previo_v4.coordinator import PrevioCoordinator
+from custom_components.previo_v4.diagnostics import async_get_config_entry_diagnostics
+from custom_components.previo_v4.parser import ReservationStreamParser
+
+SECRETS = (
+    "hotel-login", "tajne-heslo", "1234", "5678", "9012", "K1", "K2", "K3",
+    "Jan Novák", "Eva Malá", "Petr Dlouhý",
+)
+
+
+class GroupClient:
+    """Skupinová rezervace se dvěma pokoji a jednopokojová, s PINy a kartami."""
+
+    async def async_fetch_page(self, page, page_size, date_from, date_to, builder):
+        body = "".join(
+            f"<reservation><resId>{res_id}</resId><voucher>V{res_id}</voucher>"
+            "<status><statusId>2</statusId></status>"
+            f"<object><name>{room}</name></object><guest><name>{guest}</name></guest>"
+            "<term><from>2026-10-19 14:00:00</from><to>2026-10-21 10:00:00</to></term>"
+            f"<alfredCodeList><alfredCode><pin>{pin}</pin></alfredCode></alfredCodeList>"
+            f"<cardDataList><cardData><key>{key}</key></cardData></cardDataList>"
+            "</reservation>"
+            for res_id, room, guest, pin, key in (
+                ("1", "101", "Jan Novák", "1234", "K1"),
+                ("1", "102", "Eva Malá", "5678", "K2"),
+                ("2", "201", "Petr Dlouhý", "9012", "K3"),
+            )
+        )
+        body = f'<?xml version="1.0"?><reservations>{body}</reservations>'.encode()
+        parser = ReservationStreamParser(page, builder)
+        parser.feed(body)
+        count, total = parser.close()
+        return count, total, len(body), 0.0
+
+
+async def test_diagnostics_redact_credentials_and_login(hass):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"login": "hotel-login", "password": "tajne-heslo", "hotel_id": "1"},
+    )
+    entry.add_to_hass(hass)
+    coordinator = PrevioCoordinator(hass, entry)
+    coordinator.client = GroupClient()
+    await coordinator.async_refresh()
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {"coordinator": coordinator}
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    text = json.dumps(diagnostics, default=str)
+    for secret in SECRETS:
+        assert secret not in text
+    assert diagnostics["entry"]["data"] == {
+        "login": REDACTED,
+        "password": REDACTED,
+        "hotel_id": "1",
+    }
+    group = diagnostics["reservation_data"]["1"]
+    single = diagnostics["reservation_data"]["2"]
+    # Údaje na úrovni rezervace i každého pokoje; jednotlivý PIN a klíč
+    # skupina se dvěma pokoji nemá (None zůstává)
+    for field in CREDENTIAL_FIELDS | {"guest"}:
+        assert single[field] == REDACTED
+        assert group[field] == (None if field in ("alfred_pin", "card_key") else REDACTED)
+    for stay in group["stays"] + single["stays"]:
+        assert stay["alfred_pins"] == stay["card_keys"] == stay["guest"] == REDACTED
+    assert group["rooms"] == ["101", "102"]
+    assert diagnostics["reservations"] == 2
@@ -0,0 +1,136 @@
+"""Hub více hotelů: rozložení fází pollingu a globální limit požadavků."""
+import asyncio
+import re
+from datetime import timedelta
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.previo_v4.client import PrevioClient
+from custom_components.previo_v4.const import GLOBAL_CONCURRENCY, PAGE_SIZE
+from custom_components.previo_v4.coordinator import PrevioCoordinator
+from custom_components.previo_v4.hub import PrevioHub, async_get_hub
+
+INTERVAL = timedelta(minutes=15)
+PERIOD = INTERVAL.total_seconds()
+
+
+def _hub(*entry_ids):
+    hub = PrevioHub()
+    for entry_id in entry_ids:
+        hub.register(entry_id, f"hotel-{entry_id}")
+    return hub
+
+
+def _phases(hub, entry_ids, now):
+    """Fáze dalšího stažení každé entry v rámci periody (s)."""
+    return {
+        entry_id: (now + hub.phase_delay(entry_id, INTERVAL, now=now).total_seconds()) % PERIOD
+        for entry_id in entry_ids
+    }
+
+
+def test_single_or_unknown_entry_keeps_interval():
+    assert _hub("a").phase_delay("a", INTERVAL, now=123.0) == INTERVAL
+    assert _hub("a", "b").phase_delay("x", INTERVAL, now=123.0) == INTERVAL
+
+
+@pytest.mark.parametrize("now", [0.0, 1.0, 449.5, 450.0, 899.0, 1_760_000_123.4])
+def test_poll_times_are_spread_evenly(now):
+    # Pořadí registrace nehraje roli, fáze se řídí pořadím entry_id
+    entry_ids = ["d", "b", "a", "c"]
+    hub = _hub(*entry_ids)
+    phases = _phases(hub, entry_ids, now)
+    step = PERIOD / len(entry_ids)
+    for position, entry_id in enumerate(sorted(entry_ids)):
+        assert phases[entry_id] == pytest.approx(position * step)
+    for entry_id in entry_ids:
+        delay = hub.phase_delay(entry_id, INTERVAL, now=now)
+        assert INTERVAL / 2 <= delay < INTERVAL * 1.5
+
+
+def test_phases_respread_after_unregister():
+    hub = _hub("a", "b", "c")
+    assert sorted(_phases(hub, "abc", 100.0).values()) == pytest.approx([0, 300, 600])
+    hub.unregister("b")
+    assert _phases(hub, "ac", 100.0) == pytest.approx({"a": 0, "c": 450})
+    hub.unregister("c")
+    assert hub.phase_delay("a", INTERVAL, now=100.0) == INTERVAL
+
+
+class Session:
+    """HTTP session, která vrací stránky rezervací a měří souběžné požadavky."""
+
+    def __init__(self, reservations):
+        self.reservations = reservations
+        self.active = 0
+        self.max_active = 0
+        self.requests = 0
+
+    def post(self, url, data, headers):
+        offset = int(re.search(r"<offset>(\d+)</offset>", data).group(1))
+        hotel_id = re.search(r"<hotId>(\w+)</hotId>", data).group(1)
+        subs = "".join(
+            f"<reservation><resId>{hotel_id}-{index}</resId>"
+            "<status><statusId>2</statusId></status></reservation>"
+            for index in range(offset, min(offset + PAGE_SIZE, self.reservations))
+        )
+        body = f'<reservations total="{self.reservations}">{subs}</reservations>'
+        return Response(self, body.encode())
+
+
+class Response:
+    def __init__(self, session, body):
+        self._session = session
+        self._body = body
+        self.content = self
+
+    async def __aenter__(self):
+        session = self._session
+        session.requests += 1
+        session.active += 1
+        session.max_active = max(session.max_active, session.active)
+        # Odpověď chvíli trvá, aby se požadavky hotelů překrývaly
+        await asyncio.sleep(0.01)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._session.active -= 1
+
+    def raise_for_status(self):
+        pass
+
+    async def iter_chunked(self, size):
+        for start in range(0, len(self._body), size):
+            yield self._body[start:start + size]
+
+
+async def test_global_limit_holds_across_hotels(hass):
+    hotels = ("h1", "h2", "h3")
+    # Šest stránek, poslední neúplná (za plnou by se ptal ještě na další)
+    reservations = PAGE_SIZE * 6 - 10
+    session = Session(reservations)
+    coordinators = []
+    for hotel_id in hotels:
+        entry = MockConfigEntry(
+            domain="previo_v4",
+            data={"login": "test", "password": "test", "hotel_id": hotel_id},
+        )
+        entry.add_to_hass(hass)
+        coordinator = PrevioCoordinator(hass, entry)
+        # Stejný klient jako v koordinátoru, jen nad testovací session
+        coordinator.client = PrevioClient(
+            session, "test", "test", hotel_id, coordinator.hub.limiter
+        )
+        coordinators.append(coordinator)
+
+    assert all(coordinator.hub is async_get_hub(hass) for coordinator in coordinators)
+    await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators))
+
+    # Bez limitu by běželo až PAGE_CONCURRENCY stránek každého hotelu najednou
+    assert session.max_active == GLOBAL_CONCURRENCY
+    assert session.requests == len(hotels) * 6
+    for coordinator in coordinators:
+        assert coordinator.last_update_success
+        assert len(coordinator.data) == reservations
+    assert session.active == 0
@@ -0,0 +1,138 @@
+"""Index obsazenosti pokojů: dotazy přes bisect a double-booking sweep line."""
+import random
+from datetime import datetime, timedelta
+
+from custom_components.previo_v4.model import Reservation, Stay
+from custom_components.previo_v4.occupancy import OccupancyIndex, find_overlaps
+
+BASE = datetime(2026, 10, 1)
+
+
+def _at(hours):
+    return BASE + timedelta(hours=hours)
+
+
+def _reservation(res_id, *stays, status="2"):
+    return Reservation(
+        res_id=res_id,
+        hotel_id="1",
+        voucher=f"V{res_id}",
+        status_id=status,
+        stays=tuple(
+            Stay(room=room, checkin=_at(start), checkout=_at(end)) for room, start, end in stays
+        ),
+    )
+
+
+def _random_data(rng, count=120):
+    return {
+        str(index): _reservation(
+            str(index),
+            *(
+                (f"1{rng.randrange(5)}", start, start + rng.randrange(1, 96))
+                for start in (rng.randrange(0, 24 * 30) for _ in range(rng.choice((1, 1, 2))))
+            ),
+            status=rng.choice(("2", "2", "2", "7")),
+        )
+        for index in range(count)
+    }
+
+
+def _active_stays(data):
+    return [
+        (stay.room, stay.checkin, stay.checkout, res_id)
+        for res_id, reservation in data.items()
+        if reservation.status_id not in {"7", "8"}
+        for stay in reservation.stays
+    ]
+
+
+def test_queries_match_brute_force():
+    rng = random.Random(36)
+    data = _random_data(rng)
+    index = OccupancyIndex(data)
+    stays = _active_stays(data)
+    assert index.rooms == sorted({room for room, *_ in stays})
+
+    for _ in range(300):
+        room = f"1{rng.randrange(6)}"
+        start = _at(rng.randrange(-24, 24 * 32))
+        end = start + timedelta(hours=rng.randrange(1, 72))
+        expected = sorted(
+            (checkin, checkout, res_id)
+            for stay_room, checkin, checkout, res_id in stays
+            if stay_room == room and checkin < end and checkout > start
+        )
+        assert index.stays(room, start, end) == expected
+
+        occupants = [stay for stay in expected if stay[0] <= start < stay[1]]
+        occupant = index.occupant(room, start)
+        assert (occupant is None) == (not occupants)
+        assert occupant is None or occupant in occupants
+
+        upcoming = sorted(
+            (checkin, checkout, res_id)
+            for stay_room, checkin, checkout, res_id in stays
+            if stay_room == room and checkin > start
+        )
+        assert index.next_stay(room, start) == (upcoming[0] if upcoming else None)
+
+
+def test_back_to_back_stays_are_not_a_conflict():
+    index = OccupancyIndex({
+        "1": _reservation("1", ("101", 0, 24)),
+        "2": _reservation("2", ("101", 24, 48)),
+    })
+    assert index.conflicts == []
+    assert index.occupant("101", _at(24))[2] == "2"
+    assert index.free_rooms(_at(48), _at(50)) == ["101"]
+    assert index.free_rooms(_at(23), _at(25)) == []
+
+
+def test_cancelled_and_invalid_stays_do_not_occupy():
+    index = OccupancyIndex({
+        "1": _reservation("1", ("101", 0, 24), status="7"),
+        "2": _reservation("2", ("102", 24, 24)),
+        "3": _reservation("3", (None, 0, 24)),
+    })
+    assert index.rooms == []
+    assert index.stays("101", _at(0), _at(24)) == []
+
+
+def test_conflicts_match_pairwise_overlaps():
+    rng = random.Random(37)
+    data = _random_data(rng)
+    index = OccupancyIndex(data)
+    stays = _active_stays(data)
+    expected = set()
+    for position, (room, start, end, res_id) in enumerate(stays):
+        for other_room, other_start, other_end, other_id in stays[position + 1:]:
+            if room != other_room or res_id == other_id:
+                continue
+            if start < other_end and other_start < end:
+                expected.add((
+                    room,
+                    frozenset((res_id, other_id)),
+                    max(start, other_start),
+                    min(end, other_end),
+                ))
+
+    found = {
+        (
+            conflict["room"],
+            frozenset(conflict["res_ids"]),
+            datetime.fromisoformat(conflict["from"]),
+            datetime.fromisoformat(conflict["to"]),
+        )
+        for conflict in index.conflicts
+    }
+    assert found == expected
+    assert len(index.conflicts) == len(expected)
+
+
+def test_find_overlaps_ignores_stays_of_the_same_reservation():
+    stays = [(_at(0), _at(48), "1"), (_at(10), _at(20), "1"), (_at(12), _at(30), "2")]
+    assert sorted(find_overlaps(stays)) == [
+        ("1", "2", _at(12), _at(20)),
+        ("1", "2", _at(12), _at(30)),
+    ]
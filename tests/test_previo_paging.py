@@ -0,0 +1,116 @@
+"""Stránkování searchReservations v koordinátoru Previo."""
+import logging
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.previo_v4.const import PAGE_SIZE
+from custom_components.previo_v4.coordinator import PrevioCoordinator
+from custom_components.previo_v4.parser import ReservationStreamParser
+
+
+def _sub(res_id):
+    return (
+        f"<reservation><resId>{res_id}</resId><voucher>V{res_id}</voucher>"
+        "<status><statusId>2</statusId></status>"
+        f"<object><name>{100 + int(res_id) % 40}</name></object>"
+        "<term><from>2026-10-19 14:00:00</from><to>2026-10-21 10:00:00</to></term>"
+        "</reservation>"
+    )
+
+
+class FakeClient:
+    """Stránky z pevného seznamu; root_attrs(page, rows, subs) vrací atributy kořene."""
+
+    def __init__(self, count, root_attrs=lambda page, rows, subs: "", fail_pages=()):
+        self.subs = [_sub(str(index)) for index in range(count)]
+        self.root_attrs = root_attrs
+        self.fail_pages = set(fail_pages)
+        self.requests = []
+
+    async def async_fetch_page(self, page, page_size, date_from, date_to, builder):
+        self.requests.append(page)
+        if page in self.fail_pages:
+            raise ConnectionError(f"stránka {page}")
+        rows = self.subs[page * page_size:(page + 1) * page_size]
+        body = (
+            f'<?xml version="1.0"?><reservations{self.root_attrs(page, rows, self.subs)}>'
+            f'{"".join(rows)}</reservations>'
+        ).encode()
+        parser = ReservationStreamParser(page, builder)
+        parser.feed(body)
+        count, total = parser.close()
+        return count, total, len(body), 0.0
+
+
+@pytest.fixture
+async def coordinator(hass):
+    entry = MockConfigEntry(
+        domain="previo_v4",
+        data={"login": "test", "password": "test", "hotel_id": "1"},
+    )
+    entry.add_to_hass(hass)
+    return PrevioCoordinator(hass, entry)
+
+
+def _total(page, rows, subs):
+    return f' total="{len(subs)}"'
+
+
+async def test_reported_total_fetches_all_pages(coordinator):
+    coordinator.client = FakeClient(2 * PAGE_SIZE + 20, _total)
+    data = await coordinator._async_update_data()
+    assert len(data) == 2 * PAGE_SIZE + 20
+    assert sorted(coordinator.client.requests) == [0, 1, 2]
+    assert coordinator.fetch_stats["pages"] == 3
+    assert coordinator.fetch_stats["rows"] == 2 * PAGE_SIZE + 20
+
+
+async def test_per_page_count_is_not_mistaken_for_total(coordinator):
+    # Kořen nese počet na stránce - první stránka vypadá jako jediná
+    coordinator.client = FakeClient(
+        2 * PAGE_SIZE + 20, lambda page, rows, subs: f' count="{len(rows)}"'
+    )
+    data = await coordinator._async_update_data()
+    assert len(data) == 2 * PAGE_SIZE + 20
+    assert coordinator.client.requests == [0, 1, 2]
+
+
+async def test_without_total_pages_until_short_page(coordinator):
+    coordinator.client = FakeClient(2 * PAGE_SIZE)
+    data = await coordinator._async_update_data()
+    assert len(data) == 2 * PAGE_SIZE
+    # Plná poslední stránka - o prázdné stránce se ví až po dotazu
+    assert coordinator.client.requests == [0, 1, 2]
+
+
+async def test_understated_total_keeps_paging_and_warns(coordinator, caplog):
+    coordinator.client = FakeClient(
+        3 * PAGE_SIZE + 5, lambda page, rows, subs: f' total="{PAGE_SIZE + 1}"'
+    )
+    with caplog.at_level(logging.WARNING):
+        data = await coordinator._async_update_data()
+    assert len(data) == 3 * PAGE_SIZE + 5
+    assert coordinator.client.requests == [0, 1, 2, 3]
+    assert f"nahlásilo {PAGE_SIZE + 1} rezervací" in caplog.text
+
+
+async def test_overstated_total_stops_at_short_page_and_warns(coordinator, caplog):
+    coordinator.client = FakeClient(PAGE_SIZE + 10, lambda page, rows, subs: ' total="400"')
+    with caplog.at_level(logging.WARNING):
+        data = await coordinator._async_update_data()
+    assert len(data) == PAGE_SIZE + 10
+    assert sorted(coordinator.client.requests) == list(range(8))
+    assert "stránky jich obsahovaly 60" in caplog.text
+
+
+async def test_failed_page_keeps_previous_reservations(coordinator):
+    coordinator.client = FakeClient(2 * PAGE_SIZE + 20, _total)
+    coordinator.data = await coordinator._async_update_data()
+
+    coordinator.client = FakeClient(2 * PAGE_SIZE + 20, _total, fail_pages={1})
+    data = await coordinator._async_update_data()
+    assert len(data) == 2 * PAGE_SIZE + 20
+    assert coordinator.fetch_stats["failed_pages"] == 1
+    # Nic se nehlásí jako odebrané jen proto, že stránka chyběla
+    assert coordinator.change_stats["removed"] == 0
@@ -0,0 +1,320 @@
+"""Streamovaný parser searchReservations a skládání rezervací ze stránek."""
+from collections import defaultdict
+from datetime import datetime
+
+import pytest
+from defusedxml import EntitiesForbidden
+from defusedxml.ElementTree import ParseError, fromstring
+
+from custom_components.previo_v4.const import (
+    DISPLAY_DATETIME_FORMAT,
+    STATUS_MAPPING,
+    STATUS_MAPPING_CZ,
+)
+from custom_components.previo_v4.model import USE_STATUS_MAPPING
+from custom_components.previo_v4.parser import ReservationBuilder, ReservationStreamParser
+
+
+def _sub(res_id, room, pins=(), keys=(), status="2", codes=("DIRECT",), price="100"):
+    pins_xml = "".join(f"<alfredCode><pin>{pin}</pin></alfredCode>" for pin in pins)
+    keys_xml = "".join(f"<cardData><key>{key}</key></cardData>" for key in keys)
+    codes_xml = "".join(f"<marketCode>{code}</marketCode>" for code in codes)
+    return (
+        f"<reservation><resId>{res_id}</resId><voucher>V{res_id}</voucher>"
+        f"<status><statusId>{status}</statusId></status>"
+        f"<object><name>{room}</name></object>"
+        "<term><from>2026-10-19 14:00:00</from><to>2026-10-21 10:00:00</to></term>"
+        f"<guest><name>Host {res_id}</name></guest><price>{price}</price>"
+        f"<alfredCodeList>{pins_xml}</alfredCodeList><cardDataList>{keys_xml}</cardDataList>"
+        f"<marketCodeList>{codes_xml}</marketCodeList></reservation>"
+    )
+
+
+def _page(*subs, root_attrs="", tail=""):
+    return f'<?xml version="1.0"?><reservations{root_attrs}>{"".join(subs)}{tail}</reservations>'
+
+
+def _feed(builder, page, body, chunk=7):
+    parser = ReservationStreamParser(page, builder)
+    data = body.encode()
+    for start in range(0, len(data), chunk):
+        parser.feed(data[start:start + chunk])
+    return parser.close()
+
+
+def test_stream_parser_counts_and_total_in_small_chunks():
+    builder = ReservationBuilder("1")
+    count, total = _feed(builder, 0, _page(_sub("1", "101"), _sub("2", "102"), root_attrs=' total="120"'))
+    assert (count, total) == (2, 120)
+    reservation = builder.build()["1"]
+    assert reservation.voucher == "V1"
+    assert reservation.rooms == ["101"]
+    assert reservation.stays[0].checkin == datetime(2026, 10, 19, 14, 0)
+    assert reservation.price_numeric == 100.0
+
+
+@pytest.mark.parametrize(
+    ("root_attrs", "tail", "expected"),
+    [
+        ("", "", None),
+        ("", "<totalCount>75</totalCount>", 75),
+        (' count="50"', "", 50),
+        (' total="x"', "", None),
+    ],
+)
+def test_stream_parser_total_variants(root_attrs, tail, expected):
+    _, total = _feed(ReservationBuilder("1"), 0, _page(_sub("1", "101"), root_attrs=root_attrs, tail=tail))
+    assert total == expected
+
+
+def test_stream_parser_rejects_entities_and_truncated_xml():
+    bomb = '<?xml version="1.0"?><!DOCTYPE r [<!ENTITY a "aaaa">]><reservations>&a;</reservations>'
+    with pytest.raises(EntitiesForbidden):
+        _feed(ReservationBuilder("1"), 0, bomb)
+    body = _page(_sub("1", "101"))
+    with pytest.raises(ParseError):
+        _feed(ReservationBuilder("1"), 0, body[: len(body) // 2])
+
+
+def test_group_split_across_pages_in_any_arrival_order():
+    pages = {
+        0: _page(_sub("1", "101"), _sub("2", "201", pins=("1111",), codes=("GROUP",))),
+        1: _page(_sub("2", "202", keys=("K2",), codes=("GROUP", "BOOKING")), _sub("3", "301")),
+    }
+    in_order = ReservationBuilder("1")
+    reverse = ReservationBuilder("1")
+    for page in (0, 1):
+        _feed(in_order, page, pages[page])
+    for page in (1, 0):
+        _feed(reverse, page, pages[page])
+
+    data = in_order.build()
+    assert list(data) == ["1", "2", "3"]
+    group = data["2"]
+    assert group.is_group
+    assert group.rooms == ["201", "202"]
+    assert group.alfred_pins == ["1111"]
+    assert group.card_keys == ["K2"]
+    assert group.market_codes == ("GROUP", "BOOKING")
+    reversed_data = reverse.build()
+    assert list(reversed_data) == list(data)
+    assert all(reversed_data[res_id].content() == data[res_id].content() for res_id in data)
+
+
+def test_discard_page_and_boundary_reservations():
+    builder = ReservationBuilder("1")
+    _feed(builder, 0, _page(_sub("1", "101"), _sub("2", "102")))
+    _feed(builder, 1, _page(_sub("3", "103"), _sub("4", "104")))
+    _feed(builder, 2, _page(_sub("4", "105"), _sub("5", "106")))
+
+    builder.discard_page(1)
+    # Poslední rezervace před chybějící stránkou a první za ní mohou mít
+    # pokoje na chybějící stránce
+    assert builder.incomplete({1}) == {"2", "4"}
+    data = builder.build()
+    assert list(data) == ["1", "2", "4", "5"]
+    assert data["4"].rooms == ["105"]
+
+
+def test_invalid_price_counts_as_zero():
+    builder = ReservationBuilder("1")
+    _feed(builder, 0, _page(_sub("1", "101", price="abc")))
+    assert builder.failed == 0
+    assert builder.build()["1"].price_numeric == 0.0
+
+
+def test_parse_error_is_counted(monkeypatch):
+    from custom_components.previo_v4 import parser
+
+    def explode(fields):
+        if fields["res_id"] == "2":
+            raise ValueError("rozbitá rezervace")
+        return original(fields)
+
+    original = parser.parse_sub_reservation
+    monkeypatch.setattr(parser, "parse_sub_reservation", explode)
+    builder = ReservationBuilder("1")
+    _feed(builder, 0, _page(_sub("1", "101"), _sub("2", "201"), _sub("2", "202")))
+    assert builder.failed == 1
+    assert list(builder.build()) == ["1"]
+
+
+def test_reservation_without_res_id_is_skipped():
+    builder = ReservationBuilder("1")
+    count, _ = _feed(builder, 0, _page(_sub("", "101"), _sub("2", "102")))
+    assert count == 2
+    assert list(builder.build()) == ["2"]
+
+
+def _baseline_parse(pages, hotel_id):
+    """Zpracování odpovědi z PrevioCoordinatoru před streamovaným parserem.
+
+    Původní kód četl jedinou stránku přes ET.fromstring; stránky se tu
+    spojí do jednoho seznamu <reservation> v pořadí, jak je vrátilo API.
+    """
+    grouped_reservations = defaultdict(list)
+    for text in pages:
+        for res in fromstring(text).findall(".//reservation"):
+            res_id = res.findtext("resId")
+            if not res_id:
+                continue
+            grouped_reservations[res_id].append(res)
+
+    data = {}
+    for res_id, res_list in grouped_reservations.items():
+        rooms, com_ids, alfred_pins, card_keys = [], [], [], []
+        checkins, checkouts, prices, guests, market_codes_all = [], [], [], [], []
+        first_res = res_list[0]
+        voucher = first_res.findtext("voucher") or "není"
+        status_id = first_res.findtext("status/statusId", "0")
+        for res in res_list:
+            com_id = res.findtext("comId")
+            if com_id:
+                com_ids.append(com_id)
+            room_el = res.find("object")
+            if room_el is not None:
+                room_name = room_el.findtext("name")
+                if room_name:
+                    rooms.append(room_name)
+            guest_el = res.find("guest")
+            if guest_el is not None:
+                guest_name = guest_el.findtext("name")
+                if guest_name:
+                    guests.append(guest_name)
+            alfred_code_list = res.find("alfredCodeList")
+            if alfred_code_list is not None:
+                for alfred_code in alfred_code_list.findall("alfredCode"):
+                    pin = alfred_code.findtext("pin")
+                    if pin:
+                        alfred_pins.append(pin)
+            card_data_list = res.find("cardDataList")
+            if card_data_list is not None:
+                for card_data in card_data_list.findall("cardData"):
+                    key = card_data.findtext("key")
+                    if key:
+                        card_keys.append(key)
+            for path, target in (("term/from", checkins), ("term/to", checkouts)):
+                text = res.findtext(path)
+                if text:
+                    try:
+                        dt = datetime.strptime(text, "%Y-%m-%d %H:%M:%S")
+                        target.append(dt.strftime(DISPLAY_DATETIME_FORMAT))
+                    except ValueError:
+                        target.append(text)
+            price_str = res.findtext("price", "0")
+            try:
+                prices.append(float(price_str) if price_str else 0.0)
+            except ValueError:
+                prices.append(0.0)
+            market_code_list = res.find("marketCodeList")
+            if market_code_list is not None:
+                for market_code in market_code_list.findall("marketCode"):
+                    code = market_code.text
+                    if code and code not in market_codes_all:
+                        market_codes_all.append(code)
+
+        total_price = sum(prices)
+        days_until_checkin = None
+        if checkins:
+            try:
+                checkin_dt = datetime.strptime(checkins[0], DISPLAY_DATETIME_FORMAT)
+                days_until_checkin = (checkin_dt.date() - datetime.now().date()).days
+            except ValueError:
+                pass
+        data[res_id] = {
+            "voucher": voucher,
+            "guest": guests[0] if guests else "Host",
+            "room": ", ".join(rooms) if rooms else "neznámý pokoj",
+            "rooms": rooms,
+            "alfred_pin": alfred_pins[0] if len(alfred_pins) == 1 else None,
+            "alfred_pins": alfred_pins,
+            "card_key": card_keys[0] if len(card_keys) == 1 else None,
+            "card_keys": card_keys,
+            "com_id": com_ids[0] if len(com_ids) == 1 else None,
+            "com_ids": com_ids,
+            "checkin": checkins[0] if checkins else None,
+            "checkout": checkouts[0] if checkouts else None,
+            "checkins": checkins,
+            "checkouts": checkouts,
+            "price": f"{total_price:.2f}",
+            "price_numeric": total_price,
+            "price_formatted": f"{total_price:.2f} CZK" if total_price > 0 else "0 CZK",
+            "status_id": status_id,
+            "status_name": USE_STATUS_MAPPING.get(status_id, f"Unknown Status {status_id}"),
+            "status_name_en": STATUS_MAPPING.get(status_id, f"Unknown Status {status_id}"),
+            "status_name_cz": STATUS_MAPPING_CZ.get(status_id, f"Neznámý status {status_id}"),
+            "market_codes": market_codes_all,
+            "market_codes_text": ", ".join(market_codes_all) if market_codes_all else "žádné",
+            "days_until_checkin": days_until_checkin,
+            "hotel_id": hotel_id,
+            "is_group": len(res_list) > 1,
+            "room_count": len(rooms),
+        }
+    return data
+
+
+BASELINE_PAGES = [
+    _page(
+        _sub("1", "101", pins=("1111",), keys=("K1",)),
+        _sub("2", "201", pins=("2001",), codes=("GROUP", "DIRECT")),
+        # Nečitelný příjezd a čas bez úvodních nul
+        "<reservation><resId>3</resId><voucher/><status><statusId>7</statusId></status>"
+        "<term><from>brzy</from><to>2026-10-2 9:05:00</to></term><price/>"
+        "<comId>C3</comId></reservation>",
+        root_attrs=' total="9"',
+    ),
+    _page(
+        _sub("2", "202", keys=("K2",), codes=("DIRECT", "BOOKING"), price="250.5"),
+        # Host bez jména, dva seznamy PINů, prázdný pokoj a druhý <term>
+        "<reservation><resId>4</resId><guest/><guest><name>Druhý</name></guest>"
+        "<object><name/></object><alfredCodeList><alfredCode><pin>41</pin><pin>49</pin>"
+        "</alfredCode><alfredCode/></alfredCodeList>"
+        "<alfredCodeList><alfredCode><pin>42</pin></alfredCode></alfredCodeList>"
+        "<term><to>2026-10-25 10:00:00</to></term>"
+        "<term><from>2026-10-23 15:00:00</from></term><price>x</price></reservation>",
+        _sub("", "999"),
+    ),
+    _page(
+        _sub("5", "501", status="3", price="0"),
+        # Skupina, jejíž první pokoj nemá čitelný příjezd
+        "<reservation><resId>6</resId><status><statusId>2</statusId></status>"
+        "<object><name>601</name></object><term><from>31.10.2026</from></term>"
+        "<comId>C6</comId></reservation>",
+        _sub("6", "602"),
+        _sub("2", "203", status="9"),
+    ),
+]
+
+
+def test_streaming_parse_matches_baseline_over_pages():
+    builder = ReservationBuilder("1")
+    # Stránky dorazí v libovolném pořadí, výsledek se skládá podle pozice
+    for page in (2, 0, 1):
+        _feed(builder, page, BASELINE_PAGES[page])
+    data = builder.build()
+    expected = _baseline_parse(BASELINE_PAGES, "1")
+
+    assert list(data) == list(expected)
+    for res_id, reservation in data.items():
+        content = reservation.content()
+        content["days_until_checkin"] = reservation.days_until_checkin()
+        del content["stays"]
+        assert content == expected[res_id], res_id
+
+
+def test_unparseable_checkin_is_kept_raw():
+    builder = ReservationBuilder("1")
+    _feed(builder, 0, BASELINE_PAGES[0])
+    reservation = builder.build()["3"]
+    stay = reservation.stays[0]
+    assert (stay.checkin, stay.checkin_raw) == (None, "brzy")
+    assert stay.checkout == datetime(2026, 10, 2, 9, 5)
+    assert reservation.checkins == ["brzy"]
+    assert reservation.checkin_times == []
+    assert reservation.days_until_checkin() is None
+
+    # Nečitelný čas přežije snapshot
+    restored = type(reservation).from_content("3", reservation.content())
+    assert restored.stays[0].checkin_raw == "brzy"
+    assert restored.checkins == reservation.checkins
+    assert restored.checkouts == reservation.checkouts
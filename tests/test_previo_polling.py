@@ -0,0 +1,164 @@
+"""Adaptivní interval pollingu Previo a jeho návaznost na circuit breaker."""
+from datetime import datetime, timedelta
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.previo_v4.const import (
+    ADAPTIVE_BUSY_INTERVAL,
+    ADAPTIVE_FOLLOW_UP_INTERVAL,
+    ADAPTIVE_NIGHT_INTERVAL,
+    BREAKER_FAILURE_THRESHOLD,
+    CONF_ADAPTIVE_POLLING,
+    CONF_UPDATE_INTERVAL,
+)
+from custom_components.previo_v4.coordinator import PrevioCoordinator
+from custom_components.previo_v4.model import Reservation, Stay
+from custom_components.previo_v4.parser import ReservationStreamParser
+
+NOON = datetime(2026, 10, 19, 12, 0)
+
+
+class Client:
+    """Jedna rezervace s check-inem 19. 10. ve 14:00, dokud se nenastaví chyba."""
+
+    def __init__(self):
+        self.error = None
+
+    async def async_fetch_page(self, page, page_size, date_from, date_to, builder):
+        if self.error is not None:
+            raise self.error
+        body = (
+            b'<?xml version="1.0"?><reservations><reservation><resId>1</resId>'
+            b"<status><statusId>2</statusId></status><object><name>101</name></object>"
+            b"<term><from>2026-10-19 14:00:00</from><to>2026-10-21 10:00:00</to></term>"
+            b"</reservation></reservations>"
+        )
+        parser = ReservationStreamParser(page, builder)
+        parser.feed(body)
+        count, total = parser.close()
+        return count, total, len(body), 0.0
+
+
+def _data(*checkins):
+    stays = tuple(
+        Stay(room="101", checkin=checkin, checkout=checkin + timedelta(days=2))
+        for checkin in checkins
+    )
+    return {"1": Reservation(res_id="1", hotel_id="1", voucher="V1", status_id="2", stays=stays)}
+
+
+@pytest.fixture
+def make_coordinator(hass):
+    def make(adaptive=True, interval=15):
+        entry = MockConfigEntry(
+            domain="previo_v4",
+            data={"login": "test", "password": "test", "hotel_id": "1"},
+            options={CONF_ADAPTIVE_POLLING: adaptive, CONF_UPDATE_INTERVAL: interval},
+        )
+        entry.add_to_hass(hass)
+        coordinator = PrevioCoordinator(hass, entry)
+        coordinator.client = Client()
+        return coordinator
+
+    return make
+
+
+async def test_without_adaptive_polling_interval_follows_options(make_coordinator, freezer):
+    freezer.move_to(NOON)
+    coordinator = make_coordinator(adaptive=False, interval=20)
+    # Ani blízký check-in interval nezkrátí
+    assert coordinator._next_update_interval(_data(NOON + timedelta(minutes=30))) == timedelta(
+        minutes=20
+    )
+    assert coordinator.poll_mode == "normal"
+
+
+@pytest.mark.parametrize(
+    ("interval", "expected"),
+    [
+        (15, ADAPTIVE_BUSY_INTERVAL),
+        # Kratší běžný interval se před check-inem neprodlužuje
+        (3, timedelta(minutes=3)),
+    ],
+)
+async def test_busy_before_checkin_polls_faster(make_coordinator, freezer, interval, expected):
+    freezer.move_to(NOON)
+    coordinator = make_coordinator(interval=interval)
+    assert coordinator._next_update_interval(_data(NOON + timedelta(minutes=90))) == expected
+    assert coordinator.poll_mode == "busy"
+
+
+async def test_busy_window_covers_checkout_but_not_later_or_past_checkins(make_coordinator, freezer):
+    freezer.move_to(NOON)
+    coordinator = make_coordinator()
+    # Check-out za hodinu (check-in před dvěma dny)
+    assert coordinator._next_update_interval(_data(NOON - timedelta(days=2, hours=-1))) == (
+        ADAPTIVE_BUSY_INTERVAL
+    )
+    # Check-in za tři hodiny a check-in, který už proběhl
+    data = _data(NOON + timedelta(hours=3), NOON - timedelta(minutes=1))
+    assert coordinator._next_update_interval(data) == timedelta(minutes=15)
+    assert coordinator.poll_mode == "normal"
+
+
+@pytest.mark.parametrize(
+    ("interval", "expected"),
+    [
+        (15, ADAPTIVE_NIGHT_INTERVAL),
+        # Delší běžný interval se v noci nezkracuje
+        (90, timedelta(minutes=90)),
+    ],
+)
+async def test_idle_night_polls_slower(make_coordinator, freezer, interval, expected):
+    freezer.move_to(datetime(2026, 10, 19, 2, 0))
+    coordinator = make_coordinator(interval=interval)
+    assert coordinator._next_update_interval(_data(NOON)) == expected
+    assert coordinator.poll_mode == "night"
+
+
+async def test_busy_wins_over_night(make_coordinator, freezer):
+    freezer.move_to(datetime(2026, 10, 19, 5, 0))
+    coordinator = make_coordinator()
+    assert coordinator._next_update_interval(_data(datetime(2026, 10, 19, 6, 30))) == (
+        ADAPTIVE_BUSY_INTERVAL
+    )
+
+
+async def test_status_change_triggers_follow_up(make_coordinator, freezer):
+    freezer.move_to(datetime(2026, 10, 19, 2, 0))
+    coordinator = make_coordinator()
+    coordinator.tracker.change_stats = {"status_changed": 1}
+    assert coordinator._next_update_interval(_data(NOON)) == ADAPTIVE_FOLLOW_UP_INTERVAL
+    assert coordinator.poll_mode == "follow_up"
+
+
+async def test_breaker_backoff_overrides_adaptive_interval(make_coordinator, freezer):
+    freezer.move_to(datetime(2026, 10, 19, 13, 0))
+    coordinator = make_coordinator()
+    await coordinator.async_refresh()
+    # Check-in ve 14:00 je do hodiny
+    assert coordinator.poll_mode == "busy"
+    assert coordinator.update_interval == ADAPTIVE_BUSY_INTERVAL
+
+    coordinator.client.error = ConnectionError("Previo nedostupné")
+    for _ in range(BREAKER_FAILURE_THRESHOLD - 1):
+        await coordinator.async_refresh()
+    # Pod prahem breakeru zůstává adaptivní interval
+    assert coordinator.update_interval == ADAPTIVE_BUSY_INTERVAL
+
+    await coordinator.async_refresh()
+    assert coordinator.poll_mode == "backoff"
+    assert coordinator.update_interval == timedelta(minutes=30)
+
+    # Změna možností za otevřeného breakeru backoff nezkrátí
+    coordinator.async_apply_options()
+    assert coordinator.update_interval == timedelta(minutes=30)
+
+    # Úspěšný zkušební požadavek vrátí adaptivní interval
+    coordinator.breaker._open_until = 0.0
+    coordinator.client.error = None
+    await coordinator.async_refresh()
+    assert coordinator.breaker.state == "closed"
+    assert coordinator.poll_mode == "busy"
+    assert coordinator.update_interval == ADAPTIVE_BUSY_INTERVAL
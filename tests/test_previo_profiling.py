@@ -0,0 +1,112 @@
+"""Spany aktualizace Previo (vnoření, časy, vzorkování) a služba profile."""
+import logging
+import pstats
+
+import pytest
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.previo_v4 import profiling
+from custom_components.previo_v4.profiling import SpanTracer, async_profile
+
+
+class Clock:
+    """perf_counter, který se posouvá jen ručně."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(profiling, "time", clock)
+    return clock
+
+
+def test_nested_spans_are_timed_separately(clock):
+    tracer = SpanTracer(logging.getLogger("test"))
+    tracer.start_cycle()
+    with tracer.span("fetch"):
+        clock.now += 0.010
+        with tracer.span("parse"):
+            clock.now += 0.025
+        clock.now += 0.005
+    with tracer.span("parse"):
+        clock.now += 0.015
+
+    # Vnější span zahrnuje i vnořený, stejné jméno se sčítá
+    assert tracer.as_dict() == {
+        "last_cycle_ms": {"parse": 40.0, "fetch": 40.0},
+        "totals": {
+            "parse": {"count": 2, "total_ms": 40.0, "avg_ms": 20.0, "max_ms": 25.0},
+            "fetch": {"count": 1, "total_ms": 40.0, "avg_ms": 40.0, "max_ms": 40.0},
+        },
+    }
+
+    tracer.start_cycle()
+    with tracer.span("fetch"):
+        clock.now += 0.060
+    stats = tracer.as_dict()
+    assert stats["last_cycle_ms"] == {"fetch": 60.0}
+    assert stats["totals"]["fetch"] == {
+        "count": 2, "total_ms": 100.0, "avg_ms": 50.0, "max_ms": 60.0,
+    }
+
+
+def test_span_is_recorded_when_block_raises(clock):
+    tracer = SpanTracer(logging.getLogger("test"))
+    with pytest.raises(ValueError), tracer.span("fetch"):
+        clock.now += 0.003
+        raise ValueError
+    assert tracer.spans["fetch"]["total_ms"] == pytest.approx(3.0)
+
+
+def test_debug_tracing_samples_every_nth_cycle(caplog):
+    logger = logging.getLogger("test.previo.tracing")
+    tracer = SpanTracer(logger, sample_every=3)
+    caplog.set_level(logging.DEBUG, logger.name)
+
+    sampled = []
+    for _ in range(7):
+        tracer.start_cycle()
+        sampled.append(tracer.detailed)
+        tracer.record("fetch", 1.0)
+        tracer.detail("cycle detail")
+    assert sampled == [True, False, False, True, False, False, True]
+    assert [r.getMessage() for r in caplog.records].count("cycle detail") == 3
+
+    # verbose_logging loguje podrobnosti každé aktualizace na INFO
+    caplog.clear()
+    tracer.verbose = True
+    tracer.start_cycle()
+    tracer.detail("cycle detail")
+    assert [(r.levelno, r.getMessage()) for r in caplog.records] == [
+        (logging.INFO, "cycle detail")
+    ]
+
+
+def test_no_sampling_without_debug_log(caplog):
+    tracer = SpanTracer(logging.getLogger("test.previo.quiet"), sample_every=1)
+    caplog.set_level(logging.INFO, "test.previo.quiet")
+    tracer.start_cycle()
+    tracer.record("fetch", 1.0)
+    assert not tracer.detailed
+    assert caplog.records == []
+
+
+async def test_profile_writes_stats_and_rejects_parallel_run(hass, tmp_path):
+    path = tmp_path / "previo.prof"
+    await async_profile(hass, 0.01, str(path))
+    assert pstats.Stats(str(path)).total_calls > 0
+
+    profiler = profiling.cProfile.Profile()
+    profiler.enable()
+    try:
+        with pytest.raises(HomeAssistantError):
+            await async_profile(hass, 0.01, str(tmp_path / "second.prof"))
+    finally:
+        profiler.disable()
+    assert not (tmp_path / "second.prof").exists()
@@ -0,0 +1,36 @@
+"""Služby Previo v4 směrované na hotely."""
+import threading
+from unittest.mock import AsyncMock, MagicMock
+
+from homeassistant.core import callback
+
+from custom_components.previo_v4.const import DOMAIN
+from custom_components.previo_v4.services import async_setup_services
+
+
+def _entry_data(hotel_id, sync_callback):
+    coordinator = MagicMock()
+    coordinator.config_entry.data = {"hotel_id": hotel_id}
+    coordinator.async_request_refresh = AsyncMock()
+    return {"coordinator": coordinator, "sync_callback": sync_callback, "tracked": set()}
+
+
+async def test_manual_refresh_syncs_entities_on_event_loop(hass):
+    threads = []
+
+    @callback
+    def sync_entities():
+        threads.append(threading.current_thread())
+
+    async_setup_services(hass)
+    hass.data[DOMAIN] = {
+        "a": _entry_data("1", sync_entities),
+        "b": _entry_data("2", sync_entities),
+    }
+    await hass.services.async_call(DOMAIN, "manual_refresh", {"hotel_id": "2"}, blocking=True)
+    assert threads == [threading.main_thread()]
+    hass.data[DOMAIN]["b"]["coordinator"].async_request_refresh.assert_awaited_once()
+    hass.data[DOMAIN]["a"]["coordinator"].async_request_refresh.assert_not_awaited()
+
+    await hass.services.async_call(DOMAIN, "manual_refresh", {}, blocking=True)
+    assert threads == [threading.main_thread()] * 3
@@ -0,0 +1,262 @@
+"""FieldSpec: extrakce polí z XML jedním průchodem přes dispatch tabulku."""
+from datetime import datetime
+
+import pytest
+from defusedxml.ElementTree import fromstring
+
+from custom_components.previo_v4.const import DISPLAY_DATETIME_FORMAT
+from custom_components.previo_v4.model import intern
+from custom_components.previo_v4.parser import SUB_RESERVATION_FIELDS, parse_sub_reservation
+from custom_components.previo_v4.xmlfields import Field, FieldSpec
+
+SPEC = FieldSpec({
+    "id": Field("id"),
+    "title": Field("nazvy/nazev", default="Bez názvu", intern=True),
+    "subtitle": Field("nazvy/nadtitul", default=""),
+    "live": Field("flags/live", lambda text: text == "1", default=False),
+    "count": Field("count", int, default=0),
+    "codes": Field("codes/code", intern=True, many=True),
+    "pins": Field("access/pin", many=True),
+    "first_pins": Field("list/item", many=True, child="pin"),
+    "owner": Field("owner", child="name", default=None),
+})
+
+
+def _extract(xml, intern=None):
+    element = fromstring(xml)
+    return SPEC.extract(element) if intern is None else SPEC.extract(element, intern)
+
+
+def _findtext_reference(element):
+    """Referenční výsledek přes find()/findtext()/findall() pro porovnání."""
+
+    def items(parent, tag):
+        parent = element.find(parent)
+        return parent.findall(tag) if parent is not None else []
+
+    owner = element.find("owner")
+    record = {
+        "title": element.findtext("nazvy/nazev", "Bez názvu"),
+        "subtitle": element.findtext("nazvy/nadtitul", ""),
+        "live": element.findtext("flags/live", "0") == "1",
+        "count": int(element.findtext("count", "0")),
+        "codes": tuple(code.text for code in items("codes", "code") if code.text),
+        "pins": tuple(pin.text for pin in items("access", "pin") if pin.text),
+        "first_pins": tuple(
+            pin for pin in (item.findtext("pin") for item in items("list", "item")) if pin
+        ),
+        "owner": owner.findtext("name") if owner is not None else None,
+    }
+    if element.find("id") is not None:
+        record["id"] = element.findtext("id")
+    return record
+
+
+def _baseline_sub_reservation(res):
+    """Pole pod-rezervace tak, jak je četl PrevioCoordinator před parserem."""
+    rooms, guests, com_ids, alfred_pins, card_keys, checkins, checkouts, market_codes = (
+        [], [], [], [], [], [], [], []
+    )
+    com_id = res.findtext("comId")
+    if com_id:
+        com_ids.append(com_id)
+    object_elem = res.find("object")
+    if object_elem is not None:
+        room_name = object_elem.findtext("name")
+        if room_name:
+            rooms.append(room_name)
+    guest_elem = res.find("guest")
+    if guest_elem is not None:
+        guest_name = guest_elem.findtext("name")
+        if guest_name:
+            guests.append(guest_name)
+    alfred_code_list = res.find("alfredCodeList")
+    if alfred_code_list is not None:
+        for alfred_code in alfred_code_list.findall("alfredCode"):
+            pin = alfred_code.findtext("pin")
+            if pin:
+                alfred_pins.append(pin)
+    card_data_list = res.find("cardDataList")
+    if card_data_list is not None:
+        for card_data in card_data_list.findall("cardData"):
+            key = card_data.findtext("key")
+            if key:
+                card_keys.append(key)
+    for path, target in (("term/from", checkins), ("term/to", checkouts)):
+        text = res.findtext(path)
+        if text:
+            try:
+                moment = datetime.strptime(text, "%Y-%m-%d %H:%M:%S")
+                target.append(moment.strftime(DISPLAY_DATETIME_FORMAT))
+            except ValueError:
+                target.append(text)
+    price_str = res.findtext("price", "0")
+    try:
+        price = float(price_str) if price_str else 0.0
+    except ValueError:
+        price = 0.0
+    market_code_list = res.find("marketCodeList")
+    if market_code_list is not None:
+        for market_code in market_code_list.findall("marketCode"):
+            if market_code.text and market_code.text not in market_codes:
+                market_codes.append(market_code.text)
+    return {
+        "res_id": res.findtext("resId"),
+        "voucher": res.findtext("voucher") or "není",
+        "status_id": res.findtext("status/statusId", "0"),
+        "rooms": rooms,
+        "guests": guests,
+        "com_ids": com_ids,
+        "alfred_pins": alfred_pins,
+        "card_keys": card_keys,
+        "checkins": checkins,
+        "checkouts": checkouts,
+        "price": price,
+        "market_codes": market_codes,
+    }
+
+
+def _parsed_sub_reservation(res):
+    fields = SUB_RESERVATION_FIELDS.extract(res, intern)
+    voucher, status_id, stay, market_codes = parse_sub_reservation(fields)
+    return {
+        "res_id": fields.get("res_id"),
+        "voucher": voucher,
+        "status_id": status_id,
+        "rooms": [stay.room] if stay.room else [],
+        "guests": [stay.guest] if stay.guest else [],
+        "com_ids": [stay.com_id] if stay.com_id else [],
+        "alfred_pins": list(stay.alfred_pins),
+        "card_keys": list(stay.card_keys),
+        "checkins": [stay.checkin_display] if stay.checkin_display else [],
+        "checkouts": [stay.checkout_display] if stay.checkout_display else [],
+        "price": stay.price,
+        "market_codes": list(dict.fromkeys(market_codes)),
+    }
+
+
+@pytest.mark.parametrize(
+    "xml",
+    [
+        "<r><id>1</id><nazvy><nazev>Zprávy</nazev><nadtitul>Večer</nadtitul></nazvy>"
+        "<flags><live>1</live></flags><count>3</count>"
+        "<codes><code>A</code><code></code><code>B</code></codes>"
+        "<access><pin>1234</pin></access></r>",
+        "<r><nazvy><nazev>Film</nazev></nazvy><other><nazev>x</nazev></other></r>",
+        # Opakované pole: platí první výskyt
+        "<r><nazvy><nadtitul>a</nadtitul></nazvy><nazvy><nazev>B</nazev></nazvy>"
+        "<nazvy><nazev>C</nazev></nazvy><count>1</count><count>2</count></r>",
+        "<r><nazvy><nazev/></nazvy><nazvy><nazev>D</nazev></nazvy></r>",
+        # Chybějící <nazvy>: výchozí hodnoty jako findtext(path, default)
+        "<r><id></id><nazvy/><flags><live>0</live></flags></r>",
+        "<r><list><item><pin>1</pin><pin>2</pin></item><item><pin/><pin>3</pin></item></list>"
+        "<list><item><pin>4</pin></item><item/></list></r>",
+        # Rodič polí many: jen první <codes>/<access>
+        "<r><codes><code>A</code></codes><codes><code>B</code></codes>"
+        "<access/><access><pin>5</pin></access></r>",
+        # child: první <owner>, i když jméno má až druhý
+        "<r><owner/><owner><name>Eva</name></owner></r>",
+        "<r><owner><name>Jan</name></owner><owner><name>Eva</name></owner></r>",
+        "<r/>",
+    ],
+)
+def test_matches_findtext_reference(xml):
+    assert _extract(xml) == _findtext_reference(fromstring(xml))
+
+
+@pytest.mark.parametrize(
+    "xml",
+    [
+        # Dva hosté - host je první <guest>, i když nemá jméno
+        "<reservation><resId>1</resId><guest><name>A</name></guest>"
+        "<guest><name>B</name></guest></reservation>",
+        "<reservation><resId>2</resId><guest/><guest><name>B</name></guest>"
+        "<guest><name>C</name></guest></reservation>",
+        "<reservation><resId>3</resId><guest><name/></guest><guest><name>B</name></guest>"
+        "</reservation>",
+        # Několik seznamů Alfred kódů i karet, více PINů v jednom kódu:
+        # čte se jen první seznam a první PIN každého kódu
+        "<reservation><resId>4</resId>"
+        "<alfredCodeList><alfredCode><pin>1111</pin><pin>9999</pin></alfredCode>"
+        "<alfredCode><pin/><pin>8888</pin></alfredCode></alfredCodeList>"
+        "<alfredCodeList><alfredCode><pin>2222</pin></alfredCode><alfredCode/></alfredCodeList>"
+        "<cardDataList><cardData><key>K1</key><key>K9</key></cardData></cardDataList>"
+        "<cardDataList><cardData><key>K2</key></cardData></cardDataList>"
+        "<marketCodeList><marketCode>M1</marketCode><marketCode>M2</marketCode></marketCodeList>"
+        "<marketCodeList><marketCode>M3</marketCode></marketCodeList></reservation>",
+        "<reservation><resId>5</resId><voucher>V5</voucher><status><statusId>3</statusId>"
+        "</status><status><statusId>4</statusId></status><object><name>101</name></object>"
+        "<object><name>102</name></object><term><from>2026-10-01 14:00:00</from>"
+        "<to>2026-10-03 10:00:00</to></term><term><from>2026-11-01 14:00:00</from></term>"
+        "<comId>77</comId><price>1200.50</price><price>1</price></reservation>",
+        "<reservation><resId>6</resId><price>abc</price><voucher/><status/></reservation>",
+        # První <term> bez from, nečitelné a nezarovnané časy
+        "<reservation><resId>8</resId><term><to>2026-10-03 10:00:00</to></term>"
+        "<term><from>2026-10-01 14:00:00</from></term><object/>"
+        "<object><name>103</name></object></reservation>",
+        "<reservation><resId>9</resId><term><from>zítra</from><to>2026-10-3 9:05:00</to>"
+        "</term><price/></reservation>",
+        "<reservation><resId>7</resId></reservation>",
+    ],
+)
+def test_sub_reservation_matches_baseline(xml):
+    element = fromstring(xml)
+    assert _parsed_sub_reservation(element) == _baseline_sub_reservation(element)
+
+
+def test_missing_field_without_default_is_absent():
+    assert "id" not in _extract("<r><count>2</count></r>")
+    assert _extract("<r><id></id></r>")["id"] == ""
+
+
+def test_intern_applies_before_converter_only_to_marked_fields():
+    seen = []
+
+    def intern(text):
+        seen.append(text)
+        return text.upper()
+
+    record = _extract(
+        "<r><id>x</id><nazvy><nazev>t</nazev><nadtitul>s</nadtitul></nazvy>"
+        "<codes><code>a</code></codes></r>",
+        intern,
+    )
+    assert record["title"] == "T"
+    assert record["subtitle"] == "s"
+    assert record["codes"] == ("A",)
+    assert record["id"] == "x"
+    assert sorted(seen) == ["a", "t"]
+
+
+def test_records_do_not_share_state():
+    first = _extract("<r><codes><code>A</code></codes><list><item><pin>1</pin></item></list></r>")
+    second = _extract("<r/>")
+    assert first["codes"] == ("A",)
+    assert first["first_pins"] == ("1",)
+    assert second["codes"] == ()
+    assert second["first_pins"] == ()
+    assert second["title"] == "Bez názvu"
+
+
+def test_several_fields_on_one_path():
+    spec = FieldSpec({"raw": Field("n"), "number": Field("n", int, default=0)})
+    assert spec.extract(fromstring("<r><n>7</n><n>8</n></r>")) == {"raw": "7", "number": 7}
+
+
+def test_empty_spec_is_rejected():
+    with pytest.raises(ValueError):
+        FieldSpec({})
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        # Rodič pole many se čte jen první, pole přes všechny by se změnilo
+        {"codes": Field("list/code", many=True), "note": Field("list/note")},
+        {"items": Field("list/item", many=True), "first": Field("list/item/pin")},
+        {"owner": Field("owner", child="name")},
+    ],
+)
+def test_ambiguous_fields_are_rejected(fields):
+    with pytest.raises(ValueError):
+        FieldSpec(fields)
@@ -0,0 +1,132 @@
+"""Offline náhrada XML API programu České televize nad aiohttp.
+
+Pro každý kanál a den vrací deterministický program (06:00 až po
+půlnoci) se všemi poli, která parsuje cz_tv_program: názvy, díl, žánr,
+stopáž, popis, odkaz a ikony.
+
+Samostatné spuštění:
+
+    python tools/cz_tv_simulator.py --port 8098
+
+a v integraci pak místo API_BASE_URL použít
+http://127.0.0.1:8098/services-old/programme/xml/schedule.php.
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+from xml.sax.saxutils import escape
+
+from aiohttp import web
+
+API_PATH = "/services-old/programme/xml/schedule.php"
+
+GENRES = ("Film", "Seriál", "Zpravodajství", "Dokument", "Sport", "Pro děti", "Zábava")
+TITLES = (
+    "Události", "Počasí", "Sportovní noviny", "Kriminalistka", "Návraty k divočině",
+    "Hobby naší doby", "Máme rádi Česko", "Vyšehrad", "Tajemství těla", "Reportéři ČT",
+    "Na forbíně", "Toulavá kamera", "Všechnopárty", "Večerníček", "Kluci v akci",
+)
+WORDS = (
+    "příběh", "rodina", "zločin", "cesta", "krajina", "historie", "tajemství",
+    "láska", "domov", "souboj", "objev", "léto", "město", "vesnice", "zvíře",
+)
+
+
+def generate_day(channel, day, seed=0):
+    """Pořady kanálu pro jeden den jako seznam dictů (pole XML)."""
+    rng = random.Random(f"{seed}-{channel}-{day.isoformat()}")
+    start = datetime.combine(day, datetime.min.time()).replace(hour=6)
+    end = start + timedelta(hours=20)
+    programs = []
+    while start < end:
+        minutes = rng.choice((5, 10, 15, 30, 30, 45, 60, 60, 90, 120))
+        title = rng.choice(TITLES)
+        programs.append({
+            "cas": start.strftime("%H:%M"),
+            "datum": start.strftime("%Y-%m-%d"),
+            "nadtitul": rng.choice(("", "", "Cyklus")),
+            "nazev": title,
+            "nazev_casti": " ".join(rng.sample(WORDS, 2)).capitalize()
+            if rng.random() < 0.5 else "",
+            "dil": str(rng.randint(1, 40)) if rng.random() < 0.4 else "",
+            "zanr": rng.choice(GENRES),
+            "stopaz": str(minutes),
+            "noticka": " ".join(rng.choices(WORDS, k=rng.randint(8, 40))).capitalize() + ".",
+            "link": f"https://www.ceskatelevize.cz/porady/{rng.randint(10**6, 10**7)}",
+            "zvuk": rng.choice(("stereo", "mono", "dolby")),
+            "skryte_titulky": rng.choice(("0", "1")),
+            "live": "1" if rng.random() < 0.05 else "0",
+            "premiera": "1" if rng.random() < 0.1 else "0",
+            "pomer": rng.choice(("16:9", "4:3")),
+        })
+        start += timedelta(minutes=minutes)
+    return programs
+
+
+def render_day(programs):
+    """XML odpověď pro jeden den kanálu."""
+    items = []
+    for program in programs:
+        field = {key: escape(value) for key, value in program.items()}
+        items.append(
+            "<porad>"
+            f"<cas>{field['cas']}</cas>"
+            f"<datum>{field['datum']}</datum>"
+            "<nazvy>"
+            f"<nadtitul>{field['nadtitul']}</nadtitul>"
+            f"<nazev>{field['nazev']}</nazev>"
+            f"<nazev_casti>{field['nazev_casti']}</nazev_casti>"
+            "</nazvy>"
+            f"<dil>{field['dil']}</dil>"
+            f"<zanr>{field['zanr']}</zanr>"
+            f"<stopaz>{field['stopaz']}</stopaz>"
+            f"<noticka>{field['noticka']}</noticka>"
+            f"<linky><program>{field['link']}</program></linky>"
+            "<ikony>"
+            f"<zvuk>{field['zvuk']}</zvuk>"
+            f"<skryte_titulky>{field['skryte_titulky']}</skryte_titulky>"
+            f"<live>{field['live']}</live>"
+            f"<premiera>{field['premiera']}</premiera>"
+            f"<pomer>{field['pomer']}</pomer>"
+            "</ikony>"
+            "</porad>\n"
+        )
+    return f'<?xml version="1.0" encoding="utf-8"?>\n<program>\n{"".join(items)}</program>'
+
+
+class CzTVSimulator:
+    """aiohttp handler schedule.php s počítadlem požadavků."""
+
+    def __init__(self, seed=0):
+        self.seed = seed
+        self.stats = {"requests": 0, "bytes": 0}
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get(API_PATH, self.handle_schedule)
+        return app
+
+    async def handle_schedule(self, request):
+        self.stats["requests"] += 1
+        channel = request.query.get("channel", "")
+        try:
+            day = datetime.strptime(request.query.get("date", ""), "%d.%m.%Y").date()
+        except ValueError:
+            return web.Response(status=400, text="Invalid date")
+        body = render_day(generate_day(channel, day, self.seed))
+        self.stats["bytes"] += len(body.encode())
+        return web.Response(text=body, content_type="text/xml")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8098)
+    args = parser.parse_args()
+    print(f"Program ČT na http://{args.host}:{args.port}{API_PATH}")
+    web.run_app(CzTVSimulator(args.seed).app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""Zátěžový benchmark Previo v4 proti offline simulátoru API.
+
+Pro každou velikost hotelu (výchozí 50, 500 a 5000 rezervací) spustí
+simulátor, nastaví integraci v testovací instanci HA a změří:
+
+- dobu nastavení (první stažení + vytvoření entit)
+- dobu aktualizace (medián přes --cycles, se změnou --churn rezervací)
+- časy úseků fetch/parse/build/merge/sync/fanout z tracingu koordinátoru
+- zápisy stavů (state_changed) na aktualizaci
+- špičku alokované paměti během jedné aktualizace (tracemalloc)
+
+Výsledky se dají uložit jako baseline a později porovnat:
+
+    python tools/previo_benchmark.py --save-baseline tools/previo_baseline.json
+    python tools/previo_benchmark.py --compare tools/previo_baseline.json
+
+Potřebuje pytest-homeassistant-custom-component (viz tools/requirements.txt);
+spouští se z kořene repozitáře.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+from aiohttp import ThreadedResolver
+from aiohttp.test_utils import TestServer
+from homeassistant import loader
+from homeassistant.const import EVENT_STATE_CHANGED
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from custom_components.previo_v4 import client as previo_client  # noqa: E402
+from custom_components.previo_v4.const import (  # noqa: E402
+    CONF_DAYS_AHEAD,
+    DOMAIN,
+)
+from previo_simulator import API_PATH, PrevioSimulator  # noqa: E402
+
+DEFAULT_SIZES = (50, 500, 5000)
+
+# Metriky porovnávané s baseline (vyšší = horší)
+COMPARED_METRICS = (
+    "setup_ms",
+    "refresh_ms",
+    "sync_ms",
+    "fanout_ms",
+    "peak_memory_kib",
+    "state_writes",
+)
+
+
+class StateWriteCounter:
+    """Počítá state_changed události na sběrnici HA."""
+
+    def __init__(self, hass):
+        self.count = 0
+        self._unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, self._handle)
+
+    def _handle(self, _event):
+        self.count += 1
+
+    def take(self):
+        count, self.count = self.count, 0
+        return count
+
+    def close(self):
+        self._unsub()
+
+
+async def _async_refresh(hass, coordinator):
+    await coordinator.async_refresh()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+
+async def async_run_size(size, args):
+    """Změř jednu velikost hotelu; vrací dict metrik."""
+    simulator = PrevioSimulator(
+        reservations=size,
+        seed=args.seed,
+        group_ratio=args.group_ratio,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        report_total=not args.no_total,
+    )
+    server = TestServer(simulator.app())
+    await server.start_server()
+    # Klient integrace posílá dotazy na simulátor místo api.previo.app
+    original_url = previo_client.API_URL
+    previo_client.API_URL = str(server.make_url(API_PATH))
+
+    try:
+        # Sdílená aiohttp session HA jinak hledá resolver přes zeroconf
+        # (síťové adaptéry, frame helper) - simulátor běží na localhostu
+        with tempfile.TemporaryDirectory() as config_dir, patch(
+            "homeassistant.helpers.aiohttp_client._async_make_resolver",
+            side_effect=lambda hass: ThreadedResolver(),
+        ):
+            async with async_test_home_assistant() as hass:
+                hass.config.config_dir = config_dir
+                # Povolí načtení integrací z custom_components
+                hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+                writes = StateWriteCounter(hass)
+
+                entry = MockConfigEntry(
+                    domain=DOMAIN,
+                    title=f"Benchmark {size}",
+                    data={
+                        "login": simulator.login,
+                        "password": simulator.password,
+                        "hotel_id": simulator.hotel_id,
+                    },
+                    options={CONF_DAYS_AHEAD: 60},
+                )
+                entry.add_to_hass(hass)
+
+                started = time.perf_counter()
+                if not await hass.config_entries.async_setup(entry.entry_id):
+                    raise RuntimeError("Nastavení integrace selhalo")
+                await hass.async_block_till_done(wait_background_tasks=True)
+                setup_ms = (time.perf_counter() - started) * 1000
+                setup_writes = writes.take()
+                coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+                cycles = []
+                for _ in range(args.cycles):
+                    simulator.mutate(args.churn)
+                    started = time.perf_counter()
+                    await _async_refresh(hass, coordinator)
+                    cycles.append({
+                        "refresh_ms": (time.perf_counter() - started) * 1000,
+                        "state_writes": writes.take(),
+                        **{
+                            f"{name}_ms": duration
+                            for name, duration in coordinator.tracer.last_cycle.items()
+                        },
+                    })
+
+                # Paměť zvlášť - tracemalloc zpomaluje a zkreslil by časy
+                simulator.mutate(args.churn)
+                tracemalloc.start()
+                await _async_refresh(hass, coordinator)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                writes.take()
+
+                result = {
+                    "reservations": len(coordinator.data or {}),
+                    "rooms_in_response": len(simulator.sub_reservations),
+                    "entities": len(hass.states.async_entity_ids("sensor")),
+                    "setup_ms": round(setup_ms, 1),
+                    "setup_state_writes": setup_writes,
+                    "peak_memory_kib": round(peak / 1024, 1),
+                    "requests": simulator.stats["requests"],
+                    "fetch": coordinator.fetch_stats,
+                }
+                for key in sorted({key for cycle in cycles for key in cycle}):
+                    values = [cycle.get(key, 0.0) for cycle in cycles]
+                    result[key] = round(statistics.median(values), 1)
+                writes.close()
+                await hass.config_entries.async_unload(entry.entry_id)
+                return result
+    finally:
+        previo_client.API_URL = original_url
+        await server.close()
+
+
+def compare(results, baseline, tolerance):
+    """Regrese proti baseline jako seznam řádků (prázdný = bez regresí)."""
+    regressions = []
+    for size, metrics in results.items():
+        reference = baseline.get("results", {}).get(size)
+        if reference is None:
+            continue
+        for metric in COMPARED_METRICS:
+            current, previous = metrics.get(metric), reference.get(metric)
+            if current is None or previous is None:
+                continue
+            # Zápisy stavů jsou deterministické - jakýkoli nárůst je regrese
+            limit = previous if metric == "state_writes" else previous * (1 + tolerance)
+            if current > limit:
+                regressions.append(
+                    f"{size} rezervací: {metric} {previous} -> {current}"
+                )
+    return regressions
+
+
+def print_table(results):
+    columns = ("setup_ms", "refresh_ms", "fetch_ms", "parse_ms", "build_ms",
+               "merge_ms", "sync_ms", "fanout_ms", "state_writes", "peak_memory_kib")
+    print("size".rjust(6) + "".join(column.rjust(16) for column in columns))
+    for size, metrics in results.items():
+        print(size.rjust(6) + "".join(
+            str(metrics.get(column, "-")).rjust(16) for column in columns
+        ))
+
+
+async def async_main(args):
+    results = {}
+    for size in args.sizes:
+        results[str(size)] = await async_run_size(size, args)
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "settings": {
+            "cycles": args.cycles,
+            "churn": args.churn,
+            "group_ratio": args.group_ratio,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "error_rate": args.error_rate,
+            "report_total": not args.no_total,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    print_table(results)
+
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Baseline uložena do {args.save_baseline}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if baseline.get("settings") != report["settings"]:
+            print("Pozor: baseline byla změřena s jiným nastavením")
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESE {line}")
+        if regressions:
+            return 1
+        print("Bez regresí proti baseline")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--churn", type=float, default=0.02,
+                        help="podíl rezervací změněných před každou aktualizací")
+    parser.add_argument("--group-ratio", type=float, default=0.1)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--no-total", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="povolené zhoršení časů a paměti proti baseline (0.2 = 20 %%)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(asyncio.run(async_main(args)))
+
+
+if __name__ == "__main__":
+    main()
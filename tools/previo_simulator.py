@@ -0,0 +1,284 @@
+"""Offline náhrada Previo API (searchReservations) nad aiohttp.
+
+Generuje deterministickou sadu rezervací včetně skupinových (více pokojů
+pod jedním resId), Alfred PINů, card keys a market kódů a vrací je po
+stránkách stejně jako api.previo.app. Umí přidat latenci, chyby HTTP
+a poškozené XML.
+
+Samostatné spuštění:
+
+    python tools/previo_simulator.py --reservations 500 --port 8099
+
+a v integraci pak místo API_URL použít
+http://127.0.0.1:8099/x1/hotel/searchReservations.
+"""
+import argparse
+import asyncio
+import random
+from datetime import datetime, timedelta
+from xml.sax.saxutils import escape
+
+from aiohttp import web
+from defusedxml.ElementTree import ParseError, fromstring
+
+API_PATH = "/x1/hotel/searchReservations"
+
+# Rozložení statusů (cosId) zhruba jako v provozu hotelu
+STATUS_WEIGHTS = {
+    "1": 3,    # Option
+    "2": 60,   # Confirmed
+    "3": 15,   # Checked in
+    "6": 2,    # Waiting list
+    "7": 8,    # Cancelled
+    "8": 2,    # No-show
+    "9": 8,    # Checked out
+    "10": 2,   # Other
+}
+
+# Přechody statusu při simulované změně z recepce
+STATUS_TRANSITIONS = {
+    "1": "2",
+    "2": "3",
+    "3": "9",
+    "6": "2",
+}
+
+MARKET_CODES = ("BOOKING", "DIRECT", "EXPEDIA", "CORPORATE", "GROUP", "AIRBNB")
+FIRST_NAMES = ("Jan", "Petra", "Tomáš", "Lucie", "Martin", "Eva", "Jakub", "Anna")
+LAST_NAMES = ("Novák", "Svobodová", "Dvořák", "Černá", "Procházka", "Kučerová")
+
+API_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def generate_reservations(
+    count,
+    seed=0,
+    group_ratio=0.1,
+    max_group_rooms=12,
+    rooms=None,
+    days_ahead=30,
+    today=None,
+):
+    """Vygeneruj count rezervací jako seznam pod-rezervací (jeden pokoj = jedna).
+
+    Pod-rezervace skupiny jsou za sebou, takže je stránkování může rozdělit
+    na hranici stránky - přesně jako skutečné API.
+    """
+    rng = random.Random(seed)
+    today = today or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    rooms = rooms or max(20, count // 3)
+    room_names = [f"{100 + floor * 100 + number}" for floor in range(rooms // 40 + 1)
+                  for number in range(1, 41)][:rooms]
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+
+    sub_reservations = []
+    for index in range(count):
+        res_id = str(1_000_000 + index)
+        status_id = rng.choices(statuses, weights)[0]
+        room_count = (
+            rng.randint(2, max_group_rooms) if rng.random() < group_ratio else 1
+        )
+        checkin = today + timedelta(days=rng.randint(-3, days_ahead), hours=14)
+        checkout = checkin + timedelta(days=rng.randint(1, 7), hours=-4)
+        market_codes = rng.sample(MARKET_CODES, rng.randint(0, 2))
+        for room in rng.sample(room_names, min(room_count, len(room_names))):
+            sub_reservations.append({
+                "resId": res_id,
+                "voucher": f"V{res_id}",
+                "statusId": status_id,
+                "room": room,
+                "from": checkin.strftime(API_DATETIME_FORMAT),
+                "to": checkout.strftime(API_DATETIME_FORMAT),
+                "guest": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                "comId": str(rng.randint(10_000, 99_999)),
+                "price": f"{rng.randint(1_500, 9_000)}.00",
+                "pins": [f"{rng.randint(0, 999_999):06d}" for _ in range(rng.randint(0, 2))],
+                "keys": [f"{rng.getrandbits(32):08X}" for _ in range(rng.randint(0, 2))],
+                "marketCodes": market_codes,
+            })
+    return sub_reservations
+
+
+def render_sub_reservation(sub):
+    """XML element <reservation> jedné pod-rezervace."""
+    pins = "".join(
+        f"<alfredCode><pin>{pin}</pin></alfredCode>" for pin in sub["pins"]
+    )
+    keys = "".join(
+        f"<cardData><key>{key}</key></cardData>" for key in sub["keys"]
+    )
+    codes = "".join(
+        f"<marketCode>{escape(code)}</marketCode>" for code in sub["marketCodes"]
+    )
+    return (
+        "<reservation>"
+        f"<resId>{sub['resId']}</resId>"
+        f"<voucher>{escape(sub['voucher'])}</voucher>"
+        f"<status><statusId>{sub['statusId']}</statusId></status>"
+        f"<object><name>{escape(sub['room'])}</name></object>"
+        f"<term><from>{sub['from']}</from><to>{sub['to']}</to></term>"
+        f"<guest><name>{escape(sub['guest'])}</name></guest>"
+        f"<comId>{sub['comId']}</comId>"
+        f"<price>{sub['price']}</price>"
+        f"<alfredCodeList>{pins}</alfredCodeList>"
+        f"<cardDataList>{keys}</cardDataList>"
+        f"<marketCodeList>{codes}</marketCodeList>"
+        "</reservation>\n"
+    )
+
+
+class PrevioSimulator:
+    """Stav simulovaného hotelu a aiohttp handler searchReservations.
+
+    - stránkování podle <limit><offset>/<limit>, celkový počet v atributu
+      total kořene (report_total=False simuluje API bez celkového počtu)
+    - latency_ms (+ náhodný jitter) na každý požadavek
+    - error_rate: podíl požadavků s HTTP 500
+    - malformed_rate: podíl odpovědí s useknutým XML
+    - odpověď se posílá po kusech chunk_size, aby se uplatnilo průběžné parsování
+    """
+
+    def __init__(
+        self,
+        reservations=500,
+        seed=0,
+        login="bench",
+        password="bench",
+        hotel_id="1",
+        group_ratio=0.1,
+        max_group_rooms=12,
+        latency_ms=0,
+        jitter_ms=0,
+        error_rate=0.0,
+        malformed_rate=0.0,
+        report_total=True,
+        chunk_size=16 * 1024,
+    ):
+        self.login = login
+        self.password = password
+        self.hotel_id = str(hotel_id)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.report_total = report_total
+        self.chunk_size = chunk_size
+        self._rng = random.Random(seed + 1)
+        self.sub_reservations = generate_reservations(
+            reservations, seed, group_ratio, max_group_rooms
+        )
+        self._rendered = [render_sub_reservation(sub) for sub in self.sub_reservations]
+        self.stats = {"requests": 0, "errors": 0, "malformed": 0, "bytes": 0}
+
+    @property
+    def reservation_count(self):
+        return len({sub["resId"] for sub in self.sub_reservations})
+
+    def mutate(self, fraction):
+        """Simuluj práci recepce: změň status části rezervací.
+
+        Vrací počet změněných rezervací (skupina se mění celá).
+        """
+        res_ids = sorted({sub["resId"] for sub in self.sub_reservations})
+        changed = set(self._rng.sample(res_ids, round(len(res_ids) * fraction)))
+        for position, sub in enumerate(self.sub_reservations):
+            if sub["resId"] in changed:
+                sub["statusId"] = STATUS_TRANSITIONS.get(sub["statusId"], "2")
+                self._rendered[position] = render_sub_reservation(sub)
+        return len(changed)
+
+    def app(self):
+        """aiohttp aplikace s endpointem searchReservations."""
+        app = web.Application()
+        app.router.add_post(API_PATH, self.handle_search)
+        return app
+
+    def _page_body(self, offset, limit):
+        page = self._rendered[offset:offset + limit]
+        total = f' total="{len(self._rendered)}"' if self.report_total else ""
+        return f'<?xml version="1.0"?>\n<reservations{total}>\n{"".join(page)}</reservations>'
+
+    async def handle_search(self, request):
+        self.stats["requests"] += 1
+        delay = self.latency_ms + self._rng.uniform(0, self.jitter_ms)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+
+        try:
+            query = fromstring(await request.read())
+        except ParseError:
+            return web.Response(status=400, text="<error><message>Invalid XML</message></error>")
+        if (
+            query.findtext("login") != self.login
+            or query.findtext("password") != self.password
+            or query.findtext("hotId") != self.hotel_id
+        ):
+            return web.Response(
+                status=200,
+                content_type="application/xml",
+                text="<error><code>401</code><message>Unauthorized</message></error>",
+            )
+
+        if self._rng.random() < self.error_rate:
+            self.stats["errors"] += 1
+            return web.Response(status=500, text="Internal Server Error")
+
+        offset = int(query.findtext("limit/offset", "0"))
+        limit = int(query.findtext("limit/limit", "50"))
+        body = self._page_body(offset, limit).encode()
+        if self._rng.random() < self.malformed_rate:
+            self.stats["malformed"] += 1
+            body = body[: len(body) // 2]
+
+        response = web.StreamResponse(headers={"Content-Type": "application/xml"})
+        await response.prepare(request)
+        for start in range(0, len(body), self.chunk_size):
+            await response.write(body[start:start + self.chunk_size])
+        await response.write_eof()
+        self.stats["bytes"] += len(body)
+        return response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reservations", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--group-ratio", type=float, default=0.1)
+    parser.add_argument("--max-group-rooms", type=int, default=12)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--no-total", action="store_true", help="neuvádět celkový počet")
+    parser.add_argument("--login", default="bench")
+    parser.add_argument("--password", default="bench")
+    parser.add_argument("--hotel-id", default="1")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    args = parser.parse_args()
+
+    simulator = PrevioSimulator(
+        reservations=args.reservations,
+        seed=args.seed,
+        login=args.login,
+        password=args.password,
+        hotel_id=args.hotel_id,
+        group_ratio=args.group_ratio,
+        max_group_rooms=args.max_group_rooms,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        malformed_rate=args.malformed_rate,
+        report_total=not args.no_total,
+    )
+    print(
+        f"{simulator.reservation_count} rezervací "
+        f"({len(simulator.sub_reservations)} pokojů) na "
+        f"http://{args.host}:{args.port}{API_PATH}"
+    )
+    web.run_app(simulator.app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""Rozpočet zápisů stavů a zátěže recorderu pro obě integrace.
+
+Spustí cz_tv_program a previo_v4 v testovací instanci HA proti lokálním
+simulátorům a se simulovanými hodinami (freezegun) projde virtuálních
+24 hodin po minutách. Previo simulátor každou hodinu změní část
+rezervací, jako by pracovala recepce.
+
+Pro každou integraci změří:
+
+- zápisy stavů (state_changed) na entitu a hodinu - průměr a nejhorší
+  entitu-hodinu
+- velikost všech atributů na zápis (attribute_bytes) - tolik se při
+  každém zápisu serializuje pro sběrnici a websocket - průměr a maximum
+- velikost atributů na zápis tak, jak je serializuje recorder, bez
+  _unrecorded_attributes entit (recorded_attribute_bytes) - průměr a maximum
+- odhad dat pro recorder za den: řádek states na každý zápis plus
+  každá nová (dosud neviděná) sada atributů, které recorder deduplikuje
+  v tabulce state_attributes
+
+a porovná je s rozpočtem v tools/state_budget.json; při překročení
+skončí nenulovým návratovým kódem. Do rozpočtu patří i chyby zalogované
+integracemi (errors_logged), aby neprošel běh, ve kterém stahování ze
+simulátoru selhávalo.
+
+    python tools/state_budget.py
+    python tools/state_budget.py --budget tools/state_budget.json --report out.json
+
+Potřebuje pytest-homeassistant-custom-component (viz tools/requirements.txt);
+spouští se z kořene repozitáře.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import socket
+import sys
+import tempfile
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from aiohttp.test_utils import TestServer
+from freezegun import freeze_time
+from homeassistant import loader
+from homeassistant.components.recorder.const import ALL_DOMAIN_EXCLUDE_ATTRS
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.json import json_bytes
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+    async_test_home_assistant,
+)
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from custom_components.cz_tv_program import api as cz_api  # noqa: E402
+from custom_components.cz_tv_program.const import AVAILABLE_CHANNELS  # noqa: E402
+from custom_components.previo_v4 import client as previo_client  # noqa: E402
+from custom_components.previo_v4.const import CONF_ADAPTIVE_POLLING  # noqa: E402
+from cz_tv_simulator import API_PATH as CZ_API_PATH, CzTVSimulator  # noqa: E402
+from previo_simulator import API_PATH as PREVIO_API_PATH, PrevioSimulator  # noqa: E402
+
+DEFAULT_BUDGET = Path(__file__).resolve().parent / "state_budget.json"
+TIME_ZONE = "Europe/Prague"
+# Začátek simulovaného dne - zahrne noc, ranní check-outy i půlnoc
+DEFAULT_START = "2026-10-19 05:30:00"
+
+# Přibližná velikost řádku v tabulce states bez atributů (id, časy, odkazy)
+STATES_ROW_OVERHEAD = 120
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def state_attributes(state):
+    """Všechny atributy stavu serializované do JSON, včetně nezaznamenaných."""
+    return json_bytes(dict(state.attributes))
+
+
+def recorded_attributes(state):
+    """Atributy stavu serializované jako v recorderu (bez vyloučených).
+
+    Na rozdíl od recorderu se nad MAX_STATE_ATTRS_BYTES nenahradí "{}",
+    aby rozpočet viděl skutečnou velikost (recorder je pak neuloží vůbec).
+    """
+    unrecorded = state.state_info["unrecorded_attributes"] if state.state_info else ()
+    return json_bytes({
+        key: value
+        for key, value in state.attributes.items()
+        if key not in ALL_DOMAIN_EXCLUDE_ATTRS and key not in unrecorded
+    })
+
+
+class RecorderMeter:
+    """Počítá zápisy stavů a jejich velikost tak, jak je uvidí recorder."""
+
+    def __init__(self, hass):
+        self._hass = hass
+        self._registry = er.async_get(hass)
+        self.recording = False
+        self.hour = 0
+        self.writes = defaultdict(lambda: defaultdict(int))   # entity -> hodina -> zápisy
+        self.attribute_bytes = defaultdict(list)              # integrace -> bajty na zápis
+        self.recorded_attribute_bytes = defaultdict(list)     # integrace -> bajty pro recorder
+        self.recorder_bytes = defaultdict(int)                # integrace -> bajty
+        self._seen_attributes = set()
+        self._platforms = {}
+        self._unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, self._handle)
+
+    def platform(self, entity_id):
+        if entity_id not in self._platforms:
+            entry = self._registry.async_get(entity_id)
+            self._platforms[entity_id] = entry.platform if entry else None
+        return self._platforms[entity_id]
+
+    def _handle(self, event):
+        new_state = event.data.get("new_state")
+        if not self.recording or new_state is None:
+            return
+        platform = self.platform(new_state.entity_id)
+        if platform is None:
+            return
+        self.writes[new_state.entity_id][self.hour] += 1
+        self.attribute_bytes[platform].append(len(state_attributes(new_state)))
+        attributes = recorded_attributes(new_state)
+        self.recorded_attribute_bytes[platform].append(len(attributes))
+        row = STATES_ROW_OVERHEAD + len(new_state.entity_id) + len(new_state.state)
+        if attributes not in self._seen_attributes:
+            self._seen_attributes.add(attributes)
+            row += len(attributes)
+        self.recorder_bytes[platform] += row
+
+    def close(self):
+        self._unsub()
+
+    def report(self, hours, entity_ids):
+        """Souhrn po integracích."""
+        report = {}
+        for platform, entities in entity_ids.items():
+            entity_hours = [
+                self.writes[entity_id].get(hour, 0)
+                for entity_id in entities
+                for hour in range(hours)
+            ]
+            sizes = self.attribute_bytes.get(platform, [])
+            recorded_sizes = self.recorded_attribute_bytes.get(platform, [])
+            worst = max(
+                entities,
+                key=lambda entity_id: max(self.writes[entity_id].values(), default=0),
+                default=None,
+            )
+            report[platform] = {
+                "entities": len(entities),
+                "state_writes": sum(entity_hours),
+                "writes_per_entity_hour": round(sum(entity_hours) / len(entity_hours), 3)
+                if entity_hours else 0.0,
+                "max_writes_per_entity_hour": max(entity_hours, default=0),
+                "worst_entity": worst,
+                "avg_attribute_bytes": round(sum(sizes) / len(sizes)) if sizes else 0,
+                "max_attribute_bytes": max(sizes, default=0),
+                "avg_recorded_attribute_bytes": round(sum(recorded_sizes) / len(recorded_sizes))
+                if recorded_sizes else 0,
+                "max_recorded_attribute_bytes": max(recorded_sizes, default=0),
+                "recorder_bytes_per_day": round(self.recorder_bytes.get(platform, 0) * 24 / hours),
+            }
+        return report
+
+
+class ErrorCounter(logging.Handler):
+    """Počítá chyby zalogované integracemi během simulace.
+
+    Rozpočet s nimi počítá jako s metrikou, aby neprošel běh, ve kterém
+    stahování ze simulátoru selhávalo a entity se proto nezapisovaly.
+    """
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.counts = defaultdict(int)
+
+    def emit(self, record):
+        for platform in ("previo_v4", "cz_tv_program"):
+            if record.name.startswith(f"custom_components.{platform}"):
+                self.counts[platform] += 1
+
+
+async def async_simulate(args):
+    """Projdi simulovaný den; vrací report po integracích."""
+    previo = PrevioSimulator(reservations=args.reservations, seed=args.seed)
+    cz = CzTVSimulator(seed=args.seed)
+    previo_server = TestServer(previo.app())
+    cz_server = TestServer(cz.app())
+    await previo_server.start_server()
+    await cz_server.start_server()
+
+    original = previo_client.API_URL, cz_api.API_BASE_URL
+    previo_client.API_URL = str(previo_server.make_url(PREVIO_API_PATH))
+    cz_api.API_BASE_URL = str(cz_server.make_url(CZ_API_PATH))
+
+    try:
+        with tempfile.TemporaryDirectory() as config_dir, freeze_time(args.start) as frozen:
+            async with async_test_home_assistant() as hass:
+                hass.config.config_dir = config_dir
+                await hass.config.async_set_time_zone(TIME_ZONE)
+                # Simulovaný čas je lokální - přepočet na UTC pro freezegun
+                frozen.move_to(dt_util.as_utc(
+                    datetime.fromisoformat(args.start).replace(tzinfo=dt_util.get_default_time_zone())
+                ))
+                hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+                assert await async_setup_component(
+                    hass, "http", {"http": {"server_host": "127.0.0.1", "server_port": _free_port()}}
+                )
+                meter = RecorderMeter(hass)
+                errors = ErrorCounter()
+                logging.getLogger("custom_components").addHandler(errors)
+
+                entries = [
+                    MockConfigEntry(
+                        domain="previo_v4",
+                        title="Previo",
+                        data={
+                            "login": previo.login,
+                            "password": previo.password,
+                            "hotel_id": previo.hotel_id,
+                        },
+                        options={CONF_ADAPTIVE_POLLING: args.adaptive_polling},
+                    ),
+                    MockConfigEntry(
+                        domain="cz_tv_program",
+                        title="Czech TV Program",
+                        unique_id="cz_tv_program",
+                        data={"username": "test", "channels": list(AVAILABLE_CHANNELS)},
+                        options={"cz_tv_program_OPTIONS": list(AVAILABLE_CHANNELS)},
+                    ),
+                ]
+                for entry in entries:
+                    entry.add_to_hass(hass)
+                    if not await hass.config_entries.async_setup(entry.entry_id):
+                        raise RuntimeError(f"Nastavení {entry.domain} selhalo")
+                await hass.async_block_till_done(wait_background_tasks=True)
+
+                # Zápisy při startu (vytvoření entit) do rozpočtu nepatří
+                meter.recording = True
+                for minute in range(1, args.hours * 60 + 1):
+                    meter.hour = (minute - 1) // 60
+                    if minute % 60 == 0:
+                        previo.mutate(args.churn)
+                    frozen.tick(timedelta(minutes=1))
+                    async_fire_time_changed(hass)
+                    # Aktualizace koordinátorů běží jako background tasky;
+                    # bez čekání na ně by další posun času spustil timeouty
+                    # rozběhnutých HTTP požadavků (loop._scheduled)
+                    await hass.async_block_till_done(wait_background_tasks=True)
+                meter.recording = False
+
+                entity_ids = defaultdict(list)
+                for entity_id in hass.states.async_entity_ids():
+                    if (platform := meter.platform(entity_id)) in ("previo_v4", "cz_tv_program"):
+                        entity_ids[platform].append(entity_id)
+                report = meter.report(args.hours, entity_ids)
+                report["previo_v4"]["upstream_requests"] = previo.stats["requests"]
+                report["cz_tv_program"]["upstream_requests"] = cz.stats["requests"]
+                for platform in report:
+                    report[platform]["errors_logged"] = errors.counts[platform]
+                logging.getLogger("custom_components").removeHandler(errors)
+
+                meter.close()
+                for entry in entries:
+                    await hass.config_entries.async_unload(entry.entry_id)
+                return report
+    finally:
+        previo_client.API_URL, cz_api.API_BASE_URL = original
+        await previo_server.close()
+        await cz_server.close()
+
+
+def check_budget(report, budget):
+    """Překročení rozpočtu jako seznam řádků (prázdný = v rozpočtu)."""
+    violations = []
+    for platform, limits in budget.items():
+        measured = report.get(platform)
+        if not measured or not measured.get("entities"):
+            violations.append(f"{platform}: chybí v reportu nebo nemá entity")
+            continue
+        for metric, limit in limits.items():
+            if measured.get(metric, 0) > limit:
+                violations.append(f"{platform}: {metric} {measured[metric]} > {limit}")
+    return violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", default=str(DEFAULT_BUDGET))
+    parser.add_argument("--report", metavar="PATH", help="uložit report jako JSON")
+    parser.add_argument("--start", default=DEFAULT_START, help="lokální začátek simulace")
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--reservations", type=int, default=500)
+    parser.add_argument("--churn", type=float, default=0.02,
+                        help="podíl rezervací změněných každou hodinu")
+    parser.add_argument("--adaptive-polling", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    report = asyncio.run(async_simulate(args))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n")
+
+    violations = check_budget(report, json.loads(Path(args.budget).read_text()))
+    for line in violations:
+        print(f"MIMO ROZPOČET {line}")
+    if violations:
+        sys.exit(1)
+    print("V rozpočtu")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""Mikro-benchmark extrakce polí z XML (xmlfields) proti řetězcům find().
+
+Pro obě integrace porovná čas na záznam:
+
+- previo_v4: <reservation> z odpovědi searchReservations
+  (SUB_RESERVATION_FIELDS + parse_sub_reservation)
+- cz_tv_program: <porad> z odpovědi schedule.php; integrace používá
+  find(), FieldSpec (PROGRAM_FIELDS níže) se měří jen pro srovnání
+
+Referenční implementace jsou ručně psané řetězce find()/findtext()
+(u Previa z doby před xmlfields); před měřením se ověří, že obě cesty
+vrací stejné záznamy. Data dodají offline simulátory.
+
+    python tools/xml_extract_benchmark.py
+    python tools/xml_extract_benchmark.py --records 5000 --repeat 7
+
+Potřebuje pytest-homeassistant-custom-component (viz tools/requirements.txt);
+spouští se z kořene repozitáře.
+"""
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from defusedxml.ElementTree import fromstring
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from custom_components.cz_tv_program.api import TextPool  # noqa: E402
+from custom_components.previo_v4.model import Stay, intern, parse_api_datetime  # noqa: E402
+from custom_components.previo_v4.parser import (  # noqa: E402
+    SUB_RESERVATION_FIELDS,
+    parse_sub_reservation,
+)
+from custom_components.previo_v4.xmlfields import Field, FieldSpec  # noqa: E402
+from cz_tv_simulator import generate_day, render_day  # noqa: E402
+from previo_simulator import generate_reservations, render_sub_reservation  # noqa: E402
+
+
+def _flag(text):
+    return text == "1"
+
+
+# <porad> přes FieldSpec - jen pro srovnání, integrace zůstává u find()
+PROGRAM_FIELDS = FieldSpec({
+    "time": Field("cas", intern=True),
+    "date": Field("datum", intern=True),
+    "supertitle": Field("nazvy/nadtitul", default="", intern=True),
+    "title": Field("nazvy/nazev", default="Bez názvu", intern=True),
+    "episode_title": Field("nazvy/nazev_casti", default="", intern=True),
+    "episode": Field("dil", default="", intern=True),
+    "genre": Field("zanr", default="", intern=True),
+    "duration": Field("stopaz", default="", intern=True),
+    "description": Field("noticka", default="", intern=True),
+    "link": Field("linky/program", default=""),
+    "audio": Field("ikony/zvuk", default="", intern=True),
+    "subtitles": Field("ikony/skryte_titulky", _flag, default=False),
+    "live": Field("ikony/live", _flag, default=False),
+    "premiere": Field("ikony/premiera", _flag, default=False),
+    "aspect_ratio": Field("ikony/pomer", default="", intern=True),
+})
+
+
+def legacy_cz_program(porad, intern):
+    """_parse_xml integrace pro jeden <porad> (bez výchozího data)."""
+    program = {}
+    cas = porad.find("cas")
+    if cas is not None:
+        program["time"] = intern(cas.text)
+    datum = porad.find("datum")
+    if datum is not None:
+        program["date"] = intern(datum.text)
+    nazvy = porad.find("nazvy")
+    if nazvy is not None:
+        nadtitul = nazvy.find("nadtitul")
+        nazev = nazvy.find("nazev")
+        nazev_casti = nazvy.find("nazev_casti")
+        program["supertitle"] = intern(nadtitul.text) if nadtitul is not None else ""
+        program["title"] = intern(nazev.text) if nazev is not None else "Bez názvu"
+        program["episode_title"] = (
+            intern(nazev_casti.text) if nazev_casti is not None else ""
+        )
+    dil = porad.find("dil")
+    program["episode"] = intern(dil.text) if dil is not None and dil.text else ""
+    zanr = porad.find("zanr")
+    program["genre"] = intern(zanr.text) if zanr is not None else ""
+    stopaz = porad.find("stopaz")
+    program["duration"] = intern(stopaz.text) if stopaz is not None else ""
+    noticka = porad.find("noticka")
+    program["description"] = intern(noticka.text) if noticka is not None else ""
+    linky = porad.find("linky")
+    if linky is not None:
+        program_link = linky.find("program")
+        program["link"] = program_link.text if program_link is not None else ""
+    else:
+        program["link"] = ""
+    ikony = porad.find("ikony")
+    if ikony is not None:
+        program["audio"] = (
+            intern(ikony.find("zvuk").text) if ikony.find("zvuk") is not None else ""
+        )
+        program["subtitles"] = (
+            ikony.find("skryte_titulky").text == "1"
+            if ikony.find("skryte_titulky") is not None else False
+        )
+        program["live"] = (
+            ikony.find("live").text == "1" if ikony.find("live") is not None else False
+        )
+        program["premiere"] = (
+            ikony.find("premiera").text == "1"
+            if ikony.find("premiera") is not None else False
+        )
+        program["aspect_ratio"] = (
+            intern(ikony.find("pomer").text) if ikony.find("pomer") is not None else ""
+        )
+    return program
+
+
+def legacy_previo_sub_reservation(res):
+    """Pod-rezervace řetězci find()/findtext() jako v původním PrevioCoordinatoru."""
+    res_id = res.findtext("resId")
+    alfred_pins = ()
+    alfred_code_list = res.find("alfredCodeList")
+    if alfred_code_list is not None:
+        alfred_pins = tuple(
+            pin for pin in (code.findtext("pin") for code in alfred_code_list.findall("alfredCode"))
+            if pin
+        )
+    card_keys = ()
+    card_data_list = res.find("cardDataList")
+    if card_data_list is not None:
+        card_keys = tuple(
+            key for key in (card.findtext("key") for card in card_data_list.findall("cardData"))
+            if key
+        )
+    try:
+        price = float(res.findtext("price", "0") or 0)
+    except ValueError:
+        price = 0.0
+    object_elem = res.find("object")
+    guest_elem = res.find("guest")
+    checkin_str = res.findtext("term/from")
+    checkout_str = res.findtext("term/to")
+    checkin = parse_api_datetime(checkin_str)
+    checkout = parse_api_datetime(checkout_str)
+    stay = Stay(
+        room=intern(object_elem.findtext("name")) or None if object_elem is not None else None,
+        checkin=checkin,
+        checkout=checkout,
+        checkin_raw=checkin_str if checkin is None and checkin_str else None,
+        checkout_raw=checkout_str if checkout is None and checkout_str else None,
+        guest=guest_elem.findtext("name") or None if guest_elem is not None else None,
+        com_id=res.findtext("comId") or None,
+        price=price,
+        alfred_pins=alfred_pins,
+        card_keys=card_keys,
+    )
+    market_codes = ()
+    market_code_list = res.find("marketCodeList")
+    if market_code_list is not None:
+        market_codes = tuple(
+            intern(code.text) for code in market_code_list.findall("marketCode") if code.text
+        )
+    voucher = res.findtext("voucher") or "není"
+    status_id = intern(res.findtext("status/statusId", "0"))
+    return res_id, (voucher, status_id, stay, market_codes)
+
+
+def fieldspec_previo_sub_reservation(res):
+    fields = SUB_RESERVATION_FIELDS.extract(res, intern)
+    return fields.get("res_id"), parse_sub_reservation(fields)
+
+
+def cz_elements(records, seed):
+    elements = []
+    day = date(2026, 1, 1)
+    while len(elements) < records:
+        root = fromstring(render_day(generate_day("ct1", day, seed)))
+        elements.extend(root.findall("porad"))
+        day += timedelta(days=1)
+    return elements[:records]
+
+
+def previo_elements(records, seed):
+    subs = generate_reservations(records, seed=seed)[:records]
+    body = "<reservations>" + "".join(render_sub_reservation(sub) for sub in subs) + "</reservations>"
+    return fromstring(body).findall("reservation")
+
+
+def _empty_as_blank(program):
+    # Prázdný element dává v xmlfields "" (jako findtext), find().text dával None
+    return {key: "" if value is None else value for key, value in program.items()}
+
+
+def measure(name, elements, legacy, fieldspec, repeat, normalize=None):
+    """Ověř shodu výsledků a vypiš µs na záznam pro obě cesty."""
+    normalize = normalize or (lambda record: record)
+    mismatches = sum(
+        normalize(legacy(element)) != fieldspec(element) for element in elements
+    )
+    if mismatches:
+        raise SystemExit(f"{name}: {mismatches} záznamů se liší od referenční implementace")
+
+    # Střídavě, aby obě cesty měřil stejně zatížený stroj; bere se nejlepší běh
+    best = {legacy: float("inf"), fieldspec: float("inf")}
+    for _ in range(repeat):
+        for function in best:
+            started = time.perf_counter()
+            for element in elements:
+                function(element)
+            best[function] = min(best[function], time.perf_counter() - started)
+    legacy_us, fieldspec_us = (best[function] / len(elements) * 1e6 for function in best)
+    print(f"{name:<16}{len(elements):>10}{legacy_us:>14.2f}{fieldspec_us:>14.2f}"
+          f"{legacy_us / fieldspec_us:>10.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'parser':<16}{'records':>10}{'find() µs':>14}{'FieldSpec µs':>14}{'speedup':>11}")
+    measure(
+        "previo_v4",
+        previo_elements(args.records, args.seed),
+        legacy_previo_sub_reservation,
+        fieldspec_previo_sub_reservation,
+        args.repeat,
+    )
+    # Jeden pool jako v jedné aktualizaci rozvrhu
+    pool = TextPool()
+    measure(
+        "cz_tv_program",
+        cz_elements(args.records, args.seed),
+        lambda porad: legacy_cz_program(porad, pool.intern),
+        lambda porad: PROGRAM_FIELDS.extract(porad, pool.intern),
+        args.repeat,
+        normalize=_empty_as_blank,
+    )
+
+
+if __name__ == "__main__":
+    main()
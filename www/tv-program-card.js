@@ -1,3 +1,105 @@
+// Počet řádků vykreslených navíc nad a pod viditelnou částí seznamu
+const VIRTUAL_OVERSCAN = 5;
+
+// Odstup opakování dotazu na mřížku po chybě (zdvojuje se až po maximum)
+const GRID_RETRY_MS = 30 * 1000;
+const GRID_RETRY_MAX_MS = 10 * 60 * 1000;
+
+// ---------------------------------------------------------------- //
+// Perzistentní cache rozvrhu v prohlížeči (IndexedDB)               //
+// ---------------------------------------------------------------- //
+const EPG_DB_NAME = 'tv-program-card';
+const EPG_DB_VERSION = 1;
+const EPG_STORE = 'schedules';
+// Kanál, který žádná karta dva týdny nenačetla, se z cache smaže
+const EPG_MAX_AGE_MS = 14 * 24 * 60 * 60 * 1000;
+// Revalidace proti integraci nejvýš jednou za minutu
+const EPG_REVALIDATE_MS = 60 * 1000;
+
+let epgDbPromise = null;
+
+function epgRequest(request) {
+  return new Promise((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+}
+
+function epgTransactionDone(tx) {
+  return new Promise((resolve, reject) => {
+    tx.oncomplete = () => resolve();
+    tx.onerror = tx.onabort = () => reject(tx.error);
+  });
+}
+
+// Nejstarší den, který má smysl držet - včera kvůli pořadům přes půlnoc
+function epgOldestDay() {
+  const day = new Date();
+  day.setDate(day.getDate() - 1);
+  const pad = value => String(value).padStart(2, '0');
+  return `${day.getFullYear()}-${pad(day.getMonth() + 1)}-${pad(day.getDate())}`;
+}
+
+function epgFreshDays(days) {
+  const oldest = epgOldestDay();
+  return Object.fromEntries(
+    Object.entries(days || {}).filter(([date]) => date >= oldest),
+  );
+}
+
+function epgDb() {
+  if (!epgDbPromise) {
+    epgDbPromise = (window.indexedDB
+      ? epgRequest(Object.assign(indexedDB.open(EPG_DB_NAME, EPG_DB_VERSION), {
+        onupgradeneeded: event => {
+          const store = event.target.result.createObjectStore(EPG_STORE, { keyPath: 'channel' });
+          store.createIndex('entity', 'entity');
+        },
+      }))
+      : Promise.reject(new Error('IndexedDB není k dispozici'))
+    ).then(db => {
+      epgPrune(db).catch(err => console.warn('Úklid cache TV programu selhal:', err));
+      return db;
+    });
+  }
+  return epgDbPromise;
+}
+
+// Smaže dávno nepoužité kanály a ze zbylých záznamů uplynulé dny
+async function epgPrune(db) {
+  const tx = db.transaction(EPG_STORE, 'readwrite');
+  const cursorRequest = tx.objectStore(EPG_STORE).openCursor();
+  cursorRequest.onsuccess = () => {
+    const cursor = cursorRequest.result;
+    if (!cursor) return;
+    const record = cursor.value;
+    if (Date.now() - (record.saved || 0) > EPG_MAX_AGE_MS) {
+      cursor.delete();
+    } else {
+      const days = epgFreshDays(record.days);
+      if (Object.keys(days).length !== Object.keys(record.days || {}).length) {
+        cursor.update({ ...record, days });
+      }
+    }
+    cursor.continue();
+  };
+  await epgTransactionDone(tx);
+}
+
+async function epgLoad(channel, entity) {
+  const db = await epgDb();
+  const store = db.transaction(EPG_STORE).objectStore(EPG_STORE);
+  const record = await epgRequest(channel ? store.get(channel) : store.index('entity').get(entity));
+  return record ? { ...record, days: epgFreshDays(record.days) } : null;
+}
+
+async function epgSave(record) {
+  const db = await epgDb();
+  const tx = db.transaction(EPG_STORE, 'readwrite');
+  tx.objectStore(EPG_STORE).put({ ...record, saved: Date.now() });
+  await epgTransactionDone(tx);
+}
+
 class TvProgramCard extends HTMLElement {
   constructor() {
     super();
@@ -8,36 +110,129 @@ class TvProgramCard extends HTMLElement {
   }
 
   setConfig(config) {
-    if (!config.entity) {
+    const gridMode = config.mode === 'grid';
+    if (!gridMode && !config.entity) {
       throw new Error('Prosím, definujte entitu');
     }
 
     this._config = {
       entity: config.entity,
+      // ID kanálu (ct1, ...) pro cache; jinak se vezme z atributu channel_id
+      channel: config.channel || null,
+      mode: gridMode ? 'grid' : 'list',
       title: config.title || 'TV Program',
       show_genre: config.show_genre !== false,
       show_duration: config.show_duration !== false,
       show_description: config.show_description !== false,
       max_programs: config.max_programs || 50,
+      // Výška seznamu v px; delší seznam se virtualizuje (0 = bez omezení)
+      list_height: config.list_height ?? 500,
+      // Mřížka více kanálů (mode: grid)
+      channels: config.channels || null,
+      hours: config.hours || 6,
+      slot_minutes: config.slot_minutes || 30,
     };
 
+    if (gridMode) {
+      this._grid = null;
+      this._gridCells = new Map();
+      this._gridContainer = null;
+      this._gridStarted = false;
+      this._gridFailures = 0;
+      this.shadowRoot.innerHTML = '';
+      this._startGrid();
+      return;
+    }
+
     // Nastaví počet dní z konfigurace, pokud existuje. Používá privátní proměnnou.
     this._days = config.days || 3;
+    this._listViewport = null;
+    this._schedule = null;
+    this._revalidatedAt = 0;
 
     this.render();
     this._scheduleNextRefresh();
+    this._loadCachedSchedule();
   }
 
   set hass(hass) {
     this._hass = hass;
-    // Optimalizované renderování: rendrujeme jen když se změní data entity
-    const oldState = this._lastState;
+    if (this._config.mode === 'grid') {
+      // Mřížka se načítá jedním dotazem, nezávisle na změnách entit;
+      // další dotazy (i opakování po chybě) plánuje _scheduleGridRefresh
+      this._startGrid();
+      return;
+    }
+    // Optimalizované renderování: HA vytváří nový objekt stavu jen při
+    // změně, stačí tedy porovnat reference (bez JSON.stringify atributů)
     const newState = hass.states[this._config.entity];
 
-    if (!oldState || !newState || oldState.state !== newState.state || JSON.stringify(oldState.attributes) !== JSON.stringify(newState.attributes)) {
+    if (!this._lastState || this._lastState !== newState) {
       this._lastState = newState;
       this.render();
     }
+    this._revalidateSchedule();
+  }
+
+  // Rozvrh z IndexedDB se vykreslí hned, ještě před stavem z HA
+  async _loadCachedSchedule() {
+    const entityId = this._config.entity;
+    try {
+      const record = await epgLoad(this._config.channel, entityId);
+      // Mezitím mohla přijít čerstvá data nebo jiná konfigurace
+      if (record && !this._schedule && this._config.entity === entityId) {
+        this._setSchedule(record);
+      }
+    } catch (err) {
+      // Bez IndexedDB (např. anonymní okno) zůstávají atributy entity
+    }
+  }
+
+  // Na pozadí se zeptá integrace, jestli má novější verzi rozvrhu kanálu
+  async _revalidateSchedule() {
+    const entity = this._hass?.states[this._config.entity];
+    const channel = this._config.channel || entity?.attributes.channel_id;
+    if (!channel || this._revalidating) return;
+    if (Date.now() - this._revalidatedAt < EPG_REVALIDATE_MS) return;
+
+    this._revalidating = true;
+    const msg = { type: 'cz_tv_program/schedule', channel };
+    if (this._schedule?.channel === channel) msg.version = this._schedule.version;
+    try {
+      const result = await this._hass.callWS(msg);
+      if (!result.not_modified) {
+        const record = {
+          channel,
+          entity: this._config.entity,
+          name: result.name,
+          version: result.version,
+          days: epgFreshDays(result.days),
+        };
+        this._setSchedule(record);
+        await epgSave(record);
+      }
+    } catch (err) {
+      // Program ještě není načtený, starší integrace nebo chyba IndexedDB -
+      // karta použije atributy entity
+      if (err?.code !== 'not_available') console.debug('Revalidace TV programu:', err);
+    } finally {
+      this._revalidatedAt = Date.now();
+      this._revalidating = false;
+    }
+  }
+
+  _setSchedule(record) {
+    this._schedule = { ...record, programs: Object.values(record.days).flat() };
+    this.render();
+  }
+
+  // Pořady z cache rozvrhu, pokud patří ke kanálu entity, jinak z atributů
+  _programSource(entity) {
+    const channel = this._config.channel || entity?.attributes.channel_id;
+    if (this._schedule && (!channel || this._schedule.channel === channel)) {
+      return this._schedule.programs;
+    }
+    return entity?.attributes.all_programs || null;
   }
 
   // Přidání metody pro parsování data/času pro správné porovnávání
@@ -57,10 +252,15 @@ class TvProgramCard extends HTMLElement {
 
   connectedCallback() {
     this._isConnected = true;
+    if (this._config.mode === 'grid') {
+      if (this._gridStarted) this._scheduleGridRefresh();
+      else this._startGrid();
+      return;
+    }
     this._scheduleNextRefresh();
   }
 
-  disconectedCallback() {
+  disconnectedCallback() {
     this._isConnected = false;
     this._clerScheduledRefresh();
   }
@@ -72,13 +272,22 @@ class TvProgramCard extends HTMLElement {
     }
   }
 
+  // Seřazené pořady se počítají jen při změně dat (nové pole all_programs)
   _getSortedPrograms(allPrograms) {
-    return (allPrograms || [])
+    if (this._sortedSource === allPrograms && this._sortedPrograms) {
+      return this._sortedPrograms;
+    }
+    this._sortedSource = allPrograms;
+    this._sortedPrograms = (allPrograms || [])
       .map(p => ({
-        ...p, datetime: this._parseProgramDatetime(p)
+        ...p,
+        datetime: this._parseProgramDatetime(p),
+        _sig: [p.title, p.supertitle, p.episode_title, p.episode, p.genre,
+          p.duration, p.description, p.live, p.premiere].join('\u001f'),
       }))
       .filter(p => p.datetime instanceof Date && !isNaN(p.datetime))
       .sort((a, b) => a.datetime - b.datetime);
+    return this._sortedPrograms;
   }
 
   _findCurrentProgram(programs, now = new Date()) {
@@ -102,8 +311,7 @@ class TvProgramCard extends HTMLElement {
 
   _getNextProgramStartTs() {
     const entity = this._hass?.states?.[this._config?.entity];
-    if (!entity) return null;
-    const programs = this._getSortedPrograms(entity.attributes.all_programs || []);
+    const programs = this._getSortedPrograms(this._programSource(entity) || []);
     const now = new Date();
     const next = programs.find(p => p.datetime > now);
     return next ? next.datetime.getTime() : null;
@@ -111,6 +319,7 @@ class TvProgramCard extends HTMLElement {
 
   _scheduleNextRefresh() {
     this._clerScheduledRefresh();
+    if (this._config.mode === 'grid') return;
     if (!this._isConnected || !this._hass || !this._config?.entity) return;
 
     const now = new Date();
@@ -128,24 +337,30 @@ class TvProgramCard extends HTMLElement {
   }
 
   render() {
-    if (!this._hass || !this._config.entity) return;
+    if (this._config.mode === 'grid') return;
+    if (!this._config.entity) return;
 
-    const entity = this._hass.states[this._config.entity];
-    if (!entity) {
+    const entity = this._hass?.states[this._config.entity];
+    if (this._hass && !entity) {
+      this._listViewport = null;
       this.shadowRoot.innerHTML = `
         <ha-card>
           <div class="card-content">
-            <p>Entita "${this._config.entity}" nebyla nalezena</p>
+            <p>Entita "${this.escapeHtml(this._config.entity)}" nebyla nalezena</p>
           </div>
         </ha-card>
       `;
       return;
     }
 
-    const allPrograms = entity.attributes.all_programs || [];
-    const channelName = entity.attributes.channel || 'TV';
+    // Před prvním stavem z HA lze vykreslit jen z cache
+    const source = this._programSource(entity) || (entity ? [] : null);
+    if (!source) return;
 
-    const programs = this._getSortedPrograms(allPrograms);
+    this._ensureListSkeleton();
+
+    const channelName = entity?.attributes.channel || this._schedule?.name || 'TV';
+    const programs = this._getSortedPrograms(source);
 
     // 1. Získej aktuální čas
     const now = new Date();
@@ -160,7 +375,28 @@ class TvProgramCard extends HTMLElement {
     // 3. Filtruj programy
     const filteredPrograms = programs
       .filter(p => p.datetime >= now && p.datetime <= endDate)
-      .slice(0, this._config.max_programs)
+      .slice(0, this._config.max_programs);
+
+    this._setText(this._headerEl, `${this._config.title} - ${channelName}`);
+    this._patchCurrentProgram(currentProgram);
+    this._dayButtons.forEach((button, days) => {
+      button.classList.toggle('active', this._days === days);
+    });
+
+    this._rows = this._buildRows(filteredPrograms);
+    this._emptyEl.hidden = this._rows.length > 0;
+    this._setText(
+      this._emptyEl,
+      `Žádné nadcházející pořady v následujících ${this._days} dnech.`,
+    );
+    this._renderVisibleRows();
+
+    this._scheduleNextRefresh();
+  }
+
+  // Kostra karty se vytvoří jednou, dál se jen patchují změněné části
+  _ensureListSkeleton() {
+    if (this._listViewport) return;
 
     this.shadowRoot.innerHTML = `
       <style>
@@ -216,6 +452,7 @@ class TvProgramCard extends HTMLElement {
         }
         .program-list {
           margin-top: 16px;
+          overflow-y: auto;
         }
         .program-item {
           padding: 12px;
@@ -223,9 +460,6 @@ class TvProgramCard extends HTMLElement {
           display: flex;
           gap: 12px;
         }
-        .program-item:last-child {
-            border-bottom: none;
-        }
         .program-item:hover {
           background: var(--secondary-background-color, #f0f0f0);
         }
@@ -279,87 +513,406 @@ class TvProgramCard extends HTMLElement {
       </style>
 
       <ha-card>
-        <div class="card-header">
-          ${this._config.title} - ${this.escapeHtml(channelName)}
-        </div>
-
-        ${currentProgram?.title ? `
-          <div class="current-program">
-            <div class="title">▶ Nyní: ${this.escapeHtml(currentProgram.title)}</div>
-            <div class="info">
-              ${currentProgram.time}
-              ${this._config.show_genre && currentProgram.genre ? `• ${this.escapeHtml(currentProgram.genre)}` : ''}
-              ${this._config.show_duration && currentProgram.duration ? `• ${currentProgram.duration.replace(/^(?!0:)(0+)/, "")}` : ''}
-            </div>
-          </div>
-        ` : ''}
+        <div class="card-header"></div>
 
-        <div class="days-selector">
-          ${[1, 2, 3, 5, 7].map(days => `
-            <button class="day-button ${this._days === days ? 'active' : ''}"
-                    onclick="this.getRootNode().host.updateDays(${days})">
-              ${days} ${days === 1 ? 'den' : days < 5 ? 'dny' : 'dní'}
-            </button>
-          `).join('')}
+        <div class="current-program" hidden>
+          <div class="title"></div>
+          <div class="info"></div>
         </div>
 
+        <div class="days-selector"></div>
+
         <div class="program-list">
-          ${filteredPrograms.length > 0 ? this.renderPrograms(filteredPrograms) : `
-            <div class="no-programs">Žádné nadcházející pořady v následujících ${this._days} dnech.</div>
-          `}
+          <div class="spacer-top"></div>
+          <div class="spacer-bottom"></div>
         </div>
+        <div class="no-programs" hidden></div>
       </ha-card>
     `;
 
-    this._scheduleNextRefresh();
+    const root = this.shadowRoot;
+    this._headerEl = root.querySelector('.card-header');
+    this._currentEl = root.querySelector('.current-program');
+    this._emptyEl = root.querySelector('.no-programs');
+    this._listViewport = root.querySelector('.program-list');
+    this._spacerTop = root.querySelector('.spacer-top');
+    this._spacerBottom = root.querySelector('.spacer-bottom');
+    this._rowEls = new Map();
+    this._rowHeights = new Map();
+
+    if (this._config.list_height) {
+      this._listViewport.style.maxHeight = `${this._config.list_height}px`;
+      this._listViewport.addEventListener('scroll', () => {
+        if (this._scrollFrame) return;
+        this._scrollFrame = requestAnimationFrame(() => {
+          this._scrollFrame = null;
+          this._renderVisibleRows();
+        });
+      }, { passive: true });
+    }
+
+    const selector = root.querySelector('.days-selector');
+    this._dayButtons = new Map();
+    [1, 2, 3, 5, 7].forEach(days => {
+      const button = document.createElement('button');
+      button.className = 'day-button';
+      button.textContent = `${days} ${days === 1 ? 'den' : days < 5 ? 'dny' : 'dní'}`;
+      button.addEventListener('click', () => this.updateDays(days));
+      selector.appendChild(button);
+      this._dayButtons.set(days, button);
+    });
+  }
+
+  _patchCurrentProgram(currentProgram) {
+    this._currentEl.hidden = !currentProgram?.title;
+    if (!currentProgram?.title) return;
+
+    const info = [currentProgram.time];
+    if (this._config.show_genre && currentProgram.genre) info.push(currentProgram.genre);
+    if (this._config.show_duration && currentProgram.duration) {
+      info.push(currentProgram.duration.replace(/^(?!0:)(0+)/, ""));
+    }
+    this._setText(this._currentEl.firstElementChild, `▶ Nyní: ${currentProgram.title}`);
+    this._setText(this._currentEl.lastElementChild, info.join(' • '));
   }
 
-  renderPrograms(programs) {
-    let html = '';
+  // Ploché pole řádků (oddělovače dnů + pořady) s klíčem a podpisem obsahu
+  _buildRows(programs) {
+    const rows = [];
     let lastDate = '';
 
     programs.forEach(program => {
-      // Add date separator if date changes
       if (program.date && program.date !== lastDate) {
-        // Použijeme program.datetime pro správné formátování dne v týdnu
-        const date = program.datetime || this._parseProgramDatetime(program);
-        const dateStr = date ? this.formatDate(date) : program.date;
-        html += `<div class="date-separator">${dateStr}</div>`;
+        const dateStr = program.datetime ? this.formatDate(program.datetime) : program.date;
+        rows.push({ key: `date:${program.date}`, sig: dateStr, type: 'date', text: dateStr });
         lastDate = program.date;
       }
+      rows.push({
+        key: `${program.date}|${program.time}`,
+        sig: program._sig,
+        type: 'program',
+        program,
+      });
+    });
 
-      html += `
-        <div class="program-item">
-          <div class="program-time">${program.time || ''}</div>
-          <div class="program-details">
-            <div class="program-title">
-              ${program.supertitle ? `${this.escapeHtml(program.supertitle)}: ` : ''}
-              ${this.escapeHtml(program.title || 'Neznámý pořad')}
-              ${program.episode_title ? ` - ${this.escapeHtml(program.episode_title)}` : ''}
-            </div>
-            ${program.live || program.premiere || program.episode ? `
-              <div>
-                ${program.live ? '<span class="program-badge">ŽIVĚ</span>' : ''}
-                ${program.premiere ? '<span class="program-badge">PREMIÉRA</span>' : ''}
-                ${program.episode ? `<span class="program-badge">${this.escapeHtml(program.episode)}</span>` : ''}
-              </div>
-            ` : ''}
-            ${this._config.show_genre || this._config.show_duration ? `
-              <div class="program-info">
-                ${this._config.show_genre && program.genre ? this.escapeHtml(program.genre) : ''}
-                ${this._config.show_genre && program.genre && this._config.show_duration && program.duration ? ' • ' : ''}
-                ${this._config.show_duration && program.duration ? program.duration.replace(/^(?!0:)(0+)/, "") : ''}
-              </div>
-            ` : ''}
-            ${this._config.show_description && program.description ? `
-              <div class="program-description">${this.escapeHtml(program.description)}</div>
-            ` : ''}
-          </div>
+    return rows;
+  }
+
+  _estimateRowHeight(row) {
+    return this._rowHeights.get(row.key) || (row.type === 'date' ? 48 : 90);
+  }
+
+  // Vykreslí jen řádky ve viditelné části seznamu (+ rezerva), ostatní
+  // nahradí prázdné mezery se spočtenou výškou
+  _renderVisibleRows() {
+    const rows = this._rows || [];
+    const viewport = this._listViewport;
+    if (!viewport) return;
+
+    let first = 0;
+    let last = rows.length - 1;
+    const offsets = new Array(rows.length + 1);
+    offsets[0] = 0;
+    for (let i = 0; i < rows.length; i++) {
+      offsets[i + 1] = offsets[i] + this._estimateRowHeight(rows[i]);
+    }
+
+    if (this._config.list_height) {
+      const top = viewport.scrollTop;
+      const bottom = top + this._config.list_height;
+      while (first < rows.length - 1 && offsets[first + 1] <= top) first++;
+      last = first;
+      while (last < rows.length - 1 && offsets[last + 1] < bottom) last++;
+      first = Math.max(0, first - VIRTUAL_OVERSCAN);
+      last = Math.min(rows.length - 1, last + VIRTUAL_OVERSCAN);
+    }
+
+    this._spacerTop.style.height = `${offsets[first] || 0}px`;
+    this._spacerBottom.style.height = `${offsets[rows.length] - (offsets[last + 1] || 0)}px`;
+
+    const visible = new Set();
+    let cursor = this._spacerTop;
+    for (let i = first; i <= last && i < rows.length; i++) {
+      const row = rows[i];
+      let el = this._rowEls.get(row.key);
+      if (!el) {
+        el = document.createElement('div');
+        this._rowEls.set(row.key, el);
+      }
+      if (el._sig !== row.sig) {
+        el._sig = row.sig;
+        if (row.type === 'date') {
+          el.className = 'date-separator';
+          el.textContent = row.text;
+        } else {
+          el.className = 'program-item';
+          el.innerHTML = this.renderProgram(row.program);
+        }
+      }
+      if (cursor.nextSibling !== el) {
+        viewport.insertBefore(el, cursor.nextSibling);
+      }
+      cursor = el;
+      visible.add(row.key);
+    }
+
+    for (const [key, el] of this._rowEls) {
+      if (!visible.has(key)) {
+        el.remove();
+        this._rowEls.delete(key);
+      }
+    }
+
+    // Změřit skutečné výšky pro přesnější virtualizaci
+    if (this._config.list_height) {
+      let changed = false;
+      for (const key of visible) {
+        const height = this._rowEls.get(key).offsetHeight;
+        if (height && this._rowHeights.get(key) !== height) {
+          this._rowHeights.set(key, height);
+          changed = true;
+        }
+      }
+      if (changed && !this._remeasured) {
+        this._remeasured = true;
+        this._renderVisibleRows();
+        this._remeasured = false;
+      }
+    }
+  }
+
+  renderProgram(program) {
+    return `
+      <div class="program-time">${program.time || ''}</div>
+      <div class="program-details">
+        <div class="program-title">
+          ${program.supertitle ? `${this.escapeHtml(program.supertitle)}: ` : ''}
+          ${this.escapeHtml(program.title || 'Neznámý pořad')}
+          ${program.episode_title ? ` - ${this.escapeHtml(program.episode_title)}` : ''}
         </div>
-      `;
+        ${program.live || program.premiere || program.episode ? `
+          <div>
+            ${program.live ? '<span class="program-badge">ŽIVĚ</span>' : ''}
+            ${program.premiere ? '<span class="program-badge">PREMIÉRA</span>' : ''}
+            ${program.episode ? `<span class="program-badge">${this.escapeHtml(program.episode)}</span>` : ''}
+          </div>
+        ` : ''}
+        ${this._config.show_genre || this._config.show_duration ? `
+          <div class="program-info">
+            ${this._config.show_genre && program.genre ? this.escapeHtml(program.genre) : ''}
+            ${this._config.show_genre && program.genre && this._config.show_duration && program.duration ? ' • ' : ''}
+            ${this._config.show_duration && program.duration ? program.duration.replace(/^(?!0:)(0+)/, "") : ''}
+          </div>
+        ` : ''}
+        ${this._config.show_description && program.description ? `
+          <div class="program-description">${this.escapeHtml(program.description)}</div>
+        ` : ''}
+      </div>
+    `;
+  }
+
+  _setText(el, text) {
+    if (el.textContent !== text) el.textContent = text;
+  }
+
+  // ---------------------------------------------------------------- //
+  // Mřížka více kanálů - jeden dotaz cz_tv_program/grid místo N entit  //
+  // ---------------------------------------------------------------- //
+  // První načtení mřížky jen jednou, jakmile je k dispozici hass
+  _startGrid() {
+    if (this._gridStarted || !this._hass) return;
+    this._gridStarted = true;
+    this._loadGrid();
+  }
+
+  async _loadGrid() {
+    if (this._gridLoading || !this._hass) return;
+    this._gridLoading = true;
+
+    const msg = {
+      type: 'cz_tv_program/grid',
+      hours: this._config.hours,
+      slot_minutes: this._config.slot_minutes,
+    };
+    if (this._config.channels) msg.channels = this._config.channels;
+    if (this._grid?.etag) msg.etag = this._grid.etag;
+
+    try {
+      const result = await this._hass.callWS(msg);
+      if (!result.not_modified) {
+        this._grid = result;
+        this._patchGrid(result);
+      }
+      this._updateGridNow();
+      this._gridFailures = 0;
+    } catch (err) {
+      if (!this._gridFailures) console.error('Chyba při načítání mřížky TV programu:', err);
+      this._gridFailures += 1;
+    } finally {
+      this._gridLoading = false;
+      this._scheduleGridRefresh();
+    }
+  }
+
+  _scheduleGridRefresh() {
+    this._clerScheduledRefresh();
+    if (!this._isConnected || !this._hass) return;
+
+    // Po chybě opakování s exponenciálním odstupem (30 s až 10 minut)
+    if (this._gridFailures) {
+      const delay = Math.min(
+        GRID_RETRY_MS * 2 ** (this._gridFailures - 1), GRID_RETRY_MAX_MS);
+      this._refreshTimeout = setTimeout(() => this._loadGrid(), delay);
+      return;
+    }
+
+    // Další dotaz na hranici slotu (posun okna), nejpozději za 5 minut.
+    // Nezměněná data vrátí jen ETag.
+    const slotMs = this._config.slot_minutes * 60 * 1000;
+    const now = Date.now();
+    const msToNextSlot = slotMs - (now % slotMs);
+    const delay = Math.max(1000, Math.min(msToNextSlot, 5 * 60 * 1000));
+    this._refreshTimeout = setTimeout(() => this._loadGrid(), delay);
+  }
+
+  _ensureGridSkeleton() {
+    if (this._gridContainer) return;
+    this.shadowRoot.innerHTML = `
+      <style>
+        ha-card {
+          padding: 16px;
+        }
+        .card-header {
+          font-size: 24px;
+          font-weight: 500;
+          padding-bottom: 16px;
+        }
+        .grid-scroll {
+          overflow-x: auto;
+        }
+        .grid {
+          display: grid;
+          gap: 2px;
+          font-size: 13px;
+        }
+        .slot-label {
+          color: var(--secondary-text-color);
+          padding: 4px;
+          border-bottom: 1px solid var(--divider-color);
+        }
+        .channel-label {
+          font-weight: 500;
+          padding: 6px 4px;
+          position: sticky;
+          left: 0;
+          background: var(--card-background-color);
+        }
+        .cell {
+          padding: 6px;
+          border-radius: 4px;
+          overflow: hidden;
+          white-space: nowrap;
+          text-overflow: ellipsis;
+          background: var(--secondary-background-color, #f0f0f0);
+        }
+        .cell.now {
+          background: var(--primary-color, #03a9f4);
+          color: var(--text-primary-color, #fff);
+        }
+        .cell .genre {
+          display: block;
+          font-size: 11px;
+          opacity: 0.8;
+        }
+        .cell.live .title::before {
+          content: '● ';
+          color: var(--error-color, #db4437);
+        }
+      </style>
+      <ha-card>
+        <div class="card-header">${this.escapeHtml(this._config.title)}</div>
+        <div class="grid-scroll"><div class="grid"></div></div>
+      </ha-card>
+    `;
+    this._gridContainer = this.shadowRoot.querySelector('.grid');
+  }
+
+  _patchGrid(grid) {
+    this._ensureGridSkeleton();
+    const container = this._gridContainer;
+    container.style.gridTemplateColumns =
+      `80px repeat(${grid.slots}, minmax(${this._config.slot_minutes * 3}px, 1fr))`;
+
+    const seen = new Set();
+    const upsert = (key, className, build) => {
+      let el = this._gridCells.get(key);
+      if (!el) {
+        el = document.createElement('div');
+        this._gridCells.set(key, el);
+        container.appendChild(el);
+      }
+      el.className = className;
+      build(el);
+      seen.add(key);
+      return el;
+    };
+    const setText = (el, text) => {
+      if (el.textContent !== text) el.textContent = text;
+    };
+
+    // Záhlaví s časy slotů
+    for (let slot = 0; slot < grid.slots; slot++) {
+      const ts = new Date((grid.start + slot * grid.slot_minutes * 60) * 1000);
+      upsert(`slot:${slot}`, 'slot-label', el => {
+        el.style.gridRow = '1';
+        el.style.gridColumn = `${slot + 2}`;
+        setText(el, ts.toTimeString().slice(0, 5));
+      });
+    }
+
+    grid.channels.forEach((channel, row) => {
+      upsert(`channel:${channel.id}`, 'channel-label', el => {
+        el.style.gridRow = `${row + 2}`;
+        el.style.gridColumn = '1';
+        setText(el, channel.name);
+      });
+
+      channel.start.forEach((start, i) => {
+        const flags = channel.flags[i];
+        const className = `cell${flags & 1 ? ' live' : ''}${flags & 2 ? ' premiere' : ''}`;
+        upsert(`${channel.id}:${start}`, className, el => {
+          el.dataset.start = start;
+          el.dataset.end = channel.end[i];
+          el.style.gridRow = `${row + 2}`;
+          el.style.gridColumn = `${channel.slot[i] + 2} / span ${channel.span[i]}`;
+          const title = grid.strings[channel.title[i]];
+          const genre = grid.strings[channel.genre[i]];
+          if (el.dataset.title !== title || el.dataset.genre !== genre) {
+            el.dataset.title = title;
+            el.dataset.genre = genre;
+            el.title = genre ? `${title} (${genre})` : title;
+            el.innerHTML = `<span class="title">${this.escapeHtml(title)}</span>` +
+              (genre ? `<span class="genre">${this.escapeHtml(genre)}</span>` : '');
+          }
+        });
+      });
     });
 
-    return html;
+    for (const [key, el] of this._gridCells) {
+      if (!seen.has(key)) {
+        el.remove();
+        this._gridCells.delete(key);
+      }
+    }
+  }
+
+  _updateGridNow() {
+    const nowTs = Date.now() / 1000;
+    for (const el of this._gridCells.values()) {
+      if (el.dataset.start === undefined) continue;
+      const start = Number(el.dataset.start);
+      el.classList.toggle('now', start <= nowTs && nowTs < Number(el.dataset.end));
+    }
   }
 
   formatDate(date) {
@@ -391,10 +944,14 @@ class TvProgramCard extends HTMLElement {
 
   updateDays(days) {
     this._days = days; // Aktualizujeme _days
+    if (this._listViewport) this._listViewport.scrollTop = 0;
     this.render();
   }
 
   getCardSize() {
+    if (this._config.mode === 'grid') {
+      return 2 + (this._config.channels?.length || 7);
+    }
     return 3;
   }
 }